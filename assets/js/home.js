@@ -0,0 +1,16 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const slides = document.querySelectorAll('.hero-bg-slide');
+    let currentSlide = 0;
+
+    function showSlide(n) {
+        slides.forEach(slide => slide.classList.remove('active'));
+        currentSlide = (n + slides.length) % slides.length;
+        slides[currentSlide].classList.add('active');
+    }
+
+    // Start slideshow
+    showSlide(0);
+    setInterval(() => {
+        showSlide(currentSlide + 1);
+    }, 5000); // Change slide every 5 seconds
+});
@@ -0,0 +1,70 @@
+"""Fuzzy search benchmark: ``python -m benchmarks.bench_fuzzy [--adverts N] [--distance D]``"""
+import argparse
+import random
+import time
+
+from utils.catalogue import Catalogue
+from utils.catalogue_index import CatalogueIndex
+from utils.fuzzy import FuzzyIndex
+from utils.search import AISearchEngine
+
+DISHES = ['jollof', 'waakye', 'banku', 'kenkey', 'fufu', 'kelewele', 'omotuo', 'tuozaafi',
+          'redred', 'shito', 'chicken', 'tilapia', 'plantain', 'groundnut', 'palmnut', 'okro']
+EXTRAS = ['spicy', 'special', 'combo', 'family', 'deluxe', 'grilled', 'fried', 'vegan', 'rice', 'soup']
+TYPOS = ['jolof', 'wakye', 'kelewel', 'tilapa', 'plantian', 'grondnut', 'chiken', 'spicey']
+# Full searches: typo correction plus synonym expansion, price intents and scoring over the catalogue
+QUERIES = ['jolof', 'spicey chiken', 'cheap wakye', 'grilled tilapa under 50', 'family combo']
+
+
+def synthetic_adverts(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    adverts = []
+    for i in range(count):
+        # A unique token per advert keeps the vocabulary growing with the catalogue
+        name = f"{rng.choice(EXTRAS)} {rng.choice(DISHES)} {rng.choice(DISHES)}{i % 500}"
+        adverts.append({'id': i, 'name': name, 'description': f"{rng.choice(EXTRAS)} {rng.choice(DISHES)}",
+                        'price': rng.randint(5, 200)})
+    return adverts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--adverts', type=int, default=100_000)
+    parser.add_argument('--distance', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    source = Catalogue()
+    source.ingest(synthetic_adverts(args.adverts))
+    index = FuzzyIndex(source, max_distance=args.distance)
+    engine = AISearchEngine(fuzzy=index, max_edit_distance=args.distance, index=CatalogueIndex(source))
+
+    started = time.perf_counter()
+    index.refresh(wait=True)
+    print(f"index build ({args.adverts} adverts): {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    worst = 0.0
+    for typo in TYPOS:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            corrected = engine.correct_query(typo)
+        elapsed = (time.perf_counter() - started) * 1000 / args.repeat
+        worst = max(worst, elapsed)
+        print(f"  correct {typo!r:12} -> {corrected!r:14} {elapsed:.3f} ms")
+    print(f"worst fuzzy lookup: {worst:.3f} ms ({'OK' if worst < 10 else 'OVER'} the 10 ms budget)")
+
+    engine.search('warm up')
+    search_repeat = max(1, args.repeat // 10)
+    slowest = 0.0
+    for query in QUERIES:
+        started = time.perf_counter()
+        for _ in range(search_repeat):
+            found = engine.search(query)
+        elapsed = (time.perf_counter() - started) * 1000 / search_repeat
+        slowest = max(slowest, elapsed)
+        print(f"  search {query!r:26} {len(found):6} results {elapsed:8.1f} ms")
+    print(f"slowest full search ({args.adverts} adverts): {slowest:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
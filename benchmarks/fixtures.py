@@ -0,0 +1,54 @@
+"""Synthetic vendors and adverts shaped like the backend's payloads, shared by the benchmarks and the mock backend"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+DISHES = ['jollof', 'waakye', 'banku', 'kenkey', 'fufu', 'kelewele', 'omotuo', 'tuozaafi',
+          'redred', 'shito', 'chicken', 'tilapia', 'plantain', 'groundnut', 'palmnut', 'okro']
+EXTRAS = ['spicy', 'special', 'combo', 'family', 'deluxe', 'grilled', 'fried', 'vegan', 'rice', 'soup']
+INGREDIENTS = ['rice', 'tomato', 'onion', 'pepper', 'ginger', 'garlic', 'palm oil', 'beans', 'plantain',
+               'cassava', 'maize', 'chicken', 'beef', 'fish', 'egg', 'shrimp', 'groundnut', 'okro']
+# Same choices as the add-advert form
+CATEGORIES = ['Appetizers', 'Main Course', 'Desserts', 'Beverages', 'Breakfast', 'Lunch', 'Dinner',
+              'Vegetarian', 'Vegan']
+DIETARY = ['', '', 'Vegetarian', 'Vegan', 'Gluten-Free', 'Dairy-Free', 'Vegetarian, Gluten-Free']
+SPICINESS = ['Not Spicy', 'Mild', 'Medium', 'Hot', 'Very Hot']
+IMAGES = ['/assets/dishes-mediterranean-cuisine.jpg', 'https://images.unsplash.com/photo-1604908176997-125f25cc6f3d',
+          'https://images.unsplash.com/photo-1512621776951-a57141f2eefd']
+# Every synthetic account signs in with this password
+PASSWORD = 'password123'
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def synthetic_vendors(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{'id': f"vendor-{i}", 'name': f"{rng.choice(EXTRAS).title()} Kitchen {i}",
+             'email': f"vendor{i}@example.com", 'role': 'vendor'} for i in range(count)]
+
+
+def synthetic_adverts(count: int, vendors: List[Dict[str, Any]], seed: int = 7) -> List[Dict[str, Any]]:
+    """``count`` adverts spread over ``vendors``, in the camelCase shape of ``/api/advertisements``"""
+    rng = random.Random(seed)
+    adverts = []
+    for i in range(count):
+        vendor = vendors[i % len(vendors)] if vendors else {'id': None, 'name': ''}
+        dish = rng.choice(DISHES)
+        adverts.append({
+            'id': str(i),
+            # A unique token per advert keeps the search vocabulary growing with the catalogue
+            'name': f"{rng.choice(EXTRAS)} {dish} {rng.choice(DISHES)}{i % 500}",
+            'description': f"{rng.choice(EXTRAS).title()} {dish} with {rng.choice(INGREDIENTS)}, "
+                           f"served {rng.choice(['hot', 'fresh', 'daily', 'to order'])}",
+            'price': round(rng.uniform(5, 80), 2),
+            'category': rng.choice(CATEGORIES),
+            'ingredients': ', '.join(rng.sample(INGREDIENTS, 4)),
+            'dietaryInformation': rng.choice(DIETARY),
+            'spicinessLevel': rng.choice(SPICINESS),
+            'preparationTime': rng.choice([10, 15, 20, 30, 45, 60]),
+            'isAvailable': rng.random() < 0.85,
+            'image': rng.choice(IMAGES),
+            'vendorId': vendor['id'],
+            'vendorName': vendor['name'],
+            'createdAt': (EPOCH + timedelta(minutes=i * 7)).isoformat(),
+        })
+    return adverts
@@ -0,0 +1,444 @@
+"""End-to-end load test with headless NiceGUI clients:
+``python -m benchmarks.load_test [--users N] [--vendors V] [--duration S] [--ramp S] [--json FILE]``
+
+Each virtual user is a real browser session without a browser. It loads a
+page over HTTP, connects the page's socket.io websocket, keeps the element
+tree up to date from ``update`` messages and fires UI events the way
+nicegui.js does. Shoppers load ``/view_advert``, type searches key by key and
+open and close detail modals. Vendors sign in and toggle advert statuses on
+``/vendor/dashboard``.
+
+Unless ``--url`` is given, the mock backend and one app process are started
+for the run. The report covers throughput, p50/p95/p99 latency per action,
+event-loop lag and server memory per session. Event-loop lag is measured
+from outside: a tiny static file is fetched every 100 ms, and its latency
+is compared with the idle baseline. Memory is the server's RSS growth
+divided by the peak number of open sessions.
+
+All virtual users connect from one address, so they share the per-IP rate
+limits; rejected requests are reported as ``rate_limited`` errors. The
+client speaks the NiceGUI 2.x socket protocol pinned in requirements.txt.
+"""
+import argparse
+import ast
+import asyncio
+import html
+import json
+import os
+import random
+import re
+import secrets
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+import socketio
+
+from benchmarks.fixtures import PASSWORD
+
+ELEMENTS_RE = re.compile(r'parseElements\(String\.raw`(.*?)`\)', re.S)
+QUERY_RE = re.compile(r'query: (\{.*?\}),\n')
+VERSION_RE = re.compile(r'version: "([^"]+)"')
+# Socket handshake and element layout this client implements
+NICEGUI_MAJOR = '2'
+# ui.input is a NiceGUI component; ui.number and ui.select render Quasar tags directly
+INPUT_TAG = 'nicegui-input'
+SEARCHES = ['jollof', 'spicy chicken', 'cheap rice', 'vegan soup', 'grilled tilapia', 'family combo', 'kelewele']
+# Seconds between key presses and between actions, as a brisk human would
+TYPING_DELAY = 0.12
+THINK_TIME = (0.5, 2.0)
+# Socket.io messages that answer a UI event
+REPLY_MESSAGES = ('update', 'notify', 'open', 'run_javascript', 'download')
+RATE_LIMITED_TEXT = 'Too many requests'
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class Stats:
+    """Latencies per action, error counts and server samples collected during a run"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.probe_baseline: List[float] = []
+        self.probe: List[float] = []
+        self.rss_baseline = 0
+        self.rss_peak = 0
+        self.sessions = 0
+        self.peak_sessions = 0
+
+    def record(self, action: str, seconds: float) -> None:
+        self.latencies[action].append(seconds)
+
+    def report(self, duration: float) -> Dict[str, Any]:
+        actions = {
+            action: {'count': len(values), 'p50_ms': percentile(values, 50) * 1000,
+                     'p95_ms': percentile(values, 95) * 1000, 'p99_ms': percentile(values, 99) * 1000,
+                     'max_ms': max(values) * 1000}
+            for action, values in sorted(self.latencies.items())
+        }
+        completed = sum(len(values) for values in self.latencies.values())
+        baseline = percentile(self.probe_baseline, 50)
+        lag = [max(0.0, latency - baseline) for latency in self.probe]
+        return {
+            'duration_s': duration,
+            'throughput_per_s': completed / duration if duration else 0.0,
+            'actions': actions,
+            'errors': dict(self.errors),
+            'event_loop_lag': {'baseline_ms': baseline * 1000, 'p50_ms': percentile(lag, 50) * 1000,
+                               'p95_ms': percentile(lag, 95) * 1000, 'p99_ms': percentile(lag, 99) * 1000,
+                               'max_ms': max(lag, default=0.0) * 1000},
+            'memory': {'rss_baseline_mb': self.rss_baseline / 2 ** 20, 'rss_peak_mb': self.rss_peak / 2 ** 20,
+                       'peak_sessions': self.peak_sessions,
+                       'per_session_kb': ((self.rss_peak - self.rss_baseline) / 1024 / self.peak_sessions
+                                          if self.peak_sessions and self.rss_peak else None)},
+        }
+
+
+class VirtualClient:
+    """One headless browser tab: HTTP for pages, socket.io for UI events"""
+
+    def __init__(self, base_url: str, stats: Stats):
+        self.base_url = base_url
+        self.stats = stats
+        self.http = httpx.AsyncClient(base_url=base_url, timeout=30)
+        self.sio: Optional[socketio.AsyncClient] = None
+        self.elements: Dict[str, Dict[str, Any]] = {}
+        self.client_id: Optional[str] = None
+        self.next_message_id = 0
+        self.navigated_to: Optional[str] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._wait_for: tuple = REPLY_MESSAGES
+
+    # --- Connection ---
+
+    async def open(self, path: str) -> float:
+        """Load a page and complete the websocket handshake; returns the seconds taken"""
+        await self.disconnect()
+        started = time.perf_counter()
+        response = await self.http.get(path)
+        response.raise_for_status()
+        page = response.text
+        self.elements = json.loads(html.unescape(ELEMENTS_RE.search(page).group(1)))
+        query = ast.literal_eval(QUERY_RE.search(page).group(1))
+        self.client_id = query['client_id']
+        self.next_message_id = query['next_message_id']
+        self.navigated_to = None
+
+        sio = socketio.AsyncClient(reconnection=False)
+        for message in REPLY_MESSAGES:
+            sio.on(message, self._handler(message))
+        cookies = '; '.join(f'{name}={value}' for name, value in self.http.cookies.items())
+        await sio.connect(f"{self.base_url}?{httpx.QueryParams(query)}", transports=['websocket'],
+                               socketio_path='/_nicegui_ws/socket.io',
+                               headers={'Cookie': cookies})
+        self.sio = sio
+        self.stats.sessions += 1
+        self.stats.peak_sessions = max(self.stats.peak_sessions, self.stats.sessions)
+        ok = await self.sio.call('handshake', {
+            'client_id': self.client_id, 'document_id': str(uuid.uuid4()), 'tab_id': str(uuid.uuid4()),
+            'old_tab_id': None, 'next_message_id': self.next_message_id,
+        }, timeout=10)
+        if not ok:
+            raise RuntimeError(f'Handshake refused for {path}')
+        return time.perf_counter() - started
+
+    async def disconnect(self) -> None:
+        if self.sio is not None:
+            self.stats.sessions -= 1
+            await self.sio.disconnect()
+            self.sio = None
+
+    async def close(self) -> None:
+        await self.disconnect()
+        await self.http.aclose()
+
+    def _handler(self, message: str):
+        async def handle(data: Dict[str, Any]) -> None:
+            if isinstance(data, dict) and '_id' in data:
+                self.next_message_id = data['_id'] + 1
+            if message == 'update':
+                for element_id, element in data.items():
+                    if element_id == '_id':
+                        continue
+                    if element is None:
+                        self.elements.pop(element_id, None)
+                    else:
+                        self.elements[element_id] = element
+                await self.sio.emit('ack', {'client_id': self.client_id, 'next_message_id': self.next_message_id})
+            elif message == 'open':
+                self.navigated_to = data.get('path')
+            elif message == 'notify' and RATE_LIMITED_TEXT in str(data.get('message', '')):
+                self.stats.errors['rate_limited'] += 1
+            elif message == 'run_javascript' and data.get('request_id'):
+                await self.sio.emit('javascript_response', {'request_id': data['request_id'],
+                                                            'client_id': self.client_id, 'result': None})
+            if message in self._wait_for and self._waiter is not None and not self._waiter.done():
+                self._waiter.set_result(message)
+        return handle
+
+    # --- Elements and events ---
+
+    def find(self, tag: str, **props: Any) -> List[str]:
+        """Ids of elements with this tag whose props match; a callable prop value is used as a predicate"""
+        found = []
+        for element_id, element in self.elements.items():
+            if element.get('tag') != tag:
+                continue
+            element_props = element.get('props', {})
+            if all(value(element_props.get(key)) if callable(value) else element_props.get(key) == value
+                   for key, value in props.items()):
+                found.append(element_id)
+        return found
+
+    async def emit(self, element_id: str, event_type: str, *args: Any) -> None:
+        listener = next(event for event in self.elements[element_id].get('events', [])
+                        if event['type'] == event_type)
+        await self.sio.emit('event', {'id': int(element_id), 'client_id': self.client_id,
+                                      'listener_id': listener['listener_id'],
+                                      'args': [json.dumps(arg) for arg in args]})
+
+    async def trigger(self, element_id: str, event_type: str, *args: Any, until: tuple = REPLY_MESSAGES,
+                      timeout: float = 30) -> float:
+        """Fire an event and wait for the server's first reply of the ``until`` kinds; returns the seconds taken"""
+        self._waiter = asyncio.get_running_loop().create_future()
+        self._wait_for = until
+        started = time.perf_counter()
+        await self.emit(element_id, event_type, *args)
+        try:
+            await asyncio.wait_for(self._waiter, timeout)
+        finally:
+            self._waiter = None
+        return time.perf_counter() - started
+
+    async def set_value(self, element_id: str, value: Any) -> None:
+        await self.emit(element_id, 'update:modelValue', value)
+
+
+async def timed(stats: Stats, action: str, step) -> bool:
+    try:
+        stats.record(action, await step)
+        return True
+    except Exception as e:
+        stats.errors[f'{action}: {type(e).__name__}'] += 1
+        return False
+
+
+async def shopper(client: VirtualClient, rng: random.Random, stop_at: float) -> None:
+    stats = client.stats
+    while time.monotonic() < stop_at:
+        if not await timed(stats, 'load /view_advert', client.open('/view_advert')):
+            await asyncio.sleep(rng.uniform(*THINK_TIME))
+            continue
+        for _ in range(rng.randint(2, 5)):
+            if time.monotonic() >= stop_at:
+                break
+            search = client.find(INPUT_TAG, placeholder=lambda p: bool(p) and p.startswith('🔍'))
+            if search:
+                query = rng.choice(SEARCHES)
+                for end in range(1, len(query) + 1):
+                    await client.set_value(search[0], query[:end])
+                    await timed(stats, 'search keystroke', client.trigger(search[0], 'input', {}))
+                    await asyncio.sleep(TYPING_DELAY)
+            details = client.find('q-btn', label='View Details')
+            if details and await timed(stats, 'open modal', client.trigger(rng.choice(details), 'click')):
+                close = client.find('q-btn', label='Close')
+                if close:
+                    await timed(stats, 'close modal', client.trigger(close[-1], 'click'))
+            await asyncio.sleep(rng.uniform(*THINK_TIME))
+
+
+async def vendor(client: VirtualClient, rng: random.Random, stop_at: float, email: str) -> None:
+    stats = client.stats
+    if not await timed(stats, 'load /sign-in', client.open('/sign-in')):
+        return
+    email_input, password_input = client.find(INPUT_TAG, label='Email'), client.find(INPUT_TAG, label='Password')
+    login = client.find('q-btn', label='Login')
+    if not (email_input and password_input and login):
+        stats.errors['sign-in form not found'] += 1
+        return
+    # The first Email and Password inputs belong to the login tab; the sign-up tab follows
+    await client.set_value(email_input[0], email)
+    await client.set_value(password_input[0], PASSWORD)
+    login = login[0]
+    if not await timed(stats, 'sign in', client.trigger(login, 'click', until=('open',))):
+        return
+    while time.monotonic() < stop_at:
+        if not await timed(stats, 'load /vendor/dashboard', client.open('/vendor/dashboard')):
+            await asyncio.sleep(rng.uniform(*THINK_TIME))
+            continue
+        for _ in range(rng.randint(3, 8)):
+            if time.monotonic() >= stop_at:
+                break
+            toggles = client.find('q-btn', icon=lambda icon: icon in ('toggle_on', 'toggle_off'))
+            if toggles:
+                await timed(stats, 'toggle status', client.trigger(rng.choice(toggles), 'click'))
+            await asyncio.sleep(rng.uniform(*THINK_TIME))
+
+
+def rss_bytes(pid: int) -> int:
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+async def monitor(base_url: str, probe_path: str, pid: Optional[int], stats: Stats, stop: asyncio.Event,
+                  baseline: bool) -> None:
+    """Probe loop responsiveness every 100 ms and sample server memory every second"""
+    samples = stats.probe_baseline if baseline else stats.probe
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as http:
+        tick = 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                await http.get(probe_path)
+                samples.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                stats.errors['probe'] += 1
+            if pid and tick % 10 == 0:
+                rss = rss_bytes(pid)
+                if baseline:
+                    stats.rss_baseline = rss
+                else:
+                    stats.rss_peak = max(stats.rss_peak, rss)
+            tick += 1
+            try:
+                await asyncio.wait_for(stop.wait(), 0.1)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def run(args: argparse.Namespace, base_url: str, pid: Optional[int]) -> Dict[str, Any]:
+    stats = Stats()
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as http:
+        # Warm up: the first render imports and indexes the catalogue
+        page = (await http.get('/view_advert')).text
+    version = VERSION_RE.search(page).group(1)
+    if version.split('.')[0] != NICEGUI_MAJOR:
+        raise RuntimeError(f'The server runs NiceGUI {version}; this client speaks the {NICEGUI_MAJOR}.x protocol')
+    probe_path = f'/_nicegui/{version}/static/sad_face.svg'
+
+    stop = asyncio.Event()
+    idle = asyncio.create_task(monitor(base_url, probe_path, pid, stats, stop, baseline=True))
+    await asyncio.sleep(2)
+    stop.set()
+    await idle
+
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(monitor(base_url, probe_path, pid, stats, stop, baseline=False))
+    rng = random.Random(args.seed)
+    started = time.monotonic()
+    stop_at = started + args.ramp + args.duration
+    async def start(n: int) -> None:
+        await asyncio.sleep(args.ramp * n / max(1, args.users + args.vendors))
+        client = VirtualClient(base_url, stats)
+        user_rng = random.Random(rng.random())
+        try:
+            if n < args.vendors:
+                await vendor(client, user_rng, stop_at, f'vendor{n}@example.com')
+            else:
+                await shopper(client, user_rng, stop_at)
+        finally:
+            await client.close()
+
+    await asyncio.gather(*(start(n) for n in range(args.users + args.vendors)))
+    stop.set()
+    await sampler
+    return stats.report(time.monotonic() - started)
+
+
+def wait_until_up(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=5)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    raise RuntimeError(f'{url} did not come up within {timeout:.0f} s')
+
+
+def start_servers(args: argparse.Namespace) -> List[subprocess.Popen]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    secret = 'mock-secret'
+    backend = subprocess.Popen([sys.executable, '-m', 'benchmarks.mock_backend', '--adverts', str(args.adverts),
+                                '--vendors', str(max(1, args.vendors)), '--latency', str(args.latency),
+                                '--jitter', str(args.jitter), '--error-rate', str(args.error_rate),
+                                '--jwt-secret', secret, '--port', str(args.backend_port)], cwd=root)
+    env = dict(os.environ, PORT=str(args.port), RELOAD='0', BACKEND_URL=f'http://127.0.0.1:{args.backend_port}',
+               JWT_SECRET=secret, STORAGE_SECRET=secrets.token_urlsafe(32))
+    app = subprocess.Popen([sys.executable, 'main.py'], cwd=root, env=env)
+    wait_until_up(f'http://127.0.0.1:{args.backend_port}/health')
+    wait_until_up(f'http://127.0.0.1:{args.port}/')
+    return [app, backend]
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{report['duration_s']:.1f} s, {report['throughput_per_s']:.1f} actions/s")
+    print(f"{'action':24} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for action, row in report['actions'].items():
+        print(f"{action:24} {row['count']:>7} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+              f"{row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+    lag = report['event_loop_lag']
+    print(f"event-loop lag: p50 {lag['p50_ms']:.1f} ms, p95 {lag['p95_ms']:.1f} ms, p99 {lag['p99_ms']:.1f} ms, "
+          f"max {lag['max_ms']:.1f} ms (idle probe {lag['baseline_ms']:.1f} ms)")
+    memory = report['memory']
+    if memory['per_session_kb'] is not None:
+        print(f"memory: {memory['rss_baseline_mb']:.0f} -> {memory['rss_peak_mb']:.0f} MB for "
+              f"{memory['peak_sessions']} sessions, {memory['per_session_kb']:.0f} KB per session")
+    if report['errors']:
+        print('errors:', ', '.join(f'{kind} x{count}' for kind, count in sorted(report['errors'].items())))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Load-test the app with headless NiceGUI sessions')
+    parser.add_argument('--users', type=int, default=20, help='concurrent shoppers')
+    parser.add_argument('--vendors', type=int, default=2, help='concurrent signed-in vendors')
+    parser.add_argument('--duration', type=float, default=60, help='seconds of full load after the ramp')
+    parser.add_argument('--ramp', type=float, default=10, help='seconds over which sessions are started')
+    parser.add_argument('--url', help='test a running app instead of starting one (and the mock backend)')
+    parser.add_argument('--server-pid', type=int, help='pid of the app behind --url, for memory figures')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--backend-port', type=int, default=9000)
+    parser.add_argument('--adverts', type=int, default=1000, help='adverts seeded into the mock backend')
+    parser.add_argument('--latency', type=float, default=0.05, help='mock backend latency, seconds')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    servers: List[subprocess.Popen] = []
+    if args.url:
+        base_url, pid = args.url.rstrip('/'), args.server_pid
+    else:
+        servers = start_servers(args)
+        base_url, pid = f'http://127.0.0.1:{args.port}', servers[0].pid
+    try:
+        report = asyncio.run(run(args, base_url, pid))
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait(10)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
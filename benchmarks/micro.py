@@ -0,0 +1,339 @@
+"""Micro-benchmarks of the search, filtering, similarity, local-store and card-rendering hot paths:
+``python -m benchmarks.micro [--sizes 100,1000,10000] [--only PREFIX,...] [--output FILE] [--compare BASELINE]``
+
+Every benchmark runs against synthetic catalogues of each size. Results go
+to ``benchmarks/results/<commit>.json`` by default, one record per
+benchmark and size. ``--compare`` diffs the run against an earlier file and
+exits non-zero when a median regressed by more than ``--threshold``.
+1M-advert catalogues take several GB of memory, so pass ``--sizes`` up to
+1000000 explicitly.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fixtures import synthetic_adverts, synthetic_vendors
+from utils.catalogue import Catalogue
+from utils.catalogue_index import CatalogueIndex
+from utils.fuzzy import FuzzyIndex
+from utils.search import AISearchEngine
+
+SIZES = (100, 1_000, 10_000, 100_000)
+# Cards are real NiceGUI elements; no page renders more than this many at once
+MAX_CARDS = 1_000
+QUERIES = ['jollof', 'cheap spicy chicken', 'family combo rice', 'jolof', 'quick vegan soup', 'grilled tilapia']
+SORTS = ['Newest First', 'Oldest First', 'Price: Low to High', 'Price: High to Low', 'Name: A-Z']
+# Each benchmark is timed for at least this long and at least MIN_RUNS times
+MIN_TIME = 0.5
+MIN_RUNS = 3
+MAX_RUNS = 10_000
+
+
+class Fixture:
+    """One synthetic catalogue, raw and normalized, shared by every benchmark of a size"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.vendors = synthetic_vendors(max(1, size // 50))
+        self.raw = synthetic_adverts(size, self.vendors)
+        self.catalogue = Catalogue()
+        self.adverts = self.catalogue.ingest(self.raw)
+
+
+# name -> (setup, sized). ``setup(fixture)`` returns the callable that is timed
+# and the number of items one call processes.
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, sized: bool = True) -> Callable:
+    """Register a setup function; ``sized=False`` benchmarks run once, on the smallest catalogue"""
+
+    def decorator(setup: Callable[[Fixture], tuple]) -> Callable:
+        BENCHMARKS[name] = (setup, sized)
+        return setup
+    return decorator
+
+
+# --- Search ---
+
+@benchmark('search.expand_query', sized=False)
+def _expand_query(fixture: Fixture):
+    engine = AISearchEngine(fuzzy=FuzzyIndex(fixture.catalogue), index=CatalogueIndex(fixture.catalogue))
+    return lambda: [engine.expand_query(query) for query in QUERIES], len(QUERIES)
+
+
+@benchmark('search.intelligent_search')
+def _intelligent_search(fixture: Fixture):
+    fuzzy = FuzzyIndex(fixture.catalogue)
+    fuzzy.refresh(wait=True)
+    engine = AISearchEngine(fuzzy=fuzzy, index=CatalogueIndex(fixture.catalogue))
+    queries = itertools.cycle(QUERIES)
+    return lambda: engine.intelligent_search(next(queries), fixture.adverts), fixture.size
+
+
+# --- Vendor dashboard ---
+
+def _dashboard(fixture: Fixture):
+    from pages.vendor.dashboard import VendorDashboard
+    dashboard = VendorDashboard()
+    # A private index rather than the process-wide listing the page shares
+    dashboard.catalogue = fixture.catalogue
+    dashboard.index = CatalogueIndex(fixture.catalogue)
+    dashboard.vendor_id = fixture.vendors[0]['id']
+    # Stand-ins for the price inputs; without adverts_container nothing is rendered
+    dashboard.min_price = SimpleNamespace(value=None)
+    dashboard.max_price = SimpleNamespace(value=None)
+    return dashboard
+
+
+@benchmark('dashboard.apply_filters')
+def _apply_filters(fixture: Fixture):
+    dashboard = _dashboard(fixture)
+    dashboard.current_filters = {'status': 'Active'}
+    dashboard.search_term = 'rice'
+    dashboard.apply_filters()
+    return dashboard.apply_filters, fixture.size
+
+
+@benchmark('dashboard.sort_advertisements')
+def _sort_advertisements(fixture: Fixture):
+    dashboard = _dashboard(fixture)
+    # Sort the whole catalogue rather than one vendor's share of it
+    dashboard.filtered_advertisements = list(fixture.adverts)
+    sorts = itertools.cycle(SORTS)
+    return lambda: dashboard.sort_advertisements(SimpleNamespace(value=next(sorts))), fixture.size
+
+
+# --- Similarity ---
+
+def _detail_page(fixture: Fixture):
+    from pages.advertisement.detail import AdvertisementDetailPage
+    page = AdvertisementDetailPage(fixture.adverts[0]['id'])
+    page.advertisement = fixture.adverts[0]
+    return page
+
+
+@benchmark('similarity.calculate_similarity', sized=False)
+def _calculate_similarity(fixture: Fixture):
+    page = _detail_page(fixture)
+    current = fixture.adverts[0]
+    return lambda: [page.calculate_similarity(current, ad) for ad in fixture.adverts], fixture.size
+
+
+@benchmark('similarity.get_recommendations')
+def _get_recommendations(fixture: Fixture):
+    page = _detail_page(fixture)
+    return lambda: page.get_recommendations(fixture.adverts), fixture.size
+
+
+@benchmark('similarity.get_related_adverts')
+def _get_related_adverts(fixture: Fixture):
+    from pages.view_advert import get_related_adverts
+    current = fixture.adverts[0]
+    return lambda: get_related_adverts(current, fixture.adverts), fixture.size
+
+
+# --- Local store ---
+
+def _local_store(fixture: Fixture):
+    """A private write-behind file for frontend_store, preloaded with the catalogue"""
+    from utils import frontend_store
+    from utils.write_behind import WriteBehindStore
+    directory = tempfile.mkdtemp(prefix='bench-store-')
+    adverts = [{'id': ad['id'], 'name': ad['name'], 'description': ad['description'], 'price': ad['price'],
+                'owner_id': ad['vendorId'], 'image': ''} for ad in fixture.raw]
+    # Flushing is left out: the benchmark times the in-memory operations a request waits for
+    store = WriteBehindStore(
+        os.path.join(directory, 'frontend-store.json'), interval=3600, threshold=sys.maxsize,
+        seed=lambda: {frontend_store.USERS_KEY: [], frontend_store.ADVERTS_KEY: adverts})
+    return store, fixture.raw[len(fixture.raw) // 2]['id']
+
+
+def _on_store(store, call: Callable[[Any], Any]) -> Callable[[], Any]:
+    """Time ``call(frontend_store)`` with ``store`` swapped in, putting the app's store back after each call"""
+    from utils import frontend_store
+
+    def run() -> Any:
+        saved = frontend_store.write_behind_store
+        frontend_store.write_behind_store = store
+        try:
+            return call(frontend_store)
+        finally:
+            frontend_store.write_behind_store = saved
+    return run
+
+
+@benchmark('store.create_advert')
+def _store_create(fixture: Fixture):
+    store, _ = _local_store(fixture)
+    return _on_store(store, lambda fs: fs.create_advert('bench advert', 'created by the benchmark', 12.5,
+                                                        'vendor-0')), fixture.size
+
+
+@benchmark('store.get_advert')
+def _store_get(fixture: Fixture):
+    store, middle = _local_store(fixture)
+    return _on_store(store, lambda fs: fs.get_advert(middle)), fixture.size
+
+
+@benchmark('store.update_advert')
+def _store_update(fixture: Fixture):
+    store, middle = _local_store(fixture)
+    return _on_store(store, lambda fs: fs.update_advert(middle, 'renamed advert', 'updated by the benchmark',
+                                                        13.0)), fixture.size
+
+
+@benchmark('store.list_adverts')
+def _store_list(fixture: Fixture):
+    store, _ = _local_store(fixture)
+    return _on_store(store, lambda fs: fs.list_adverts()), fixture.size
+
+
+@benchmark('store.delete_advert')
+def _store_delete(fixture: Fixture):
+    store, _ = _local_store(fixture)
+    # An unknown id costs the same full rewrite of the list and keeps the catalogue size constant
+    return _on_store(store, lambda fs: fs.delete_advert('missing')), fixture.size
+
+
+# --- Cards ---
+
+def _render(create_card: Callable[[Dict[str, Any]], None], adverts: List[Dict[str, Any]]) -> Callable[[], None]:
+    from nicegui import Client
+    from nicegui.page import page
+
+    def render() -> None:
+        # A throwaway client stands in for a page; its elements are dropped afterwards
+        client = Client(page(''), request=None)
+        with client:
+            for advert in adverts:
+                create_card(advert)
+        client.delete()
+    return render
+
+
+@benchmark('render.dashboard_card')
+def _dashboard_cards(fixture: Fixture):
+    adverts = fixture.adverts[:MAX_CARDS]
+    return _render(_dashboard(fixture).create_advertisement_card, adverts), len(adverts)
+
+
+@benchmark('render.browse_card')
+def _browse_cards(fixture: Fixture):
+    from pages.advertisement.browse import AdvertisementsBrowsePage
+    adverts = fixture.adverts[:MAX_CARDS]
+    return _render(AdvertisementsBrowsePage().create_advertisement_card, adverts), len(adverts)
+
+
+@benchmark('render.view_advert_card')
+def _view_advert_cards(fixture: Fixture):
+    from pages.view_advert import advert_card
+    adverts = fixture.adverts[:MAX_CARDS]
+    return _render(lambda advert: advert_card(advert, on_details=lambda _: None), adverts), len(adverts)
+
+
+@benchmark('render.recommendation_card')
+def _recommendation_cards(fixture: Fixture):
+    adverts = fixture.adverts[:MAX_CARDS]
+    return _render(_detail_page(fixture).create_recommendation_card, adverts), len(adverts)
+
+
+def measure(func: Callable[[], Any]) -> List[float]:
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < MAX_RUNS and (len(timings) < MIN_RUNS or time.perf_counter() - started < MIN_TIME):
+        before = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - before)
+    return timings
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(sizes: List[int], only: Optional[List[str]]) -> List[Dict[str, Any]]:
+    selected = {name: entry for name, entry in BENCHMARKS.items()
+                if not only or any(name.startswith(prefix) for prefix in only)}
+    results = []
+    for size in sizes:
+        fixture = Fixture(size)
+        for name, (setup, sized) in selected.items():
+            if not sized and size != min(sizes):
+                continue
+            func, items = setup(fixture)
+            timings = measure(func)
+            result = {
+                'name': name, 'size': size, 'items': items, 'runs': len(timings),
+                'median_ms': statistics.median(timings) * 1000, 'mean_ms': statistics.fmean(timings) * 1000,
+                'min_ms': min(timings) * 1000, 'max_ms': max(timings) * 1000,
+                'stdev_ms': statistics.pstdev(timings) * 1000,
+            }
+            results.append(result)
+            print(f"{name:36} {size:>9} {result['median_ms']:>11.3f} ms  ({len(timings)} runs)")
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> bool:
+    """Print median ratios against a baseline file; returns False if any regressed beyond ``threshold``"""
+    with open(baseline_path) as f:
+        baseline = {(r['name'], r['size']): r for r in json.load(f)['results']}
+    ok = True
+    print(f"\ncompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get((result['name'], result['size']))
+        if before is None or not before['median_ms']:
+            continue
+        ratio = result['median_ms'] / before['median_ms']
+        regressed = ratio > threshold
+        ok = ok and not regressed
+        print(f"{result['name']:36} {result['size']:>9} {before['median_ms']:>11.3f} -> "
+              f"{result['median_ms']:>11.3f} ms  x{ratio:.2f}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Micro-benchmarks of the hot paths')
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help='comma-separated catalogue sizes')
+    parser.add_argument('--only', help='comma-separated name prefixes, e.g. search,render.browse_card')
+    parser.add_argument('--output', help='result file (default benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='earlier result file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2, help='slowdown ratio reported as a regression')
+    parser.add_argument('--list', action='store_true', help='list the benchmarks and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(BENCHMARKS))
+        return 0
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    commit = git_commit()
+    results = run(sizes, args.only.split(',') if args.only else None)
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', f'{commit}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'commit': commit, 'timestamp': datetime.now(timezone.utc).isoformat(),
+                   'python': platform.python_version(), 'machine': platform.machine(),
+                   'results': results}, f, indent=2)
+    print(f"\nwrote {output}")
+    if args.compare and not compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Local stand-in for the advertisement backend:
+``python -m benchmarks.mock_backend [--adverts N] [--vendors V] [--latency S] [--jitter S] [--error-rate P] [--port 9000]``
+
+Serves every endpoint the app calls (``/food``, ``/api/advertisements``,
+``/api/food`` and ``/auth``) from memory, seeded with synthetic adverts and
+vendors. Point the app at it with ``BACKEND_URL=http://127.0.0.1:9000``; the
+tokens it issues are HS256 JWTs signed with ``--jwt-secret``, so set the app's
+``JWT_SECRET`` to the same value to exercise local verification. Every
+seeded vendor signs in as ``vendor<i>@example.com`` with ``fixtures.PASSWORD``.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import time
+from typing import Any, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from benchmarks.fixtures import PASSWORD, synthetic_adverts, synthetic_vendors
+from utils.tokens import TokenError, decode_token
+
+# Fields a client may set on create/update; ids, owners and timestamps stay server-side
+WRITABLE_FIELDS = {'name', 'title', 'description', 'price', 'category', 'ingredients', 'dietaryInformation',
+                   'spicinessLevel', 'preparationTime', 'isAvailable', 'image', 'imageUrl'}
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def encode_token(claims: Dict[str, Any], secret: str) -> str:
+    header = _b64encode(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode())
+    payload = _b64encode(json.dumps(claims).encode())
+    signature = hmac.new(secret.encode(), f'{header}.{payload}'.encode(), hashlib.sha256).digest()
+    return f'{header}.{payload}.{_b64encode(signature)}'
+
+
+class MockBackend:
+    """In-memory adverts and users plus the fault injection settings"""
+
+    def __init__(self, adverts: int = 1000, vendors: int = 20, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, jwt_secret: str = 'mock-secret', token_ttl: int = 3600, seed: int = 7):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.jwt_secret = jwt_secret
+        self.token_ttl = token_ttl
+        self.rng = random.Random(seed)
+        seeded = synthetic_vendors(vendors, seed=seed)
+        self.users: Dict[str, Dict[str, Any]] = {v['email']: dict(v, password=PASSWORD) for v in seeded}
+        self.adverts: Dict[str, Dict[str, Any]] = {ad['id']: ad for ad in synthetic_adverts(adverts, seeded, seed=seed)}
+        self._ids = itertools.count(adverts)
+        self.requests = 0
+        self.injected_errors = 0
+
+    # --- Auth ---
+
+    def issue(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        now = int(time.time())
+        claims = {'sub': user['id'], 'role': user['role'], 'name': user['name'], 'iat': now,
+                  'exp': now + self.token_ttl}
+        public = {k: user[k] for k in ('id', 'name', 'email', 'role')}
+        return {'token': encode_token(claims, self.jwt_secret), 'user': public}
+
+    def claims(self, request: Request) -> Optional[Dict[str, Any]]:
+        header = request.headers.get('authorization', '')
+        if not header.lower().startswith('bearer '):
+            return None
+        try:
+            return decode_token(header[7:], secret=self.jwt_secret)
+        except TokenError:
+            return None
+
+    # --- Adverts ---
+
+    def create(self, fields: Dict[str, Any], owner: Dict[str, Any]) -> Dict[str, Any]:
+        advert = {k: v for k, v in fields.items() if k in WRITABLE_FIELDS}
+        advert.setdefault('isAvailable', True)
+        advert.update(id=str(next(self._ids)), vendorId=owner.get('sub'), vendorName=owner.get('name', ''),
+                      createdAt=time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime()))
+        self.adverts[advert['id']] = advert
+        return advert
+
+    def update(self, advert_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        advert = self.adverts.get(advert_id)
+        if advert is not None:
+            advert.update({k: v for k, v in fields.items() if k in WRITABLE_FIELDS})
+        return advert
+
+
+def _not_found() -> JSONResponse:
+    return JSONResponse({'detail': 'Advertisement not found'}, status_code=404)
+
+
+def _unauthorized() -> JSONResponse:
+    return JSONResponse({'detail': 'Not authenticated'}, status_code=401)
+
+
+def create_app(backend: MockBackend) -> FastAPI:
+    app = FastAPI(title='Advertisement backend (mock)')
+
+    @app.middleware('http')
+    async def inject_faults(request: Request, call_next):
+        backend.requests += 1
+        delay = backend.latency + backend.rng.uniform(-backend.jitter, backend.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if backend.error_rate and backend.rng.random() < backend.error_rate:
+            backend.injected_errors += 1
+            return JSONResponse({'detail': 'Injected failure'}, status_code=503)
+        return await call_next(request)
+
+    @app.get('/health')
+    async def health():
+        return {'adverts': len(backend.adverts), 'users': len(backend.users), 'requests': backend.requests,
+                'injected_errors': backend.injected_errors}
+
+    # --- /auth ---
+
+    @app.post('/auth/signup')
+    async def signup(request: Request):
+        body = await request.json()
+        if not body.get('email') or not body.get('password') or not body.get('name'):
+            return JSONResponse({'detail': 'name, email and password are required'}, status_code=400)
+        if body['email'] in backend.users:
+            return JSONResponse({'detail': 'Email already registered'}, status_code=400)
+        user = {'id': f"user-{len(backend.users)}", 'name': body['name'], 'email': body['email'],
+                'role': body.get('role') or 'user', 'password': body['password']}
+        backend.users[user['email']] = user
+        return JSONResponse(backend.issue(user), status_code=201)
+
+    @app.post('/auth/login')
+    async def login(request: Request):
+        body = await request.json()
+        user = backend.users.get(body.get('email'))
+        if user is None or not hmac.compare_digest(str(body.get('password', '')), user['password']):
+            return JSONResponse({'detail': 'Invalid email or password'}, status_code=401)
+        return backend.issue(user)
+
+    @app.post('/auth/refresh')
+    async def refresh(request: Request):
+        claims = backend.claims(request)
+        if claims is None:
+            return _unauthorized()
+        user = next((u for u in backend.users.values() if u['id'] == claims.get('sub')), None)
+        return backend.issue(user) if user else _unauthorized()
+
+    # --- /food (legacy vendor pages and the public listing) ---
+
+    @app.get('/food/all')
+    async def food_all():
+        return list(backend.adverts.values())
+
+    @app.get('/food/{advert_id}')
+    @app.get('/api/food/{advert_id}')
+    @app.get('/api/advertisements/{advert_id}')
+    async def get_advert(advert_id: str):
+        advert = backend.adverts.get(advert_id)
+        return {'data': advert} if advert else _not_found()
+
+    @app.post('/food')
+    async def create_food(request: Request):
+        owner = backend.claims(request)
+        if owner is None:
+            return _unauthorized()
+        # Multipart form; the image upload itself is read and dropped
+        form = await request.form()
+        fields = {k: v for k, v in form.items() if isinstance(v, str)}
+        if 'price' in fields:
+            fields['price'] = float(fields['price'])
+        return {'data': backend.create(fields, owner)}
+
+    @app.put('/food/{advert_id}')
+    @app.put('/api/food/{advert_id}')
+    @app.put('/api/advertisements/{advert_id}')
+    @app.patch('/api/advertisements/{advert_id}')
+    async def update_advert(advert_id: str, request: Request):
+        if backend.claims(request) is None:
+            return _unauthorized()
+        advert = backend.update(advert_id, await request.json())
+        return {'data': advert} if advert else _not_found()
+
+    @app.delete('/food/{advert_id}')
+    @app.delete('/api/advertisements/{advert_id}')
+    async def delete_advert(advert_id: str, request: Request):
+        if backend.claims(request) is None:
+            return _unauthorized()
+        if backend.adverts.pop(advert_id, None) is None:
+            return _not_found()
+        return Response(status_code=204)
+
+    # --- /api/advertisements ---
+
+    @app.get('/api/advertisements')
+    async def list_adverts():
+        return {'data': list(backend.adverts.values())}
+
+    @app.post('/api/advertisements')
+    async def create_advert(request: Request):
+        owner = backend.claims(request)
+        if owner is None:
+            return _unauthorized()
+        return JSONResponse({'data': backend.create(await request.json(), owner)}, status_code=201)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Local stand-in for the advertisement backend')
+    parser.add_argument('--adverts', type=int, default=1000, help='synthetic adverts to seed')
+    parser.add_argument('--vendors', type=int, default=20, help='synthetic vendor accounts to seed')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='uniform +/- seconds around --latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered 503')
+    parser.add_argument('--jwt-secret', default='mock-secret')
+    parser.add_argument('--token-ttl', type=int, default=3600, help='lifetime of issued tokens, seconds')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    args = parser.parse_args()
+
+    backend = MockBackend(adverts=args.adverts, vendors=args.vendors, latency=args.latency, jitter=args.jitter,
+                          error_rate=args.error_rate, jwt_secret=args.jwt_secret, token_ttl=args.token_ttl,
+                          seed=args.seed)
+    print(f"mock backend: {len(backend.adverts)} adverts, {len(backend.users)} vendors on "
+          f"http://{args.host}:{args.port}")
+    uvicorn.run(create_app(backend), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+from nicegui import ui
+
+from utils.metrics import metrics
+
+
+def advert_image(src: str) -> ui.image:
+    """Advert image; base64 data URLs go out inside the page, so their size is counted here"""
+    if src.startswith('data:'):
+        metrics.add_image_bytes('inline', len(src))
+    return ui.image(src)
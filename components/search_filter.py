@@ -6,11 +6,22 @@ import datetime
 class SearchFilterComponent:
     """Reusable search and filter component for advertisements"""
     
+    # Filter field -> (select component, option meaning "no filter")
+    FACET_SELECTS = {
+        'category': ('category_filter', 'All'),
+        'dietary': ('dietary_filter', 'Any'),
+        'spiciness': ('spiciness_filter', 'Any'),
+    }
+    # Facets whose options follow the catalogue rather than a fixed list
+    CATALOGUE_FACETS = ('category',)
+    
     def __init__(self, on_search_callback=None, on_filter_callback=None):
         self.on_search_callback = on_search_callback
         self.on_filter_callback = on_filter_callback
         self.components: Dict[str, Any] = {}
         self.filters: Dict[str, Any] = {}
+        self.options: Dict[str, List[str]] = {}
+        self._suppressed = False
     
     def create_search_bar(self, placeholder="Search advertisements..."):
         """Create search input with debounced search"""
@@ -27,42 +38,49 @@ class SearchFilterComponent:
             # Clear filters button
             ui.button('Clear', on_click=self._clear_filters, icon='clear').props('outlined')
     
-    def create_advanced_filters(self, categories: List[str]):
-        """Create advanced filter options"""
+    def create_advanced_filters(self, categories: List[str], include_price: bool = True):
+        """Create advanced filter options; pages with their own price inputs pass include_price=False"""
+        self.options = {
+            'category': ['All'] + categories,
+            'dietary': ['Any', 'Vegetarian', 'Vegan', 'Gluten-Free', 'Dairy-Free'],
+            'spiciness': ['Any', 'Not Spicy', 'Mild', 'Medium', 'Hot', 'Very Hot'],
+        }
         with ui.expansion('Advanced Filters', icon='filter_list').classes("w-full mb-4"):
             with ui.grid(columns=2).classes("w-full gap-4 p-4"):
                 # Category filter
                 with ui.column().classes("space-y-2"):
                     ui.label('Category').classes("font-semibold")
                     self.components['category_filter'] = ui.select(
-                        options=['All'] + categories,
+                        options=self.options['category'],
                         value='All',
                         on_change=lambda e: self._update_filter('category', e.value if e.value != 'All' else None)
                     ).props('outlined dense').classes("w-full")
                 
                 # Price range filter
-                with ui.column().classes("space-y-2"):
-                    ui.label('Price Range (GHS)').classes("font-semibold")
-                    with ui.row().classes("items-center gap-2 w-full"):
-                        self.components['min_price'] = ui.number(
-                            placeholder='Min',
-                            min=0,
-                            max=10000,
-                            on_change=lambda: self._update_price_filter()
-                        ).props('outlined dense').classes("flex-1")
-                        ui.label('to').classes("text-gray-500")
-                        self.components['max_price'] = ui.number(
-                            placeholder='Max',
-                            min=0,
-                            max=10000,
-                            on_change=lambda: self._update_price_filter()
-                        ).props('outlined dense').classes("flex-1")
+                if include_price:
+                    with ui.column().classes("space-y-2"):
+                        ui.label('Price Range (GHS)').classes("font-semibold")
+                        with ui.row().classes("items-center gap-2 w-full"):
+                            self.components['min_price'] = ui.number(
+                                placeholder='Min',
+                                min=0,
+                                max=10000,
+                                on_change=lambda: self._update_price_filter()
+                            ).props('outlined dense').classes("flex-1")
+                            ui.label('to').classes("text-gray-500")
+                            self.components['max_price'] = ui.number(
+                                placeholder='Max',
+                                min=0,
+                                max=10000,
+                                on_change=lambda: self._update_price_filter()
+                            ).props('outlined dense').classes("flex-1")
+                        self.components['price_facets'] = ui.label('').classes("text-xs text-gray-500")
                 
                 # Dietary preferences
                 with ui.column().classes("space-y-2"):
                     ui.label('Dietary').classes("font-semibold")
                     self.components['dietary_filter'] = ui.select(
-                        options=['Any', 'Vegetarian', 'Vegan', 'Gluten-Free', 'Dairy-Free'],
+                        options=self.options['dietary'],
                         value='Any',
                         on_change=lambda e: self._update_filter('dietary', e.value if e.value != 'Any' else None)
                     ).props('outlined dense').classes("w-full")
@@ -71,11 +89,41 @@ class SearchFilterComponent:
                 with ui.column().classes("space-y-2"):
                     ui.label('Spiciness').classes("font-semibold")
                     self.components['spiciness_filter'] = ui.select(
-                        options=['Any', 'Not Spicy', 'Mild', 'Medium', 'Hot', 'Very Hot'],
+                        options=self.options['spiciness'],
                         value='Any',
                         on_change=lambda e: self._update_filter('spiciness', e.value if e.value != 'Any' else None)
                     ).props('outlined dense').classes("w-full")
     
+    def update_facets(self, counts: Dict[str, Dict[Any, int]]):
+        """Label every option with the number of results it would yield, e.g. "Desserts (4)"
+        
+        ``counts`` comes from CatalogueIndex.facet_counts; its ``None`` entry is
+        the count shown next to "All"/"Any". Category options are taken from
+        the counts too, so categories added to the catalogue after the page was
+        built show up.
+        """
+        for field, (key, any_value) in self.FACET_SELECTS.items():
+            select = self.components.get(key)
+            if select is None or field not in counts:
+                continue
+            field_counts = counts[field]
+            if field in self.CATALOGUE_FACETS:
+                values = {value for value in field_counts if value is not None}
+                # Keep the picked option even if its last advert is gone
+                if select.value not in (None, any_value):
+                    values.add(select.value)
+                self.options[field] = [any_value] + sorted(values)
+            select.set_options({
+                option: f"{option} ({field_counts.get(None if option == any_value else option, 0)})"
+                for option in self.options[field]
+            }, value=select.value)
+        
+        price_facets = self.components.get('price_facets')
+        if price_facets is not None and 'price_range' in counts:
+            price_facets.text = ' · '.join(
+                f"{bucket}: {count}" for bucket, count in counts['price_range'].items() if bucket is not None
+            )
+    
     def _on_search_change(self, e):
         """Handle search input change with debounce"""
         self.filters['search'] = e.value
@@ -106,32 +154,45 @@ class SearchFilterComponent:
     
     def _trigger_search(self):
         """Trigger search callback"""
-        if self.on_search_callback:
+        if self.on_search_callback and not self._suppressed:
             self.on_search_callback(self.filters.get('search', ''))
     
     def _trigger_filter(self):
         """Trigger filter callback"""
-        if self.on_filter_callback:
+        if self.on_filter_callback and not self._suppressed:
             self.on_filter_callback(self.filters)
     
-    def _clear_filters(self):
+    def _clear_filters(self, notify: bool = True):
         """Clear all filters"""
-        # Reset UI components
-        for key, component in self.components.items():
-            if hasattr(component, 'value'):
-                if key == 'search_input':
-                    component.value = ''
-                elif key in ['category_filter', 'dietary_filter', 'spiciness_filter']:
-                    component.value = 'All' if key == 'category_filter' else 'Any'
-                elif key in ['min_price', 'max_price']:
-                    component.value = None
+        # Resetting each component fires its on_change; hold the callbacks
+        # back so the page re-renders once, not once per component
+        self._suppressed = True
+        try:
+            for key, component in self.components.items():
+                if hasattr(component, 'value'):
+                    if key == 'search_input':
+                        component.value = ''
+                    elif key in ['category_filter', 'dietary_filter', 'spiciness_filter']:
+                        component.value = 'All' if key == 'category_filter' else 'Any'
+                    elif key in ['min_price', 'max_price']:
+                        component.value = None
+        finally:
+            self._suppressed = False
         
         # Clear filters
         self.filters = {}
         
         # Trigger callbacks
-        self._trigger_search()
-        self._trigger_filter()
+        if notify:
+            self._trigger_search()
+            self._trigger_filter()
+    
+    def clear(self, notify: bool = True):
+        """Reset every filter, e.g. from a page's own reset button
+        
+        Pass ``notify=False`` when the caller re-renders itself afterwards.
+        """
+        self._clear_filters(notify)
     
     def get_current_filters(self) -> Dict[str, Any]:
         """Get current filter state"""
@@ -1,35 +1,83 @@
 import os
 import secrets
+# Imported first so the startup report covers the framework import too
+from utils.lazy_pages import page_registry
 from nicegui import ui, app
+page_registry.mark("nicegui")
 
 # === Import shared components ===
 from components.header import show_header
+from utils.sessions import session_compactor
+from utils.loop_monitor import loop_monitor
+from utils.profiler import profiler
+from utils.tracing import tracer
+from utils.frontend_store import write_behind_store
+from utils.media_cache import media_cache
+from utils.rate_limit import page_limiter, rate_limited
+from utils.static_assets import STATIC_URL, static_bundles
 
-# === Import pages to register routes (via @ui.page) ===
-from pages import home, view_advert
-import pages.signin                 # /sign-in
-import pages.vendor.dashboard       # /vendor/dashboard
-import pages.vendor.add_advert      # /vendor/add_advert
-import pages.vendor.edit_advert     # /vendor/edit_advert/{advert_id}
-import pages.vendor.events          # /vendor/events
+# === Register page routes; each module is imported on the first request to its route ===
+page_registry.register("/sign-in", "pages.signin")
+page_registry.register("/vendor/dashboard", "pages.vendor.dashboard")
+page_registry.register("/vendor/add_advert", "pages.vendor.add_advert")
+page_registry.register("/vendor/edit_advert/{advert_id}", "pages.vendor.edit_advert")
+page_registry.register("/vendor/events", "pages.vendor.events")
+page_registry.register("/advertisements", "pages.advertisement.browse")
+page_registry.register("/advertisement/{advertisement_id}", "pages.advertisement.detail")
+if not page_registry.lazy:
+    # The / and /view_advert routes below load these on their first request otherwise
+    page_registry.module("pages.home")
+    page_registry.module("pages.view_advert")
+# Adds http middleware, which cannot wait for a request
+page_registry.module("pages.diagnostics")   # /diagnostics, /diagnostics/loop, /diagnostics/startup, /metrics
+page_registry.module("pages.media")         # /media/{host}/{path}
+page_registry.mark("app modules")
 
 # === Expose static assets (images, CSS, etc.) ===
 app.add_static_files("/assets", "assets")
+# Page CSS/JS bundles under content-hashed URLs, cached by browsers for good
+app.get(STATIC_URL + "/{path:path}", include_in_schema=False)(static_bundles.response)
+# Fetch remote images and fonts of the media manifest into the local cache
+app.on_startup(media_cache.start)
+
+# === Report how long startup took ===
+app.on_startup(page_registry.print_report)
+
+# === Watch for callbacks that block the event loop ===
+app.on_startup(loop_monitor.start)
+app.on_shutdown(loop_monitor.stop)
+# Sampling profiles per route and UI event, only when PROFILE_DIR is set
+app.on_startup(profiler.start)
+app.on_shutdown(profiler.stop)
+# Spans of page loads and backend calls, only when TRACE_EXPORTER is set
+app.on_shutdown(tracer.close)
+
+# === Expire idle sessions in the background ===
+# Requests keep their session's last-seen time current
+app.middleware("http")(session_compactor.middleware)
+app.on_startup(session_compactor.start)
+app.on_shutdown(session_compactor.stop)
+# Write batched local-store changes before exiting
+app.on_shutdown(write_behind_store.close)
 
 
 # === ROUTES ===
 @ui.page("/")
 def home_page() -> None:
     """Home page route."""
+    home = page_registry.module("pages.home")
     show_header()
     home.show_home_page()
 
 
-@ui.page("/view_advert")
-def view_advert_page() -> None:
+@ui.page("/view_advert", response_timeout=20)
+@rate_limited(page_limiter, page=True)
+async def view_advert_page() -> None:
     """View adverts page route."""
+    view_advert = page_registry.module("pages.view_advert")
     show_header()
-    view_advert.show_view_advert_page()
+    # Allow for the upstream fetch (15 s timeout) before the page must be sent
+    await view_advert.show_view_advert_page()
 
 
 # === START APP ===
@@ -37,10 +85,11 @@ if __name__ in {"__main__", "__mp_main__"}:
     # === STORAGE SECRET CONFIG ===
     # Use environment variable if set, otherwise generate a secure fallback
     STORAGE_SECRET = os.getenv("STORAGE_SECRET") or secrets.token_urlsafe(32)
+    # Workers started by serve.py share one secret so every worker can read the session cookie
     ui.run(
         title="Advertisement Manager",
         favicon="🚀", 
-        reload=True,
-        port=8080,
+        reload=os.getenv("RELOAD", "1") == "1",
+        port=int(os.getenv("PORT", "8080")),
         storage_secret=STORAGE_SECRET
     )
\ No newline at end of file
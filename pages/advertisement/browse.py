@@ -1,7 +1,10 @@
 # pages/advertisements/browse.py
 from nicegui import ui
-from utils.auth import get_token
-import requests
+from components.advert_image import advert_image
+from utils.auth import get_token, get_user_id
+from utils.catalogue_index import listing_indexes
+from utils.rate_limit import page_limiter, rate_limited
+from utils.api import base_url, single_flight
 from typing import List, Dict, Any
 
 class AdvertisementsBrowsePage:
@@ -9,22 +12,24 @@ class AdvertisementsBrowsePage:
     
     def __init__(self):
         self.advertisements: List[Dict[str, Any]] = []
-        self.BACKEND_URL = "https://advertisement-platform-server-2zhr.onrender.com"
+        # This visitor's /api/advertisements listing; it is fetched with their token
+        self.catalogue, self.index = listing_indexes.get(get_user_id())
+        self.BACKEND_URL = base_url
     
-    def load_advertisements(self):
+    async def load_advertisements(self):
         """Load advertisements from backend"""
         token = get_token()
-        headers = {"Authorization": f"Bearer {token}"} if token else {}
-        
         try:
-            response = requests.get(
+            response = await single_flight.fetch(
+                'GET',
                 f"{self.BACKEND_URL}/api/advertisements",
-                headers=headers,
+                token=token,
                 timeout=30
             )
             
             if response.status_code == 200:
-                self.advertisements = [ad for ad in response.json() if ad.get('isAvailable', False)]
+                self.catalogue.ingest(response.json())
+                self.advertisements = self.index.filter({'availability': 'Active'})
                 self.refresh_advertisement_grid()
             else:
                 ui.notify('Failed to load advertisements', type='negative')
@@ -54,10 +59,10 @@ class AdvertisementsBrowsePage:
     
     def create_advertisement_card(self, advert: Dict[str, Any]):
         """Create an advertisement card for browsing"""
-        with ui.card().classes("w-full cursor-pointer hover:shadow-lg transition-all").on_click(lambda ad=advert: ui.navigate.to(f"/advertisement/{ad.get('id')}")):
+        with ui.card().classes("w-full cursor-pointer hover:shadow-lg transition-all").on('click', lambda ad=advert: ui.navigate.to(f"/advertisement/{ad.get('id')}")):
             # Image
-            if advert.get('image'):
-                ui.image(f"data:image/jpeg;base64,{advert['image']}").classes("w-full h-48 object-cover")
+            if advert['imageSrc']:
+                advert_image(advert['imageSrc']).classes("w-full h-48 object-cover")
             else:
                 with ui.column().classes("w-full h-48 bg-gray-100 flex items-center justify-center"):
                     ui.icon('restaurant', size='xl', color='gray')
@@ -69,7 +74,7 @@ class AdvertisementsBrowsePage:
                 
                 # Price and quick info
                 with ui.row().classes("items-center justify-between"):
-                    ui.label(f"GHS {advert.get('price', 0):.2f}").classes("text-green-600 font-bold")
+                    ui.label(advert['priceLabel']).classes("text-green-600 font-bold")
                     
                     if advert.get('preparationTime'):
                         ui.badge(f"{advert.get('preparationTime')}min", color='blue')
@@ -78,7 +83,7 @@ class AdvertisementsBrowsePage:
                 if advert.get('description'):
                     ui.label(advert.get('description')).classes("text-gray-600 text-sm line-clamp-2 mt-2")
     
-    def render(self):
+    async def render(self):
         """Render the browse page"""
         with ui.column().classes("w-full min-h-screen bg-gray-50 p-8"):
             # Header
@@ -89,10 +94,11 @@ class AdvertisementsBrowsePage:
             self.create_advertisement_grid()
         
         # Load data
-        self.load_advertisements()
+        await self.load_advertisements()
 
 @ui.page("/advertisements")
-def advertisements_browse_page():
+@rate_limited(page_limiter, page=True)
+async def advertisements_browse_page():
     """Advertisements browse page"""
     page = AdvertisementsBrowsePage()
-    page.render()
\ No newline at end of file
+    await page.render()
\ No newline at end of file
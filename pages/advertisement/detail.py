@@ -1,6 +1,10 @@
 # pages/advertisement/detail.py
 from nicegui import ui
+from components.advert_image import advert_image
 from utils.auth import get_token
+from utils.adverts import ingest_adverts, ingest_advert
+from utils.api import base_url, single_flight
+from utils.tracing import tracer
 import requests
 from typing import Dict, Any, List, Optional
 
@@ -11,57 +15,59 @@ class AdvertisementDetailPage:
         self.advertisement_id = advertisement_id
         self.advertisement: Optional[Dict[str, Any]] = None
         self.recommended_advertisements: List[Dict[str, Any]] = []
-        self.BACKEND_URL = "https://advertisement-platform-server-2zhr.onrender.com"
+        self.BACKEND_URL = base_url
     
-    def load_advertisement_data(self):
+    async def load_advertisement_data(self):
         """Load advertisement details from backend"""
-        token = get_token()
-        headers = {"Authorization": f"Bearer {token}"} if token else {}
-        
-        try:
-            # Load main advertisement
-            response = requests.get(
-                f"{self.BACKEND_URL}/api/advertisements/{self.advertisement_id}",
-                headers=headers,
-                timeout=30
-            )
+        with tracer.span('load_advertisement_data', **{'advertisement.id': self.advertisement_id}):
+            token = get_token()
+            try:
+                # Load main advertisement
+                response = await single_flight.fetch(
+                    'GET',
+                    f"{self.BACKEND_URL}/api/advertisements/{self.advertisement_id}",
+                    token=token,
+                    timeout=30
+                )
             
-            if response.status_code == 200:
-                self.advertisement = response.json()
-                # Load recommendations after main ad is loaded
-                self.load_recommendations()
-            else:
-                ui.notify('Advertisement not found', type='warning')
+                if response.status_code == 200:
+                    self.advertisement = ingest_advert(response.json())
+                    # Load recommendations after main ad is loaded
+                    await self.load_recommendations()
+                else:
+                    ui.notify('Advertisement not found', type='warning')
                 
-        except requests.exceptions.ConnectionError:
-            ui.notify('Connection error. Please check your internet connection.', type='negative')
-        except requests.exceptions.Timeout:
-            ui.notify('Request timeout. Please try again.', type='negative')
-        except Exception as e:
-            ui.notify(f'Error loading advertisement: {str(e)}', type='negative')
+            except requests.exceptions.ConnectionError:
+                ui.notify('Connection error. Please check your internet connection.', type='negative')
+            except requests.exceptions.Timeout:
+                ui.notify('Request timeout. Please try again.', type='negative')
+            except Exception as e:
+                ui.notify(f'Error loading advertisement: {str(e)}', type='negative')
     
-    def load_recommendations(self):
+    async def load_recommendations(self):
         """Load recommended advertisements based on current ad"""
         if not self.advertisement:
             return
         
         token = get_token()
-        headers = {"Authorization": f"Bearer {token}"} if token else {}
-        
-        try:
-            # Load all advertisements to find recommendations
-            response = requests.get(
-                f"{self.BACKEND_URL}/api/advertisements",
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                all_ads = response.json()
-                self.recommended_advertisements = self.get_recommendations(all_ads)
+        with tracer.span('load_recommendations') as span:
+            try:
+                # Load all advertisements to find recommendations
+                response = await single_flight.fetch(
+                    'GET',
+                    f"{self.BACKEND_URL}/api/advertisements",
+                    token=token,
+                    timeout=30
+                )
                 
-        except Exception as e:
-            print(f"Error loading recommendations: {e}")
+                if response.status_code == 200:
+                    all_ads = ingest_adverts(response.json())
+                    with tracer.span('similarity', **{'adverts.candidates': len(all_ads)}):
+                        self.recommended_advertisements = self.get_recommendations(all_ads)
+                    
+            except Exception as e:
+                span.set_error(f"{type(e).__name__}: {e}")
+                print(f"Error loading recommendations: {e}")
     
     def get_recommendations(self, all_ads: List[Dict[str, Any]], limit: int = 4) -> List[Dict[str, Any]]:
         """Get recommended advertisements based on similarity"""
@@ -73,7 +79,7 @@ class AdvertisementDetailPage:
         
         for ad in all_ads:
             # Skip current advertisement and inactive ads
-            if ad.get('id') == current_ad.get('id') or not ad.get('isAvailable', False):
+            if ad['id'] == current_ad['id'] or not ad['isAvailable']:
                 continue
             
             similarity_score = self.calculate_similarity(current_ad, ad)
@@ -95,15 +101,15 @@ class AdvertisementDetailPage:
                 score += 0.4
         
         # Price similarity (similar price range)
-        price1 = ad1.get('price', 0)
-        price2 = ad2.get('price', 0)
+        price1 = ad1['price']
+        price2 = ad2['price']
         if price1 > 0 and price2 > 0:
             price_ratio = min(price1, price2) / max(price1, price2)
             score += price_ratio * 0.3
         
         # Dietary preferences similarity
-        dietary1 = ad1.get('dietaryInformation', '').lower()
-        dietary2 = ad2.get('dietaryInformation', '').lower()
+        dietary1 = ad1['dietaryInformation'].lower()
+        dietary2 = ad2['dietaryInformation'].lower()
         if dietary1 and dietary2 and any(word in dietary2 for word in dietary1.split()):
             score += 0.2
         
@@ -133,7 +139,7 @@ class AdvertisementDetailPage:
                             ui.badge(ad.get('category'), color='blue').props('rounded')
                         
                         # Price
-                        ui.label(f"GHS {ad.get('price', 0):.2f}").classes("text-2xl font-bold text-green-600")
+                        ui.label(ad['priceLabel']).classes("text-2xl font-bold text-green-600")
                         
                         # Preparation time
                         if ad.get('preparationTime'):
@@ -154,11 +160,11 @@ class AdvertisementDetailPage:
     
     def create_image_gallery(self):
         """Create image gallery section"""
-        if not self.advertisement or not self.advertisement.get('image'):
+        if not self.advertisement or not self.advertisement['imageSrc']:
             return
         
         with ui.column().classes("w-full mb-6"):
-            ui.image(f"data:image/jpeg;base64,{self.advertisement['image']}").classes("w-full h-80 object-cover rounded-lg shadow-md")
+            advert_image(self.advertisement['imageSrc']).classes("w-full h-80 object-cover rounded-lg shadow-md")
     
     def create_details_section(self):
         """Create advertisement details section"""
@@ -254,10 +260,10 @@ class AdvertisementDetailPage:
     
     def create_recommendation_card(self, advert: Dict[str, Any]):
         """Create a recommendation card"""
-        with ui.card().classes("w-full cursor-pointer hover:shadow-lg transition-all duration-300 transform hover:-translate-y-1").on_click(lambda ad=advert: self.navigate_to_advertisement(ad.get('id'))):
+        with ui.card().classes("w-full cursor-pointer hover:shadow-lg transition-all duration-300 transform hover:-translate-y-1").on('click', lambda ad=advert: self.navigate_to_advertisement(ad.get('id'))):
             # Image
-            if advert.get('image'):
-                ui.image(f"data:image/jpeg;base64,{advert['image']}").classes("w-full h-40 object-cover")
+            if advert['imageSrc']:
+                advert_image(advert['imageSrc']).classes("w-full h-40 object-cover")
             else:
                 with ui.column().classes("w-full h-40 bg-gray-100 flex items-center justify-center"):
                     ui.icon('restaurant', size='xl', color='gray')
@@ -270,7 +276,7 @@ class AdvertisementDetailPage:
                 
                 # Price and quick info
                 with ui.row().classes("items-center justify-between"):
-                    ui.label(f"GHS {advert.get('price', 0):.2f}").classes("text-green-600 font-bold")
+                    ui.label(advert['priceLabel']).classes("text-green-600 font-bold")
                     
                     # Quick info badges
                     with ui.row().classes("items-center gap-1"):
@@ -334,12 +340,12 @@ class AdvertisementDetailPage:
             ui.label('The advertisement you are looking for does not exist or has been removed.').classes("text-gray-600 mb-4")
             ui.button('Back to Browse', on_click=lambda: ui.navigate.to('/advertisements'), icon='arrow_back').props('unelevated')
     
-    def render(self):
+    async def render(self):
         """Render the detail page"""
         # Load data first
-        self.load_advertisement_data()
+        await self.load_advertisement_data()
         
-        with ui.column().classes("w-full min-h-screen bg-gray-50 p-4 md:p-8"):
+        with tracer.span('build_elements'), ui.column().classes("w-full min-h-screen bg-gray-50 p-4 md:p-8"):
             # Back button at top
             with ui.row().classes("w-full max-w-6xl mx-auto mb-4"):
                 ui.button('← Back', on_click=lambda: ui.navigate.to('/advertisements'), icon='arrow_back').props('flat')
@@ -362,7 +368,7 @@ class AdvertisementDetailPage:
                 self.create_action_buttons()
 
 @ui.page("/advertisement/{advertisement_id}")
-def advertisement_detail_page(advertisement_id: str):
+async def advertisement_detail_page(advertisement_id: str):
     """Advertisement detail page route"""
     page = AdvertisementDetailPage(advertisement_id)
-    page.render()
\ No newline at end of file
+    await page.render()
\ No newline at end of file
@@ -0,0 +1,133 @@
+import hmac
+import os
+import time
+from datetime import datetime
+
+from nicegui import app, ui
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+
+from utils.lazy_pages import page_registry
+from utils.loop_monitor import loop_monitor
+from utils.metrics import metrics, page_route
+from utils.tracing import tracer
+
+# Lets a scraper on another host read /metrics with "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+
+def is_local(request: Request) -> bool:
+    # Behind a proxy on the same host every peer is loopback; forwarded requests come from outside
+    host = request.client.host if request.client else None
+    return host in ('127.0.0.1', '::1') and 'x-forwarded-for' not in request.headers
+
+
+def _not_found() -> PlainTextResponse:
+    return PlainTextResponse('Not Found', status_code=404)
+
+
+@app.middleware('http')
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    route = page_route(request.url.path) if request.method == 'GET' else None
+    if route is not None:
+        metrics.observe_page(route, response.status_code, elapsed)
+    elif response.headers.get('content-type', '').startswith('image/'):
+        # Static files carry their length; streamed bodies without it are not counted
+        length = response.headers.get('content-length')
+        if length:
+            path = request.url.path
+            source = 'assets' if path.startswith('/assets/') else 'media' if path.startswith('/media/') else 'other'
+            metrics.add_image_bytes(source, int(length))
+    return response
+
+
+@app.middleware('http')
+async def trace_page_requests(request: Request, call_next):
+    """Root span per page request; continues the caller's trace when it sends a traceparent"""
+    route = page_route(request.url.path) if request.method == 'GET' and tracer.enabled else None
+    if route is None:
+        return await call_next(request)
+    with tracer.span(f'GET {route}', kind='SERVER', traceparent=request.headers.get('traceparent'),
+                     **{'http.request.method': 'GET', 'http.route': route, 'url.path': request.url.path}) as span:
+        response = await call_next(request)
+        span.set_attribute('http.response.status_code', response.status_code)
+        return response
+
+
+@app.get('/metrics')
+async def prometheus_metrics(request: Request):
+    """Prometheus text exposition; local clients, or remote ones presenting METRICS_TOKEN"""
+    authorization = request.headers.get('authorization', '')
+    if not is_local(request) and not (
+            METRICS_TOKEN and hmac.compare_digest(authorization, f'Bearer {METRICS_TOKEN}')):
+        return _not_found()
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4')
+
+
+@app.get('/diagnostics/loop')
+def loop_diagnostics(request: Request):
+    """Event-loop lag and slow-callback histograms as JSON, for local clients only"""
+    if not is_local(request):
+        return _not_found()
+    return JSONResponse(loop_monitor.snapshot())
+
+
+@app.get('/diagnostics/startup')
+def startup_diagnostics(request: Request):
+    """Startup phase timings and page-module import times as JSON, for local clients only"""
+    if not is_local(request):
+        return _not_found()
+    return JSONResponse(page_registry.report())
+
+
+def _histogram_rows(histograms):
+    rows = []
+    for name, h in histograms.items():
+        rows.append({'name': name, 'count': h['count'], 'p50': f"{h['p50'] * 1000:.0f}",
+                     'p95': f"{h['p95'] * 1000:.0f}", 'p99': f"{h['p99'] * 1000:.0f}",
+                     'max': f"{h['max'] * 1000:.0f}"})
+    return rows
+
+
+@ui.page('/diagnostics')
+def show_diagnostics_page(request: Request):
+    if not is_local(request):
+        return _not_found()
+
+    columns = [{'name': key, 'label': label, 'field': key, 'align': 'left' if key == 'name' else 'right'}
+               for key, label in (('name', ''), ('count', 'Count'), ('p50', 'p50 ms'), ('p95', 'p95 ms'),
+                                  ('p99', 'p99 ms'), ('max', 'Max ms'))]
+
+    @ui.refreshable
+    def render():
+        snapshot = loop_monitor.snapshot()
+        ui.label(f"Lag sampled every {snapshot['interval'] * 1000:.0f} ms; callbacks over "
+                 f"{snapshot['threshold'] * 1000:.0f} ms are recorded").classes("text-gray-600")
+
+        ui.label('Event loop').classes("text-xl font-bold text-green-800 mt-4")
+        ui.table(columns=columns, rows=_histogram_rows({
+            'Loop lag': snapshot['lag'], 'Slow callbacks': snapshot['slow_callbacks'],
+        })).classes("w-full")
+        with ui.expansion('Lag buckets', icon='bar_chart').classes("w-full"):
+            for bound, count in snapshot['lag']['buckets'].items():
+                ui.label(f"<= {bound} s: {count}").classes("text-sm font-mono")
+
+        ui.label('Slow callbacks by route').classes("text-xl font-bold text-green-800 mt-4")
+        ui.table(columns=columns, rows=_histogram_rows(snapshot['slow_by_route'])).classes("w-full")
+
+        ui.label('Recent slow callbacks').classes("text-xl font-bold text-green-800 mt-4")
+        if not snapshot['recent']:
+            ui.label('None so far').classes("text-gray-500")
+        for record in snapshot['recent']:
+            at = datetime.fromtimestamp(record['at']).strftime('%H:%M:%S')
+            where = ' '.join(part for part in (record['route'], record['element']) if part) or 'unknown'
+            with ui.expansion(f"{at}  {record['duration'] * 1000:.0f} ms  {where}").classes("w-full"):
+                ui.code(record['stack'] or 'The loop recovered before a stack could be taken').classes("w-full")
+
+    with ui.column().classes("w-full max-w-5xl mx-auto p-6"):
+        ui.label('Diagnostics').classes("text-3xl font-bold text-green-800")
+        render()
+    ui.timer(5.0, render.refresh)
@@ -1,169 +1,33 @@
 from nicegui import ui
 from components.footer import show_footer
+from utils.media_cache import media_url
+from utils.static_assets import static_bundles
 import time
 
 def show_home_page():
-    # Load Google Fonts and modern custom styles
-    ui.add_head_html('''
-        <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap" rel="stylesheet">
-        <link href="https://fonts.googleapis.com/css2?family=Playfair+Display:wght@400;600;700&display=swap" rel="stylesheet">
-        <style>
-            html, body {
-                margin: 0;
-                padding: 0;
-                height: 100%;
-                width: 100%;
-                overflow-x: hidden;
-                font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-                scroll-behavior: smooth;
-            }
-            
-            .hero-section {
-                min-height: 100vh;
-                width: 100%;
-                background: linear-gradient(135deg, #0f172a 0%, #1e293b 25%, #077d16 75%, #065a11 100%);
-                position: relative;
-                margin: 0;
-                padding: 0;
-                overflow: hidden;
-            }
-            
-            .hero-bg-slideshow {
-                position: absolute;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                z-index: 0;
-            }
-            
-            .hero-bg-slide {
-                position: absolute;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                opacity: 0;
-                transition: opacity 1.5s ease-in-out;
-                background-size: cover;
-                background-position: center;
-                background-repeat: no-repeat;
-            }
-            
-            .hero-bg-slide.active {
-                opacity: 1;
-            }
-            
-            .section-bg {
-                background: linear-gradient(180deg, #ffffff 0%, #f8fafc 50%, #f1f5f9 100%);
-            }
-            
-            .glass-card {
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(20px);
-                border: 1px solid rgba(255, 255, 255, 0.2);
-                box-shadow: 0 25px 50px -12px rgba(0, 0, 0, 0.1);
-            }
-            
-            .card-hover {
-                transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-            }
-            
-            .card-hover:hover {
-                transform: translateY(-12px) scale(1.02);
-                box-shadow: 0 35px 60px -12px rgba(0, 0, 0, 0.15);
-            }
-            
-            .gradient-text {
-                background: linear-gradient(135deg, #077d16, #10b981, #34d399);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .floating-animation {
-                animation: float 6s ease-in-out infinite;
-            }
-            
-            @keyframes float {
-                0%, 100% { transform: translateY(0px); }
-                50% { transform: translateY(-20px); }
-            }
-            
-            .pulse-glow {
-                animation: pulse-glow 2s ease-in-out infinite alternate;
-            }
-            
-            @keyframes pulse-glow {
-                from { box-shadow: 0 0 20px rgba(7, 125, 22, 0.3); }
-                to { box-shadow: 0 0 40px rgba(7, 125, 22, 0.6); }
-            }
-            
-            .modern-button {
-                background: linear-gradient(135deg, #077d16, #10b981);
-                border: none;
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .modern-button::before {
-                content: '';
-                position: absolute;
-                top: 0;
-                left: -100%;
-                width: 100%;
-                height: 100%;
-                background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-                transition: left 0.5s;
-            }
-            
-            .modern-button:hover::before {
-                left: 100%;
-            }
-        </style>
-    ''')
+    # Fonts, styles and the slideshow script come from cached bundles
+    static_bundles.include('css/home.css')
+    static_bundles.include('js/home.js')
 
     # === HERO SECTION ===
     with ui.element("div").classes("hero-section w-full flex flex-col items-center justify-center text-center px-6 relative"):
         
-        # Custom JavaScript slideshow implementation
-        ui.add_head_html('''
-            <script>
-            document.addEventListener('DOMContentLoaded', function() {
-                const slides = document.querySelectorAll('.hero-bg-slide');
-                let currentSlide = 0;
-                
-                function showSlide(n) {
-                    slides.forEach(slide => slide.classList.remove('active'));
-                    currentSlide = (n + slides.length) % slides.length;
-                    slides[currentSlide].classList.add('active');
-                }
-                
-                // Start slideshow
-                showSlide(0);
-                setInterval(() => {
-                    showSlide(currentSlide + 1);
-                }, 5000); // Change slide every 5 seconds
-            });
-            </script>
-        ''')
-        
         # Background slideshow with multiple food images
         with ui.element('div').classes('hero-bg-slideshow'):
             # Slide 1
-            with ui.element('div').classes('hero-bg-slide active').style('background-image: url("https://cdn.pixabay.com/photo/2019/04/26/07/14/store-4156934_1280.jpg")'):
+            with ui.element('div').classes('hero-bg-slide active').style(f'background-image: url("{media_url("https://cdn.pixabay.com/photo/2019/04/26/07/14/store-4156934_1280.jpg")}")'):
                 pass
             # Slide 2
-            with ui.element('div').classes('hero-bg-slide').style('background-image: url("https://cdn.pixabay.com/photo/2017/12/09/08/18/pizza-3007395_1280.jpg")'):
+            with ui.element('div').classes('hero-bg-slide').style(f'background-image: url("{media_url("https://cdn.pixabay.com/photo/2017/12/09/08/18/pizza-3007395_1280.jpg")}")'):
                 pass
             # Slide 3
-            with ui.element('div').classes('hero-bg-slide').style('background-image: url("https://cdn.pixabay.com/photo/2016/11/29/05/45/architecture-1867187_1280.jpg")'):
+            with ui.element('div').classes('hero-bg-slide').style(f'background-image: url("{media_url("https://cdn.pixabay.com/photo/2016/11/29/05/45/architecture-1867187_1280.jpg")}")'):
                 pass
             # Slide 4
-            with ui.element('div').classes('hero-bg-slide').style('background-image: url("https://cdn.pixabay.com/photo/2017/01/26/02/06/platter-2009590_1280.jpg")'):
+            with ui.element('div').classes('hero-bg-slide').style(f'background-image: url("{media_url("https://cdn.pixabay.com/photo/2017/01/26/02/06/platter-2009590_1280.jpg")}")'):
                 pass
             # Slide 5
-            with ui.element('div').classes('hero-bg-slide').style('background-image: url("https://cdn.pixabay.com/photo/2018/07/14/15/27/cafe-3537801_1280.jpg")'):
+            with ui.element('div').classes('hero-bg-slide').style(f'background-image: url("{media_url("https://cdn.pixabay.com/photo/2018/07/14/15/27/cafe-3537801_1280.jpg")}")'):
                 pass
 
         # Dark overlay for better text readability
@@ -232,7 +96,7 @@ def show_home_page():
                 
                 for category in categories:
                     with ui.card().classes("flex-shrink-0 w-64 cursor-pointer card-hover bg-white rounded-2xl border border-gray-100 shadow-lg overflow-hidden"):
-                        ui.image(category["image"]).classes("w-full h-32 object-cover")
+                        ui.image(media_url(category["image"])).classes("w-full h-32 object-cover")
                         with ui.card_section().classes("p-4"):
                             ui.label(category["name"]).classes("text-base font-semibold text-gray-900 text-center")
 
@@ -271,7 +135,7 @@ def show_home_page():
                 
                 for restaurant in restaurants:
                     with ui.card().classes("w-96 card-hover glass-card overflow-hidden rounded-3xl border-0 shadow-2xl"):
-                        ui.image(restaurant["image"]).classes("w-full h-64 object-cover")
+                        ui.image(media_url(restaurant["image"])).classes("w-full h-64 object-cover")
                         with ui.card_section().classes("p-8"):
                             ui.label(restaurant["name"]).classes("text-2xl font-bold text-gray-900 mb-3")
                             ui.label(restaurant["cuisine"]).classes("text-green-600 font-semibold mb-4 text-lg")
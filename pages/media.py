@@ -0,0 +1,29 @@
+import logging
+
+from nicegui import app, run
+from starlette.requests import Request
+from starlette.responses import FileResponse, PlainTextResponse, RedirectResponse
+
+from utils.media_cache import MEDIA_CACHE_CONTROL, MEDIA_URL, media_cache, remote_url
+
+logger = logging.getLogger(__name__)
+
+
+@app.get(MEDIA_URL + '/{host}/{path:path}', include_in_schema=False)
+async def proxied_media(request: Request, host: str, path: str):
+    """Remote image or font from the local cache, fetched once on the first request"""
+    url = remote_url(host, path, request.url.query)
+    if url is None:
+        return PlainTextResponse('Not Found', status_code=404)
+    cached = media_cache.lookup(url)
+    if cached is None:
+        import requests
+        try:
+            cached = await run.io_bound(media_cache.get, url)
+        except (requests.RequestException, OSError) as e:
+            logger.warning('Media proxy could not fetch %s: %s', url, e)
+        if cached is None:
+            # The browser may still reach the host the server cannot
+            return RedirectResponse(url, status_code=307)
+    local, content_type = cached
+    return FileResponse(local, media_type=content_type, headers={'Cache-Control': MEDIA_CACHE_CONTROL})
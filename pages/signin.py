@@ -1,5 +1,6 @@
-from nicegui import ui
+from nicegui import run, ui
 from utils.auth import api_login, api_signup, set_session
+from utils.rate_limit import login_limiter, rate_limited
 from components.footer import show_footer
 
 
@@ -29,7 +30,8 @@ def show_sign_in_page():
                     email = ui.input('Email').props('outlined dense').classes('w-full mb-4')
                     password = ui.input('Password').props('outlined dense type=password').classes('w-full mb-6')
 
-                    def on_login():
+                    @rate_limited(login_limiter)
+                    async def on_login():
                         if not email.value or not password.value:
                             ui.notify('Please enter email and password', type='warning')
                             return
@@ -38,7 +40,8 @@ def show_sign_in_page():
                         loading = ui.spinner(size='lg').classes('mt-4')
                         
                         try:
-                            success, msg, token, user_id, role, name = api_login(email.value, password.value)
+                            # The upstream call and the local password check run off the event loop
+                            success, msg, token, user_id, role, name = await run.io_bound(api_login, email.value, password.value)
                             loading.visible = False
 
                             if not success:
@@ -67,7 +70,8 @@ def show_sign_in_page():
                     password_su = ui.input('Password').props('outlined dense type=password').classes('w-full mb-4')
                     role = ui.select(['user', 'vendor'], value='user', label='Role').props('outlined dense').classes('w-full mb-6')
 
-                    def on_signup():
+                    @rate_limited(login_limiter)
+                    async def on_signup():
                         if not name.value or not email_su.value or not password_su.value or not role.value:
                             ui.notify('All fields are required', type='warning')
                             return
@@ -76,7 +80,8 @@ def show_sign_in_page():
                         loading = ui.spinner(size='lg').classes('mt-4')
                         
                         try:
-                            success, msg, token, user_id = api_signup(name.value, email_su.value, password_su.value, role.value)
+                            success, msg, token, user_id = await run.io_bound(
+                                api_signup, name.value, email_su.value, password_su.value, role.value)
                             loading.visible = False
 
                             if not success:
@@ -1,85 +1,86 @@
 from nicegui import ui
-import requests
-from utils.api import base_url
+from utils.api import base_url, single_flight, upstream
 from components.footer import show_footer
 from utils.auth import get_role, get_user_id, get_token
+from utils.catalogue import catalogue
+from utils.search_cache import search_memo
+from utils.autocomplete import suggestion_index
+from utils.search import AISearchEngine
+from utils.fuzzy import fuzzy_index
+from utils.catalogue_index import catalogue_index
+from utils.query_parser import merge_filters
+from components.search_filter import SearchFilterComponent
+from components.advert_image import advert_image
+from utils.rate_limit import rate_limited, search_limiter
+from utils.tracing import tracer
+from utils.static_assets import static_bundles
 
-# AI Search Engine Class
-class AISearchEngine:
-    def __init__(self):
-        self.synonyms = {
-            'cheap': ['affordable', 'budget', 'inexpensive'],
-            'expensive': ['pricey', 'costly', 'high end'],
-            'quick': ['fast', 'speedy'],
-            'romantic': ['intimate', 'cozy'],
-            'family': ['kids', 'children'],
-        }
-        
-        self.price_ranges = {
-            'cheap': (0, 15),
-            'affordable': (10, 25),
-            'moderate': (20, 40),
-            'expensive': (35, 1000),
-        }
+
+def get_related_adverts(current_advert, adverts, count=3):
+    """Adverts sharing the category or price band of ``current_advert``, best matches first"""
+    current_price = current_advert['price']
+    current_category = current_advert['category'] or 'General'
     
-    def expand_query(self, query):
-        if not query or len(query.strip()) < 2:
-            return [query.lower()] if query else ['']
-        
-        query = query.lower().strip()
-        expanded_queries = [query]
-        
-        for term, synonyms in self.synonyms.items():
-            if term in query:
-                for synonym in synonyms:
-                    new_query = query.replace(term, synonym)
-                    expanded_queries.append(new_query)
+    related = []
+    for r in adverts:
+        if r['id'] == current_advert['id']:
+            continue
+            
+        score = 0
+        if r['category'] == current_category:
+            score += 2
         
-        return list(set(expanded_queries))
+        price_diff = abs(r['price'] - current_price)
+        if price_diff <= 5:
+            score += 2
+        elif price_diff <= 15:
+            score += 1
+            
+        if score > 0:
+            related.append((score, r))
     
-    def intelligent_search(self, query, adverts):
-        if not query or len(query.strip()) < 2:
-            return adverts
-        
-        original_query = query.lower().strip()
-        expanded_queries = self.expand_query(original_query)
-        
-        scored_results = []
+    related.sort(key=lambda x: x[0], reverse=True)
+    return [r[1] for r in related[:count]]
+
+
+def advert_card(r, on_details):
+    """One result card; ``on_details`` is called with the advert when View Details is clicked"""
+    with ui.card().classes("w-80 bg-gradient-to-br from-green-50 to-emerald-50 border-2 border-green-200 shadow-lg hover:shadow-xl hover:border-green-300 transition-all duration-300 transform hover:-translate-y-1 rounded-2xl p-4"):
+        # Image section
+        if r['imageSrc']:
+            advert_image(r['imageSrc']).classes("rounded-xl h-40 w-full object-cover mb-4 shadow-md")
+        else:
+            with ui.element('div').classes('h-40 w-full bg-gradient-to-br from-green-200 to-emerald-300 rounded-xl flex items-center justify-center mb-4 shadow-md'):
+                ui.icon('restaurant', size='xl', color='white')
         
-        for advert in adverts:
-            score = 0
-            advert_text = f"{advert.get('name', '')} {advert.get('description', '')}".lower()
-            
-            if original_query in advert_text:
-                score += 10
+        # Content section
+        with ui.column().classes('w-full'):
+            # Name and price row
+            with ui.row().classes('w-full justify-between items-start mb-2'):
+                ui.label(r["name"]).classes("text-xl font-bold text-green-900 truncate flex-1")
+                ui.label(r['priceTag']).classes("text-2xl font-bold text-green-600 bg-green-100 px-3 py-1 rounded-full")
             
-            for expanded_query in expanded_queries:
-                if expanded_query in advert_text:
-                    score += 5
+            # Description
+            ui.label(r['shortDescription']).classes("text-green-700 text-sm mb-4 leading-relaxed")
             
-            query_words = set(original_query.split())
-            advert_words = set(advert_text.split())
-            common_words = query_words.intersection(advert_words)
-            score += len(common_words) * 2
-            
-            if score > 0:
-                scored_results.append((score, advert))
-        
-        scored_results.sort(key=lambda x: x[0], reverse=True)
-        return [result[1] for result in scored_results]
+            # View Details button
+            ui.button("View Details", on_click=lambda advert=r: on_details(advert), icon='visibility') \
+             .classes("w-full bg-gradient-to-r from-green-500 to-emerald-500 text-white font-semibold py-3 rounded-xl hover:from-green-600 hover:to-emerald-600 transition-all shadow-lg") \
+             .props('unelevated')
 
-def show_view_advert_page():
+
+async def show_view_advert_page():
     try:
-        response = requests.get(f"{base_url}/food/all", timeout=15)
+        # Concurrent page loads await one shared upstream request
+        response = await single_flight.fetch('GET', f"{base_url}/food/all", timeout=15)
         if 200 <= response.status_code < 300:
-            json_data = response.json()
-            restaurants = json_data.get("data", [])
+            catalogue.ingest(response.json())
+            # Start the typo index build now rather than on the first keystroke
+            fuzzy_index.refresh()
         else:
             ui.notify('Failed to load adverts', type='negative')
-            restaurants = []
     except Exception as e:
         ui.notify(f'Error loading adverts: {e}', type='negative')
-        restaurants = []
 
     # Green themed page header
     with ui.column().classes('w-full items-center mb-6'):
@@ -88,6 +89,7 @@ def show_view_advert_page():
 
     # Initialize AI search engine
     ai_engine = AISearchEngine()
+    filter_panel = SearchFilterComponent(on_filter_callback=lambda _: render_cards())
 
     # Define functions first
     def render_cards():
@@ -96,20 +98,38 @@ def show_view_advert_page():
         min_val = min_price.value or 0
         max_val = max_price.value or 1000
         
-        # Use AI search for meaningful queries
-        if query.strip() and len(query.strip()) > 1:
-            filtered = ai_engine.intelligent_search(query, restaurants)
-            search_info.text = f"🤖 Found {len(filtered)} results for '{query}'"
-        else:
-            filtered = restaurants
-            search_info.text = f"🍴 Showing all {len(filtered)} restaurants"
+        is_search = bool(query.strip()) and len(query.strip()) > 1
         
-        # Apply price filter
-        final_filtered = []
-        for r in filtered:
-            price = r.get('price', 0)
-            if min_val <= price <= max_val:
-                final_filtered.append(r)
+        # Repeated queries are served from the shared memo
+        # Results found before the typo index caught up must not outlive it
+        version = (catalogue.version, fuzzy_index.version)
+        memo_key = search_memo.key(version, query if is_search else '')
+        memoized = search_memo.get(memo_key)
+        if memoized is None:
+            if is_search:
+                # Price/dietary/spiciness/category intents narrow the set before text scoring
+                with tracer.span('search', **{'search.query_length': len(query)}) as span:
+                    found = ai_engine.search(query)
+                    span.set_attribute('search.results', len(found))
+                memoized = (tuple(r['id'] for r in found), catalogue_index.bitmap_of(found))
+            else:
+                memoized = ((), catalogue_index.evaluate(None))
+            search_memo.put(memo_key, memoized)
+        result_ids, base = memoized
+        
+        # Price inputs and advanced filters are bitmap ANDs over the query's result set
+        filters = merge_filters({'price_range': {'min': min_val, 'max': max_val}},
+                                filter_panel.get_current_filters())
+        selected = base & catalogue_index.evaluate(filters)
+        filter_panel.update_facets(catalogue_index.facet_counts(base, filters))
+        match_count = selected.bit_count()
+        
+        if is_search:
+            search_info.text = f"🤖 Found {match_count} results for '{query}'"
+            final_filtered = catalogue_index.select(catalogue.lookup(result_ids), selected)
+        else:
+            search_info.text = f"🍴 Showing all {match_count} restaurants"
+            final_filtered = catalogue_index.records(selected)
         
         if not final_filtered:
             with results_container:
@@ -122,40 +142,26 @@ def show_view_advert_page():
                      .classes('bg-green-500 text-white hover:bg-green-600')
             return
         
-        for r in final_filtered:
-            with results_container:
-                with ui.card().classes("w-80 bg-gradient-to-br from-green-50 to-emerald-50 border-2 border-green-200 shadow-lg hover:shadow-xl hover:border-green-300 transition-all duration-300 transform hover:-translate-y-1 rounded-2xl p-4"):
-                    # Image section
-                    if r.get("image"):
-                        ui.image(r["image"]).classes("rounded-xl h-40 w-full object-cover mb-4 shadow-md")
-                    else:
-                        with ui.element('div').classes('h-40 w-full bg-gradient-to-br from-green-200 to-emerald-300 rounded-xl flex items-center justify-center mb-4 shadow-md'):
-                            ui.icon('restaurant', size='xl', color='white')
-                    
-                    # Content section
-                    with ui.column().classes('w-full'):
-                        # Name and price row
-                        with ui.row().classes('w-full justify-between items-start mb-2'):
-                            ui.label(r["name"]).classes("text-xl font-bold text-green-900 truncate flex-1")
-                            ui.label(f"${r.get('price', 'N/A')}").classes("text-2xl font-bold text-green-600 bg-green-100 px-3 py-1 rounded-full")
-                        
-                        # Description
-                        desc = r["description"][:80] + "..." if len(r.get("description", "")) > 80 else r.get("description", "")
-                        ui.label(desc).classes("text-green-700 text-sm mb-4 leading-relaxed")
-                        
-                        # View Details button
-                        ui.button("View Details", on_click=lambda advert=r: show_advert_modal(advert), icon='visibility') \
-                         .classes("w-full bg-gradient-to-r from-green-500 to-emerald-500 text-white font-semibold py-3 rounded-xl hover:from-green-600 hover:to-emerald-600 transition-all shadow-lg") \
-                         .props('unelevated')
+        with results_container:
+            for r in final_filtered:
+                advert_card(r, on_details=show_advert_modal)
 
     def set_search(suggestion):
         search_box.value = suggestion
+        suggestion_index.record_search(suggestion)
+        render_cards()
+
+    @rate_limited(search_limiter, defer=True)
+    def on_search_input():
+        # Live suggestions from advert names, categories and vendors
+        search_box.set_autocomplete(suggestion_index.suggest(search_box.value))
         render_cards()
 
     def reset_filters():
         search_box.value = ""
         min_price.value = 0
         max_price.value = 100
+        filter_panel.clear(notify=False)
         render_cards()
 
     # Green themed search and filter section
@@ -204,6 +210,9 @@ def show_view_advert_page():
                     ui.button("Reset Filters", on_click=reset_filters, icon='autorenew') \
                      .props('outlined') \
                      .classes('bg-white text-green-600 border-green-400 hover:bg-green-50')
+            
+            # Category, dietary and spiciness filters with result counts
+            filter_panel.create_advanced_filters(catalogue_index.values('category'), include_price=False)
 
     # Search info with green styling
     search_info = ui.label().classes('text-green-700 text-center w-full mb-6 text-lg font-medium')
@@ -219,12 +228,12 @@ def show_view_advert_page():
             # Header with gradient background
             with ui.column().classes('w-full bg-gradient-to-r from-green-500 to-emerald-600 text-white p-6 rounded-t-2xl'):
                 with ui.row().classes('w-full items-center justify-between'):
-                    ui.label(advert.get('name', 'Untitled')).classes('text-2xl font-bold text-white')
+                    ui.label(advert['name'] or 'Untitled').classes('text-2xl font-bold text-white')
                     ui.button(icon='close', on_click=dialog.close).props('flat round dense color="white"')
                 
                 # Quick info bar
                 with ui.row().classes('w-full items-center gap-4 mt-2 flex-wrap'):
-                    ui.label(f"${advert.get('price', 'N/A')}").classes('text-xl font-bold bg-white/20 px-4 py-2 rounded-full')
+                    ui.label(advert['priceTag']).classes('text-xl font-bold bg-white/20 px-4 py-2 rounded-full')
                     if advert.get('category'):
                         ui.label(advert['category']).classes('bg-white/20 px-4 py-2 rounded-full text-sm')
             
@@ -234,8 +243,8 @@ def show_view_advert_page():
                     # Left column - Main details
                     with ui.column().classes('lg:col-span-2 space-y-4'):
                         # Image
-                        if advert.get('image'):
-                            ui.image(advert['image']).classes('w-full h-64 object-cover rounded-xl shadow-lg')
+                        if advert['imageSrc']:
+                            advert_image(advert['imageSrc']).classes('w-full h-64 object-cover rounded-xl shadow-lg')
                         else:
                             with ui.element('div').classes('w-full h-64 bg-gradient-to-br from-green-200 to-emerald-300 rounded-xl flex items-center justify-center'):
                                 ui.icon('restaurant', size='xl', color='white')
@@ -243,28 +252,28 @@ def show_view_advert_page():
                         # Description card
                         with ui.card().classes('w-full bg-white border-green-200 p-6 rounded-xl shadow-sm'):
                             ui.label('📖 Description').classes('font-semibold text-lg text-green-800 mb-3')
-                            ui.label(advert.get('description', 'No description available')).classes('text-green-700 leading-relaxed')
+                            ui.label(advert['description'] or 'No description available').classes('text-green-700 leading-relaxed')
                     
                     # Right column - Related adverts
                     with ui.column().classes('space-y-4'):
                         ui.label('💫 You Might Also Like').classes('font-semibold text-lg text-green-800 border-b-2 border-green-200 pb-2')
                         
-                        related = get_related_adverts(advert)
+                        related = get_related_adverts(advert, catalogue.adverts())
                         if related:
                             for related_advert in related:
                                 with ui.card().classes('p-4 bg-white border-green-200 hover:border-green-400 hover:shadow-lg transition-all cursor-pointer group rounded-xl') \
                                  .on('click', lambda ad=related_advert: (dialog.close(), show_advert_modal(ad))):
                                     
                                     with ui.row().classes('items-center gap-3'):
-                                        if related_advert.get('image'):
-                                            ui.image(related_advert['image']).classes('w-16 h-16 object-cover rounded-lg')
+                                        if related_advert['imageSrc']:
+                                            advert_image(related_advert['imageSrc']).classes('w-16 h-16 object-cover rounded-lg')
                                         else:
                                             with ui.element('div').classes('w-16 h-16 bg-green-200 rounded-lg flex items-center justify-center'):
                                                 ui.icon('fastfood', color='green')
                                         
                                         with ui.column().classes('flex-grow'):
-                                            ui.label(related_advert.get('name', 'Untitled')).classes('font-semibold text-green-900 group-hover:text-green-600')
-                                            ui.label(f"${related_advert.get('price', 'N/A')}").classes('text-green-600 font-bold')
+                                            ui.label(related_advert['name'] or 'Untitled').classes('font-semibold text-green-900 group-hover:text-green-600')
+                                            ui.label(related_advert['priceTag']).classes('text-green-600 font-bold')
                                     
                                     ui.button("View Details", icon='visibility') \
                                      .props('flat dense') \
@@ -306,8 +315,9 @@ def show_view_advert_page():
                                         token = get_token()
                                         headers = {"Authorization": f"Bearer {token}"} if token else {}
                                         try:
-                                            resp = requests.delete(f"{base_url}/food/{advert.get('id')}", headers=headers, timeout=15)
+                                            resp = upstream('DELETE', f"{base_url}/food/{advert.get('id')}", headers=headers, timeout=15)
                                             if 200 <= resp.status_code < 300:
+                                                catalogue.remove(advert['id'])
                                                 ui.notify('✅ Advert deleted successfully', type='positive')
                                                 confirm_dialog.close()
                                                 dialog.close()
@@ -333,36 +343,13 @@ def show_view_advert_page():
         
         dialog.open()
 
-    def get_related_adverts(current_advert, count=3):
-        current_price = current_advert.get('price', 0)
-        current_category = current_advert.get('category', 'General')
-        
-        related = []
-        for r in restaurants:
-            if r.get('id') == current_advert.get('id'):
-                continue
-                
-            score = 0
-            if r.get('category') == current_category:
-                score += 2
-            
-            price_diff = abs(r.get('price', 0) - current_price)
-            if price_diff <= 5:
-                score += 2
-            elif price_diff <= 15:
-                score += 1
-                
-            if score > 0:
-                related.append((score, r))
-        
-        related.sort(key=lambda x: x[0], reverse=True)
-        return [r[1] for r in related[:count]]
-
     # Initial render
     render_cards()
 
     # Event handlers
-    search_box.on('input', lambda e: render_cards())
+    # Keystrokes within 100 ms fold into one search; the trailing event carries the final text
+    search_box.on('input', lambda e: on_search_input(), throttle=0.1)
+    search_box.on('keydown.enter', lambda e: suggestion_index.record_search(search_box.value))
     min_price.on('change', lambda: render_cards())
     max_price.on('change', lambda: render_cards())
     
@@ -370,17 +357,4 @@ def show_view_advert_page():
     show_footer()
 
     # Add green themed CSS
-    ui.add_head_html('''
-    <style>
-        .green-gradient-bg {
-            background: linear-gradient(135deg, #d1fae5 0%, #a7f3d0 100%);
-        }
-        .green-card-hover {
-            transition: all 0.3s ease;
-        }
-        .green-card-hover:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 20px 25px -5px rgba(16, 185, 129, 0.1), 0 10px 10px -5px rgba(16, 185, 129, 0.04);
-        }
-    </style>
-    ''')
\ No newline at end of file
+    static_bundles.include('css/view_advert.css')
\ No newline at end of file
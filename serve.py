@@ -0,0 +1,84 @@
+# serve.py
+"""Start several app workers that share storage, for running behind a load balancer.
+
+    python serve.py --workers 4 --port 8080
+
+Worker N listens on ``port + N``. All workers use the SQLite storage backend
+and the same STORAGE_SECRET, so sessions and the local store are visible to
+every worker. The load balancer must keep each browser on one worker
+(sticky sessions), see "Running several workers" in the README.
+"""
+import argparse
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+
+def worker_env(port: int, secret: str, storage_path: str, profile_dir: Optional[str] = None) -> dict:
+    env = dict(os.environ)
+    env.update({
+        'PORT': str(port),
+        'RELOAD': '0',
+        'STORAGE_BACKEND': 'sqlite',
+        'STORAGE_PATH': storage_path,
+        'STORAGE_SECRET': secret,
+    })
+    if profile_dir:
+        # One directory per worker so workers do not overwrite each other's files
+        env['PROFILE_DIR'] = os.path.join(profile_dir, f'worker-{port}')
+    return env
+
+
+def start_workers(count: int, port: int, storage_path: str,
+                  profile_dir: Optional[str] = None) -> List[subprocess.Popen]:
+    secret = os.getenv('STORAGE_SECRET') or secrets.token_urlsafe(32)
+    main = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    workers = []
+    for n in range(count):
+        env = worker_env(port + n, secret, storage_path, profile_dir)
+        workers.append(subprocess.Popen([sys.executable, main], env=env))
+        print(f'worker {n} (pid {workers[-1].pid}) on port {port + n}')
+    return workers
+
+
+def stop_workers(workers: List[subprocess.Popen], timeout: float = 10) -> None:
+    for worker in workers:
+        if worker.poll() is None:
+            worker.terminate()
+    deadline = time.monotonic() + timeout
+    for worker in workers:
+        try:
+            worker.wait(max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            worker.kill()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Run several Advertisement Manager workers')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='number of worker processes')
+    parser.add_argument('--port', type=int, default=8080, help='port of the first worker')
+    parser.add_argument('--storage', default=os.getenv('STORAGE_PATH', os.path.join('.nicegui', 'storage.sqlite3')),
+                        help='shared SQLite storage file')
+    parser.add_argument('--profile', metavar='DIR', default=os.getenv('PROFILE_DIR'),
+                        help='write sampling profiles of each worker to DIR/worker-<port>')
+    args = parser.parse_args()
+
+    workers = start_workers(args.workers, args.port, args.storage, args.profile)
+    signal.signal(signal.SIGTERM, lambda *_: stop_workers(workers))
+    try:
+        # If one worker dies the balancer would keep routing its sticky sessions to it; stop them all
+        while all(worker.poll() is None for worker in workers):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_workers(workers)
+    return max((worker.returncode or 0) for worker in workers)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
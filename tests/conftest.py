@@ -0,0 +1,15 @@
+import pytest
+from nicegui import app
+from nicegui.storage import Storage
+
+
+@pytest.fixture(autouse=True)
+def nicegui_storage(tmp_path, monkeypatch):
+    """Keep NiceGUI's storage files in a temporary directory.
+
+    The user plugin clears the storage directory around every test, which
+    would otherwise delete the files under ``.nicegui``.
+    """
+    monkeypatch.setattr(Storage, 'path', tmp_path)
+    monkeypatch.setattr(app.storage, '_general', Storage._create_persistent_dict('general'))
+    return tmp_path
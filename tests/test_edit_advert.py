@@ -0,0 +1,49 @@
+import pytest
+from nicegui.testing import User
+
+from pages.vendor import edit_advert
+from utils.api import UpstreamResponse, single_flight
+
+pytestmark = pytest.mark.module_under_test(edit_advert)
+
+ADVERT = {
+    'id': '7',
+    'name': 'Jollof Rice',
+    'description': 'Smoky party jollof',
+    'price': 45,
+    'category': 'Main Course',
+    'vendorId': 'vendor-1',
+}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """Signed-in vendor and a backend that serves ADVERT and records writes"""
+    writes = []
+
+    def fake_upstream(method, url, **kwargs):
+        writes.append((method, url, kwargs))
+        return UpstreamResponse(200, '{}', {})
+
+    monkeypatch.setattr('utils.auth.require_vendor', lambda: True)
+    monkeypatch.setattr('utils.auth.get_token', lambda: 'vendor-token')
+    monkeypatch.setattr('utils.auth.get_user_id', lambda: 'vendor-1')
+    monkeypatch.setattr('utils.api.upstream', fake_upstream)
+
+    async def fake_fetch(method, url, **kwargs):
+        return UpstreamResponse(200, '', ADVERT)
+
+    monkeypatch.setattr(single_flight, 'fetch', fake_fetch)
+    return writes
+
+
+async def test_save_sends_the_changes_with_the_vendor_token(backend, user: User) -> None:
+    await user.open('/vendor/edit_advert/7')
+    user.find('Save Changes →').click()
+    await user.should_see('Advertisement updated successfully!')
+
+    method, url, kwargs = backend[0]
+    assert method == 'PUT'
+    assert url.endswith('/api/food/7')
+    assert kwargs['headers'] == {'Authorization': 'Bearer vendor-token'}
+    assert kwargs['json']['name'] == 'Jollof Rice'
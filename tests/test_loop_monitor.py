@@ -0,0 +1,47 @@
+import asyncio
+import sys
+
+from nicegui import ui
+from nicegui.testing import User
+
+from utils.loop_monitor import describe_frame
+from utils.profiler import profile_name
+
+
+async def test_async_page_is_attributed_to_its_route(user: User) -> None:
+    seen = []
+
+    @ui.page('/async_page')
+    async def async_page():
+        await asyncio.sleep(0)
+        seen.append(describe_frame(sys._getframe()))
+        ui.label('rendered')
+
+    await user.open('/async_page')
+    await user.should_see('rendered')
+    assert seen == [('/async_page', None)]
+    assert profile_name(*seen[0]) == 'async_page'
+
+
+async def test_async_event_handler_is_attributed_to_its_page(user: User) -> None:
+    seen = []
+
+    @ui.page('/async_event')
+    def async_event_page():
+        async def search():
+            await asyncio.sleep(0)
+            seen.append(describe_frame(sys._getframe()))
+            ui.label('searched')
+        ui.button('Search', on_click=search)
+
+    await user.open('/async_event')
+    user.find('Search').click()
+    await user.should_see('searched')
+    route, element = seen[0]
+    assert route == '/async_event'
+    assert element.endswith('search')
+
+
+def test_frames_outside_pages_are_background() -> None:
+    assert describe_frame(sys._getframe()) == (None, None)
+    assert profile_name(None, None) == 'background'
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils import api
+from utils.api import SingleFlight, UpstreamResponse
+
+
+@pytest.fixture
+def slow_backend(monkeypatch):
+    """Backend whose calls block until the returned event is set; counts the calls made"""
+    release = threading.Event()
+    calls = []
+
+    def fake_request(method, url, token, timeout, kwargs):
+        calls.append(url)
+        release.wait(5)
+        return UpstreamResponse(200, '', {'url': url})
+
+    monkeypatch.setattr(api, '_request', fake_request)
+    return release, calls
+
+
+async def test_identical_calls_share_one_request(slow_backend) -> None:
+    release, calls = slow_backend
+    flight = SingleFlight()
+    first = asyncio.create_task(flight.fetch('GET', 'http://backend/food/all'))
+    second = asyncio.create_task(flight.fetch('GET', 'http://backend/food/all'))
+    await asyncio.sleep(0.05)
+    release.set()
+
+    assert (await first).json() == (await second).json() == {'url': 'http://backend/food/all'}
+    assert calls == ['http://backend/food/all']
+    assert (flight.leaders, flight.coalesced) == (1, 1)
+
+
+async def test_cancelled_leader_does_not_cancel_followers(slow_backend) -> None:
+    release, calls = slow_backend
+    flight = SingleFlight()
+    leader = asyncio.create_task(flight.fetch('GET', 'http://backend/food/all'))
+    await asyncio.sleep(0.05)
+    follower = asyncio.create_task(flight.fetch('GET', 'http://backend/food/all'))
+    await asyncio.sleep(0.05)
+    leader.cancel()
+    release.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert (await follower).status_code == 200
+    assert len(calls) == 1
@@ -0,0 +1,25 @@
+import base64
+import json
+
+import pytest
+
+from utils.tokens import TokenError, TokenExpired, decode_token
+
+
+def make_token(claims) -> str:
+    def encode(data) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b'=').decode()
+    return f"{encode({'alg': 'none'})}.{encode(claims)}.{encode('')}"
+
+
+@pytest.mark.parametrize('exp', ['soon', None, [1], {'at': 1}])
+def test_malformed_exp_is_an_invalid_token(exp) -> None:
+    with pytest.raises(TokenError):
+        decode_token(make_token({'sub': 'vendor-1', 'exp': exp}), secret=None)
+
+
+def test_expiry_is_checked_with_leeway() -> None:
+    token = make_token({'sub': 'vendor-1', 'exp': 1000})
+    assert decode_token(token, secret=None, now=1010)['sub'] == 'vendor-1'
+    with pytest.raises(TokenExpired):
+        decode_token(token, secret=None, now=2000)
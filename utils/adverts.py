@@ -0,0 +1,206 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+# --- Canonical advert model ---
+# Every page reads adverts through this shape, whatever the source (``/food/all``,
+# ``/api/advertisements``, ``/api/food/{id}`` or the local ``frontend_store``).
+# Keys follow the camelCase naming the backend uses for new adverts.
+
+FIELD_ALIASES: Dict[str, tuple] = {
+    'id': ('id', '_id'),
+    'name': ('name', 'title'),
+    'description': ('description',),
+    'price': ('price',),
+    'category': ('category',),
+    'ingredients': ('ingredients',),
+    'dietaryInformation': ('dietaryInformation', 'dietary_info', 'dietary_information'),
+    'spicinessLevel': ('spicinessLevel', 'spiciness_level'),
+    'preparationTime': ('preparationTime', 'preparation_time'),
+    'isAvailable': ('isAvailable', 'is_available', 'is_active'),
+    'vendorId': ('vendorId', 'vendor_id', 'owner_id', 'ownerId'),
+    'vendorName': ('vendorName', 'vendor_name'),
+    'image': ('image', 'imageUrl', 'image_url'),
+    'createdAt': ('createdAt', 'created_at'),
+}
+_ALIAS_FIELDS: Dict[str, str] = {alias: key for key, aliases in FIELD_ALIASES.items() for alias in aliases}
+
+# Canonical filter values, matching the options offered by SearchFilterComponent
+DIETARY_TAGS: Dict[str, tuple] = {
+    'Vegetarian': ('vegetarian', 'veggie'),
+    'Vegan': ('vegan', 'plant based', 'plant-based'),
+    'Gluten-Free': ('gluten-free', 'gluten free', 'no gluten'),
+    'Dairy-Free': ('dairy-free', 'dairy free', 'no dairy', 'lactose free', 'lactose-free'),
+}
+SPICINESS_LEVELS = ('Not Spicy', 'Mild', 'Medium', 'Hot', 'Very Hot')
+
+SHORT_DESCRIPTION_LENGTH = 80
+CARD_DESCRIPTION_LENGTH = 120
+LIST_DESCRIPTION_LENGTH = 200
+
+
+def _first(raw: Dict[str, Any], keys: tuple) -> Any:
+    for key in keys:
+        value = raw.get(key)
+        if value is not None and value != '':
+            return value
+    return None
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes')
+    return bool(value)
+
+
+def raw_advert_id(raw: Dict[str, Any]) -> Optional[str]:
+    """Return the id of a raw (not yet normalized) advert"""
+    value = _first(raw, FIELD_ALIASES['id'])
+    return str(value) if value is not None else None
+
+
+def image_src(image: str) -> str:
+    """Return a value usable directly as an ``<img src>``"""
+    if not image:
+        return ''
+    if image.startswith(('http://', 'https://', 'data:', '/')):
+        return image
+    return f"data:image/jpeg;base64,{image}"
+
+
+def truncate(text: str, length: int) -> str:
+    return text[:length] + "..." if len(text) > length else text
+
+
+def dietary_tags(dietary_information: str, category: str = '') -> tuple:
+    """Canonical dietary tags found in free-text dietary information (and a dietary category)"""
+    text = f"{dietary_information} {category}".lower()
+    return tuple(tag for tag, phrases in DIETARY_TAGS.items() if any(p in text for p in phrases))
+
+
+def spiciness_level(value: str) -> str:
+    """Map a free-text spiciness value onto one of SPICINESS_LEVELS ('' when unknown)"""
+    value = value.lower()
+    if not value:
+        return ''
+    if 'not' in value or 'no ' in value or value == 'none':
+        return 'Not Spicy'
+    if 'very' in value or 'extra' in value:
+        return 'Very Hot'
+    for level in ('Mild', 'Medium', 'Hot'):
+        if level.lower() in value:
+            return level
+    return ''
+
+
+def normalize_advert(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a raw advert from any source onto the canonical model"""
+    vendor = raw.get('vendor')
+    advert: Dict[str, Any] = {key: _first(raw, aliases) for key, aliases in FIELD_ALIASES.items()}
+
+    if advert['vendorId'] is None and vendor:
+        advert['vendorId'] = vendor.get('id') if isinstance(vendor, dict) else vendor
+    if advert['vendorName'] is None and isinstance(vendor, dict):
+        advert['vendorName'] = vendor.get('name')
+
+    advert['id'] = str(advert['id']) if advert['id'] is not None else None
+    advert['vendorId'] = str(advert['vendorId']) if advert['vendorId'] is not None else None
+    advert['name'] = str(advert['name'] or '')
+    advert['description'] = str(advert['description'] or '')
+    advert['category'] = advert['category'] or ''
+    advert['ingredients'] = advert['ingredients'] or ''
+    advert['dietaryInformation'] = advert['dietaryInformation'] or ''
+    advert['spicinessLevel'] = advert['spicinessLevel'] or ''
+    advert['vendorName'] = advert['vendorName'] or ''
+    advert['image'] = advert['image'] or ''
+    advert['createdAt'] = str(advert['createdAt'] or '')
+    advert['price'] = _to_float(advert['price'])
+    advert['preparationTime'] = _to_int(advert['preparationTime'])
+    advert['isAvailable'] = _to_bool(advert['isAvailable'])
+
+    derive_fields(advert)
+    return advert
+
+
+# --- Derived-field cache ---
+# Render and search loops read these instead of formatting per card per keystroke.
+# They are computed once at ingest and recomputed by ``apply_changes`` on edit.
+
+DERIVED_FIELDS = (
+    'priceLabel', 'priceTag', 'priceBadge', 'shortDescription', 'cardDescription', 'listDescription',
+    'imageSrc', 'searchText', 'searchTokens', 'fullSearchText', 'dietaryTags', 'spiciness',
+)
+
+
+def derive_fields(advert: Dict[str, Any]) -> Dict[str, Any]:
+    """(Re)compute the derived display and search fields of a canonical advert"""
+    name, description = advert['name'], advert['description']
+    search_text = f"{name} {description}".lower()
+
+    advert['priceLabel'] = f"GHS {advert['price']:.2f}"
+    advert['priceTag'] = f"${advert['price']:g}"
+    advert['priceBadge'] = f"GH₵ {advert['price']:g}"
+    advert['shortDescription'] = truncate(description, SHORT_DESCRIPTION_LENGTH)
+    advert['cardDescription'] = truncate(description or 'No description', CARD_DESCRIPTION_LENGTH)
+    advert['listDescription'] = truncate(description or 'No description', LIST_DESCRIPTION_LENGTH)
+    advert['imageSrc'] = image_src(advert['image'])
+    advert['searchText'] = search_text
+    advert['searchTokens'] = frozenset(search_text.split())
+    # Newline-joined so a dashboard search term never matches across two fields
+    advert['fullSearchText'] = f"{name}\n{description}\n{advert['ingredients']}".lower()
+    # Canonical filter values
+    advert['dietaryTags'] = dietary_tags(advert['dietaryInformation'], advert['category'])
+    advert['spiciness'] = spiciness_level(advert['spicinessLevel'])
+    return advert
+
+
+def apply_changes(advert: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply edits to a canonical advert in place and invalidate its derived fields.
+
+    The dict identity is kept so lists already holding the advert see the update.
+    When ``changes`` holds several aliases of one field, the last one written wins.
+    """
+    merged = {key: value for key, value in advert.items() if key not in DERIVED_FIELDS}
+    for key, value in changes.items():
+        field = _ALIAS_FIELDS.get(key)
+        if field is not None:
+            for alias in FIELD_ALIASES[field]:
+                merged.pop(alias, None)
+        merged[key] = value
+    updated = normalize_advert(merged)
+    advert.clear()
+    advert.update(updated)
+    return advert
+
+
+def ingest_adverts(payload: Any) -> List[Dict[str, Any]]:
+    """Normalize a fetched advert list; accepts a bare list or a ``{'data': [...]}`` envelope"""
+    if isinstance(payload, dict):
+        payload = payload.get('data') or []
+    return [normalize_advert(raw) for raw in (payload or []) if isinstance(raw, dict)]
+
+
+def ingest_advert(payload: Any) -> Optional[Dict[str, Any]]:
+    """Normalize a single fetched advert, unwrapping a ``{'data': {...}}`` envelope"""
+    if isinstance(payload, dict) and isinstance(payload.get('data'), dict):
+        payload = payload['data']
+    if not isinstance(payload, dict):
+        return None
+    return normalize_advert(payload)
+
+
+def filter_by_vendor(adverts: Iterable[Dict[str, Any]], vendor_id: Optional[str]) -> List[Dict[str, Any]]:
+    vendor_id = str(vendor_id) if vendor_id is not None else None
+    return [ad for ad in adverts if ad['vendorId'] == vendor_id]
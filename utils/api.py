@@ -1 +1,126 @@
-base_url = "https://advertisement-platform-server-2zhr.onrender.com"
\ No newline at end of file
+import asyncio
+import contextvars
+import hashlib
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Optional, Tuple
+
+from nicegui import run
+
+from .metrics import metrics, upstream_endpoint
+from .tracing import tracer
+
+if TYPE_CHECKING:
+    import requests
+
+# Point at a local stand-in with BACKEND_URL=http://127.0.0.1:9000 (see benchmarks/mock_backend.py)
+base_url = os.getenv("BACKEND_URL", "https://advertisement-platform-server-2zhr.onrender.com").rstrip("/")
+
+# Only calls without side effects may be shared between callers
+COALESCED_METHODS = {'GET', 'HEAD'}
+
+
+class UpstreamResponse:
+    """Status and parsed body of an upstream call; one instance is shared by every coalesced caller"""
+
+    def __init__(self, status_code: int, text: str, data: Any):
+        self.status_code = status_code
+        self.text = text
+        self._data = data
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    def json(self) -> Any:
+        if self._data is None:
+            raise ValueError('Response body is not JSON')
+        return self._data
+
+
+def request_key(method: str, url: str, token: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> Tuple:
+    # Responses may differ per user, so the token is part of the key (hashed, never kept in clear)
+    scope = hashlib.sha256(token.encode()).hexdigest()[:16] if token else 'anonymous'
+    return (method.upper(), url, tuple(sorted((params or {}).items())), scope)
+
+
+def upstream(method: str, url: str, **kwargs: Any) -> 'requests.Response':
+    """``requests.request`` with its latency and failures recorded per backend endpoint.
+
+    With tracing on, the call is a client span and the backend receives its
+    ``traceparent``, so its own spans join the page's trace.
+    """
+    # Imported on the first backend call; requests and urllib3 are a large share of startup
+    import requests
+
+    with tracer.span(f"{method.upper()} {upstream_endpoint(url)}", kind='CLIENT',
+                     **{'http.request.method': method.upper(), 'url.full': url}) as span:
+        if tracer.enabled:
+            kwargs['headers'] = tracer.inject(dict(kwargs.get('headers') or {}))
+        started = time.perf_counter()
+        try:
+            response = requests.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            metrics.observe_upstream(method, url, time.perf_counter() - started, error=type(e).__name__)
+            raise
+        metrics.observe_upstream(method, url, time.perf_counter() - started, status=response.status_code)
+        span.set_attribute('http.response.status_code', response.status_code)
+        if response.status_code >= 500:
+            span.set_error(f"HTTP {response.status_code}")
+        return response
+
+
+def _request(method: str, url: str, token: Optional[str], timeout: float, kwargs: Dict[str, Any]) -> UpstreamResponse:
+    headers = dict(kwargs.pop('headers', None) or {})
+    if token:
+        headers['Authorization'] = f"Bearer {token}"
+    response = upstream(method, url, headers=headers, timeout=timeout, **kwargs)
+    try:
+        data = response.json()
+    except ValueError:
+        data = None
+    return UpstreamResponse(response.status_code, response.text, data)
+
+
+class SingleFlight:
+    """De-duplicates identical in-flight upstream calls.
+
+    The first caller for a key (method, URL, params, auth scope) starts the
+    request; everyone asking for the same key before it completes waits for
+    that request and gets the same parsed response. Nothing is cached once
+    the call has finished.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._tasks: Dict[Hashable, 'asyncio.Task[UpstreamResponse]'] = {}
+
+    async def fetch(self, method: str, url: str, token: Optional[str] = None, timeout: float = 15,
+                    **kwargs: Any) -> UpstreamResponse:
+        if method.upper() not in COALESCED_METHODS:
+            return await run.io_bound(contextvars.copy_context().run, _request, method, url, token, timeout, kwargs)
+        key = request_key(method, url, token, kwargs.get('params'))
+        task = self._tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.leaders += 1
+            # The call is a task of its own, not the leader's: a cancelled caller only stops waiting,
+            # the others still get the response. The task copies this context, so its span joins
+            # the leader's trace.
+            task = asyncio.ensure_future(self._call(key, method, url, token, timeout, kwargs))
+            # Mark a failure retrieved; if every caller gave up, asyncio would log it as unhandled
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._tasks[key] = task
+        return await asyncio.shield(task)
+
+    async def _call(self, key: Hashable, method: str, url: str, token: Optional[str], timeout: float,
+                    kwargs: Dict[str, Any]) -> UpstreamResponse:
+        try:
+            return await run.io_bound(contextvars.copy_context().run, _request, method, url, token, timeout, kwargs)
+        finally:
+            self._tasks.pop(key, None)
+
+
+single_flight = SingleFlight()
@@ -1,7 +1,8 @@
-from typing import Optional, Tuple
-import requests
-from nicegui import app, ui
-from .api import base_url
+from typing import Optional, Set, Tuple
+from nicegui import app, background_tasks, run, ui
+from .api import base_url, upstream
+from .storage import user_storage
+from .tokens import TokenError, is_jwt, needs_refresh, refresh_token, verify_token
 
 # --- Safe session helpers ---
 
@@ -11,17 +12,18 @@ def _ensure_session_storage():
 
 def set_session(token: Optional[str], role: Optional[str], user_id: Optional[str], name: Optional[str] = None) -> None:
     try:
-        app.storage.user['token'] = token
-        app.storage.user['role'] = role
-        app.storage.user['user_id'] = user_id
-        app.storage.user['name'] = name
+        store = user_storage()
+        store['token'] = token
+        store['role'] = role
+        store['user_id'] = user_id
+        store['name'] = name
     except RuntimeError:
         # Storage not initialized yet, ignore silently
         pass
 
 def clear_session() -> None:
     try:
-        app.storage.user.clear()
+        user_storage().clear()
     except RuntimeError:
         # Storage not initialized yet, ignore silently
         pass
@@ -30,7 +32,7 @@ def get_role() -> Optional[str]:
     if not hasattr(app, 'storage'):
         return None
     try:
-        return app.storage.user.get('role')
+        return user_storage().get('role')
     except RuntimeError:
         return None
 
@@ -38,17 +40,52 @@ def get_user_id() -> Optional[str]:
     if not hasattr(app, 'storage'):
         return None
     try:
-        return app.storage.user.get('user_id')
+        return user_storage().get('user_id')
     except RuntimeError:
         return None
 
+# Tokens with a refresh in flight, so a burst of get_token calls starts one
+_refreshing: Set[str] = set()
+
+
+def _refresh_in_background(token: str) -> None:
+    """Swap a fresh token into the session once the backend answers; the old one stays valid meanwhile"""
+    if token in _refreshing:
+        return
+    try:
+        store = user_storage()
+    except RuntimeError:
+        return
+    _refreshing.add(token)
+
+    async def refresh() -> None:
+        try:
+            fresh = await run.io_bound(refresh_token, token)
+            if fresh and store.get('token') == token:
+                store['token'] = fresh
+        finally:
+            _refreshing.discard(token)
+    background_tasks.create(refresh(), name='refresh session token')
+
+
 def get_token() -> Optional[str]:
+    """Session token if it is still valid; expired or forged JWTs give None without asking the backend"""
     if not hasattr(app, 'storage'):
         return None
     try:
-        return app.storage.user.get('token')
+        token = user_storage().get('token')
     except RuntimeError:
         return None
+    if not is_jwt(token):
+        return token
+    try:
+        claims = verify_token(token)
+    except TokenError:
+        return None
+    if needs_refresh(claims):
+        # Still valid for REFRESH_MARGIN seconds; the page does not wait for the backend
+        _refresh_in_background(token)
+    return token
 
 def is_vendor() -> bool:
     return get_role() == 'vendor'
@@ -57,6 +94,12 @@ def is_user() -> bool:
     return get_role() == 'user'
 
 def require_vendor() -> bool:
+    if is_vendor() and not get_token():
+        # Fail fast on an expired session instead of on the first API call
+        clear_session()
+        ui.notify('Your session has expired. Please sign in again.', type='warning')
+        ui.navigate.to('/sign-in')
+        return False
     if not is_vendor():
         ui.notify('Vendor access required. Please sign in as a vendor.', type='warning')
         ui.navigate.to('/sign-in')
@@ -77,7 +120,7 @@ def api_signup(name: str, email: str, password: str, role: str) -> Tuple[bool, s
             'password': password,
             'role': role,
         }
-        r = requests.post(f"{base_url}/auth/signup", json=payload, timeout=15)
+        r = upstream('POST', f"{base_url}/auth/signup", json=payload, timeout=15)
         if 200 <= r.status_code < 300:
             data = r.json()
             token = data.get('token') or data.get('access_token')
@@ -115,7 +158,7 @@ def api_login(email: str, password: str) -> Tuple[bool, str, Optional[str], Opti
             'email': email,
             'password': password,
         }
-        r = requests.post(f"{base_url}/auth/login", json=payload, timeout=15)
+        r = upstream('POST', f"{base_url}/auth/login", json=payload, timeout=15)
         if 200 <= r.status_code < 300:
             data = r.json()
             token = data.get('token') or data.get('access_token')
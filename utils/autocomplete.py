@@ -0,0 +1,135 @@
+import heapq
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from .catalogue import Catalogue, catalogue
+from .search_cache import normalize_query
+
+SUGGESTION_LIMIT = 8
+# Each logged search counts as this many catalogue occurrences when ranking
+POPULARITY_WEIGHT = 5
+# Results for prefixes up to this length are cached; they cover the largest key ranges
+CACHED_PREFIX_LENGTH = 3
+
+
+class AutocompleteIndex:
+    """Sorted-prefix index of advert names, categories and vendor names.
+
+    Every word suffix of a suggestion is a key, so typing ``jol`` offers
+    "Spicy Jollof". Keys are kept in one sorted list and a prefix lookup is a
+    pair of bisects; candidates are ranked by logged search popularity plus
+    how many adverts carry the text. Single-character prefixes are ranked at
+    build time and short-prefix results are cached, so the common first
+    keystrokes are dictionary lookups even on very large catalogues.
+    The index rebuilds lazily when the catalogue version changes.
+    """
+
+    def __init__(self, source: Catalogue, limit: int = SUGGESTION_LIMIT):
+        self.source = source
+        self.limit = limit
+        self.popularity: Dict[str, int] = {}
+        self._version = -1
+        self._keys: List[str] = []
+        self._key_ids: List[int] = []
+        self._texts: List[str] = []
+        self._lowers: List[str] = []
+        self._counts: List[int] = []
+        self._text_ids: Dict[str, int] = {}
+        self._top: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    # --- Build ---
+
+    def _ensure_current(self) -> None:
+        if self._version != self.source.version:
+            with self._lock:
+                if self._version != self.source.version:
+                    self._build()
+
+    def _build(self) -> None:
+        version = self.source.version
+        text_ids: Dict[str, int] = {}
+        texts: List[str] = []
+        counts: List[int] = []
+        for advert in self.source.adverts():
+            for text in (advert['name'], advert['category'], advert['vendorName']):
+                lower = normalize_query(text)
+                if not lower:
+                    continue
+                sid = text_ids.get(lower)
+                if sid is None:
+                    sid = text_ids[lower] = len(texts)
+                    texts.append(text.strip())
+                    counts.append(0)
+                counts[sid] += 1
+
+        lowers = [''] * len(texts)
+        for lower, sid in text_ids.items():
+            lowers[sid] = lower
+        pairs: List[Tuple[str, int]] = []
+        for sid, lower in enumerate(lowers):
+            words = lower.split()
+            for i in range(len(words)):
+                pairs.append((' '.join(words[i:]), sid))
+        pairs.sort()
+
+        self._keys = [key for key, _ in pairs]
+        self._key_ids = [sid for _, sid in pairs]
+        self._texts, self._lowers, self._counts, self._text_ids = texts, lowers, counts, text_ids
+        self._top = {}
+        self._version = version
+        for initial in sorted({key[0] for key in self._keys}):
+            self._top[initial] = self._rank(initial, self.limit)
+
+    # --- Lookup ---
+
+    def _rank_key(self, sid: int) -> Tuple[int, str]:
+        popularity = self.popularity.get(self._lowers[sid], 0)
+        # Highest score first, ties alphabetically
+        return (-(popularity * POPULARITY_WEIGHT + self._counts[sid]), self._lowers[sid])
+
+    def _rank(self, prefix: str, limit: int) -> List[str]:
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + '\uffff', lo)
+        candidates = set(self._key_ids[lo:hi])
+        return [self._texts[sid] for sid in heapq.nsmallest(limit, candidates, key=self._rank_key)]
+
+    def suggest(self, prefix: Optional[str], limit: Optional[int] = None) -> List[str]:
+        """Return up to ``limit`` suggestions for what the user has typed so far"""
+        prefix = normalize_query(prefix)
+        if not prefix:
+            return []
+        self._ensure_current()
+        limit = limit or self.limit
+        cacheable = limit == self.limit and len(prefix) <= CACHED_PREFIX_LENGTH
+        if cacheable:
+            cached = self._top.get(prefix)
+            if cached is not None:
+                return cached
+        result = self._rank(prefix, limit)
+        if cacheable:
+            self._top[prefix] = result
+        return result
+
+    # --- Popularity ---
+
+    def record_search(self, query: Optional[str]) -> None:
+        """Count a completed search towards suggestion ranking"""
+        query = normalize_query(query)
+        if not query:
+            return
+        self.popularity[query] = self.popularity.get(query, 0) + 1
+        if query not in self._text_ids:
+            return
+        # Only cached prefixes of this suggestion's keys can change order
+        words = query.split()
+        for i in range(len(words)):
+            key = ' '.join(words[i:])
+            for n in range(1, min(len(key), CACHED_PREFIX_LENGTH) + 1):
+                self._top.pop(key[:n], None)
+                if n == 1 and self._version == self.source.version:
+                    self._top[key[0]] = self._rank(key[0], self.limit)
+
+
+suggestion_index = AutocompleteIndex(catalogue)
@@ -0,0 +1,90 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .adverts import apply_changes, normalize_advert, raw_advert_id
+
+
+class Catalogue:
+    """Process-wide store of canonical adverts shared by every session.
+
+    ``version`` is bumped on every change so caches and indexes built from the
+    catalogue can tell when they are stale. Listeners registered with
+    ``subscribe`` are called after each bump.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._raw: Dict[str, Dict[str, Any]] = {}
+        self._listeners: List[Callable[['Catalogue'], None]] = []
+        self._lock = threading.RLock()
+
+    def subscribe(self, listener: Callable[['Catalogue'], None]) -> None:
+        self._listeners.append(listener)
+
+    def _bump(self) -> None:
+        self.version += 1
+        for listener in list(self._listeners):
+            listener(self)
+
+    def ingest(self, payload: Any) -> List[Dict[str, Any]]:
+        """Replace the catalogue with a fetched advert list.
+
+        Adverts whose raw payload is unchanged keep their existing record (and
+        derived fields); the version only moves when something actually changed.
+        """
+        if isinstance(payload, dict):
+            payload = payload.get('data') or []
+        with self._lock:
+            records: Dict[str, Dict[str, Any]] = {}
+            raws: Dict[str, Dict[str, Any]] = {}
+            changed = False
+            for raw in payload or []:
+                key = raw_advert_id(raw) if isinstance(raw, dict) else None
+                if key is None:
+                    # Without an id an advert cannot be looked up, edited or memoized
+                    continue
+                if self._raw.get(key) == raw:
+                    record = self._records[key]
+                else:
+                    record = normalize_advert(raw)
+                    changed = True
+                records[key] = record
+                raws[key] = raw
+            if changed or list(records) != list(self._records):
+                self._records, self._raw = records, raws
+                self._bump()
+            return list(self._records.values())
+
+    def adverts(self) -> List[Dict[str, Any]]:
+        return list(self._records.values())
+
+    def get(self, advert_id: Any) -> Optional[Dict[str, Any]]:
+        return self._records.get(str(advert_id))
+
+    def lookup(self, advert_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        records = self._records
+        return [records[i] for i in advert_ids if i in records]
+
+    def update(self, advert_id: Any, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(str(advert_id))
+            if record is None:
+                return None
+            apply_changes(record, changes)
+            self._raw.pop(str(advert_id), None)
+            self._bump()
+            return record
+
+    def remove(self, advert_id: Any) -> None:
+        with self._lock:
+            if self._records.pop(str(advert_id), None) is not None:
+                self._raw.pop(str(advert_id), None)
+                self._bump()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+# Shared public listing (``/food/all``)
+catalogue = Catalogue()
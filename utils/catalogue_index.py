@@ -0,0 +1,247 @@
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .catalogue import Catalogue, catalogue
+
+# Attribute -> values of an advert, one bitmap is kept per distinct value
+INDEXED_FIELDS: Dict[str, Callable[[Dict[str, Any]], Iterable[str]]] = {
+    'category': lambda ad: (ad['category'],) if ad['category'] else (),
+    'dietary': lambda ad: ad['dietaryTags'],
+    'spiciness': lambda ad: (ad['spiciness'],) if ad['spiciness'] else (),
+    'availability': lambda ad: ('Active',) if ad['isAvailable'] else ('Inactive',),
+    'vendor': lambda ad: (ad['vendorId'],) if ad['vendorId'] is not None else (),
+}
+# Fields where several requested values must all hold ("vegan gluten free"); others match any
+MATCH_ALL_FIELDS = {'dietary'}
+# Price facet buckets as (label, min, max); min inclusive, max exclusive, None is open
+PRICE_FACETS = (
+    ('Under 15', None, 15),
+    ('15 - 25', 15, 25),
+    ('25 - 40', 25, 40),
+    ('40+', 40, None),
+)
+# Users whose /api/advertisements listing is kept in memory; the least recently used are dropped
+LISTING_USERS = int(os.getenv('LISTING_USERS', '64'))
+# Facets shown by SearchFilterComponent; vendor and availability are filter-only
+FACET_FIELDS = ('category', 'dietary', 'spiciness', 'price_range')
+
+
+def _bitmap(positions: Iterable[int], size: int) -> int:
+    """Build an int bitmap from positions in O(len(positions) + size / 8)"""
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def bit_positions(bitmap: int) -> List[int]:
+    """Positions of the set bits, lowest first"""
+    bits = bin(bitmap)[:1:-1]
+    positions = []
+    position = bits.find('1')
+    while position != -1:
+        positions.append(position)
+        position = bits.find('1', position + 1)
+    return positions
+
+
+class CatalogueIndex:
+    """Bitmap filter engine over a catalogue.
+
+    Each advert gets a fixed position; every indexed attribute value
+    (category, dietary tag, spiciness, availability, vendor) maps to a bitmap
+    (a Python int, bit N = advert N) and prices are kept in one sorted array.
+    A filters dict is evaluated as an AND across fields and an OR across the
+    values given for a field (AND for ``MATCH_ALL_FIELDS``), so any
+    combination is a few bisects and integer operations rather than a scan
+    over the adverts. Rebuilt lazily when the catalogue changes.
+    """
+
+    def __init__(self, source: Catalogue):
+        self.source = source
+        self._version = -1
+        self._records: List[Dict[str, Any]] = []
+        self._positions: Dict[Any, int] = {}
+        self._bitmaps: Dict[str, Dict[str, int]] = {}
+        self._folded: Dict[str, Dict[str, str]] = {}
+        self._prices: List[float] = []
+        self._price_positions: List[int] = []
+        self._price_facets: Dict[str, int] = {}
+        self._all = 0
+        self._lock = threading.Lock()
+
+    def _ensure_current(self) -> None:
+        if self._version != self.source.version:
+            with self._lock:
+                if self._version != self.source.version:
+                    self._build()
+
+    def _build(self) -> None:
+        version = self.source.version
+        records = self.source.adverts()
+        size = len(records)
+        positions: Dict[str, Dict[str, List[int]]] = {field: {} for field in INDEXED_FIELDS}
+        for position, advert in enumerate(records):
+            for field, values_of in INDEXED_FIELDS.items():
+                for value in values_of(advert):
+                    positions[field].setdefault(value, []).append(position)
+
+        order = sorted(range(size), key=lambda position: records[position]['price'])
+        self._records = records
+        self._positions = {advert['id']: position for position, advert in enumerate(records)}
+        self._bitmaps = {field: {value: _bitmap(found, size) for value, found in values.items()}
+                         for field, values in positions.items()}
+        self._folded = {field: {value.lower(): value for value in values} for field, values in positions.items()}
+        self._prices = [records[position]['price'] for position in order]
+        self._price_positions = order
+        self._price_facets = {}
+        for label, low, high in PRICE_FACETS:
+            lo = 0 if low is None else bisect_left(self._prices, low)
+            hi = size if high is None else bisect_left(self._prices, high)
+            self._price_facets[label] = _bitmap(order[lo:hi], size)
+        self._all = (1 << size) - 1
+        self._version = version
+
+    # --- Queries ---
+
+    def values(self, field: str) -> List[str]:
+        """Distinct indexed values of ``field``"""
+        self._ensure_current()
+        return sorted(self._bitmaps.get(field, {}))
+
+    def canonical_value(self, field: str, value: str) -> Optional[str]:
+        """Case-insensitive lookup of an indexed value"""
+        self._ensure_current()
+        return self._folded.get(field, {}).get(value.lower())
+
+    def value_bitmap(self, field: str, values: Any) -> int:
+        """Adverts having any of ``values`` for ``field``"""
+        self._ensure_current()
+        if isinstance(values, str):
+            values = (values,)
+        bitmaps = self._bitmaps.get(field, {})
+        result = 0
+        for value in values:
+            result |= bitmaps.get(value, 0)
+        return result
+
+    def price_bitmap(self, min_price: Optional[float] = None, max_price: Optional[float] = None) -> int:
+        """Adverts priced within the inclusive range; ``None`` leaves that side open"""
+        self._ensure_current()
+        lo = 0 if min_price is None else bisect_left(self._prices, min_price)
+        hi = len(self._prices) if max_price is None else bisect_right(self._prices, max_price)
+        if lo == 0 and hi == len(self._prices):
+            return self._all
+        return _bitmap(self._price_positions[lo:hi], len(self._records))
+
+    def _constraints(self, filters: Optional[Dict[str, Any]]) -> Dict[str, int]:
+        """One bitmap per constrained field of a filters dict"""
+        constraints: Dict[str, int] = {}
+        for field, value in (filters or {}).items():
+            if field == 'price_range':
+                constraints[field] = self.price_bitmap((value or {}).get('min'), (value or {}).get('max'))
+            elif field in MATCH_ALL_FIELDS and value:
+                bitmap = self._all
+                for single in ((value,) if isinstance(value, str) else value):
+                    bitmap &= self.value_bitmap(field, single)
+                constraints[field] = bitmap
+            elif field in INDEXED_FIELDS and value:
+                constraints[field] = self.value_bitmap(field, value)
+        return constraints
+
+    def evaluate(self, filters: Optional[Dict[str, Any]]) -> int:
+        """Bitmap of adverts matching a SearchFilterComponent-style filters dict"""
+        self._ensure_current()
+        result = self._all
+        for bitmap in self._constraints(filters).values():
+            result &= bitmap
+            if not result:
+                break
+        return result
+
+    def bitmap_of(self, adverts: Iterable[Dict[str, Any]]) -> int:
+        """Bitmap of the given adverts, e.g. a text search result"""
+        self._ensure_current()
+        positions = self._positions
+        return _bitmap((positions[ad['id']] for ad in adverts if ad['id'] in positions), len(self._records))
+
+    def facet_counts(self, base: Optional[int] = None, filters: Optional[Dict[str, Any]] = None,
+                     fields: Iterable[str] = FACET_FIELDS) -> Dict[str, Dict[str, int]]:
+        """Result counts per option of every facet, e.g. ``{'category': {'Desserts': 4}, ...}``.
+
+        ``base`` is the current result set before filters (all adverts when
+        ``None``). Each facet is counted against the other fields' filters
+        but not its own, so the counts say what picking that option would
+        yield; the ``None`` entry is the count with no option picked. Every
+        count is one AND and a popcount, adverts are not scanned.
+        """
+        self._ensure_current()
+        base = self._all if base is None else base
+        constraints = self._constraints(filters)
+        counts: Dict[str, Dict[str, int]] = {}
+        for field in fields:
+            options = self._price_facets if field == 'price_range' else self._bitmaps.get(field, {})
+            mask = base
+            for other, bitmap in constraints.items():
+                if other != field:
+                    mask &= bitmap
+            counts[field] = {value: (mask & bitmap).bit_count() for value, bitmap in options.items()}
+            counts[field][None] = mask.bit_count()
+        return counts
+
+    def records(self, bitmap: int) -> List[Dict[str, Any]]:
+        """Adverts of a bitmap from ``evaluate``, in catalogue order"""
+        if bitmap == self._all:
+            return list(self._records)
+        records = self._records
+        return [records[position] for position in bit_positions(bitmap)]
+
+    def count(self, filters: Optional[Dict[str, Any]]) -> int:
+        return self.evaluate(filters).bit_count()
+
+    def select(self, adverts: Iterable[Dict[str, Any]], bitmap: int) -> List[Dict[str, Any]]:
+        """Keep the adverts in ``bitmap``, preserving the given (e.g. relevance) order"""
+        if bitmap == self._all:
+            return list(adverts)
+        members = set(bit_positions(bitmap))
+        positions = self._positions
+        return [ad for ad in adverts if positions.get(ad['id']) in members]
+
+    def filter(self, filters: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self.records(self.evaluate(filters))
+
+
+catalogue_index = CatalogueIndex(catalogue)
+
+
+class ListingIndexes:
+    """``/api/advertisements`` catalogue and index per user.
+
+    The listing is fetched with the user's token, so it is not shared: each
+    user id (None for visitors who are not signed in) gets its own catalogue
+    and index. Reloading a page reuses the index as long as the listing did
+    not change, and one user's listing never replaces another's.
+    """
+
+    def __init__(self, max_users: int = LISTING_USERS):
+        self.max_users = max_users
+        self._listings: 'OrderedDict[Optional[str], Tuple[Catalogue, CatalogueIndex]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Optional[str]) -> Tuple[Catalogue, CatalogueIndex]:
+        with self._lock:
+            listing = self._listings.get(user_id)
+            if listing is None:
+                source = Catalogue()
+                listing = self._listings[user_id] = (source, CatalogueIndex(source))
+                while len(self._listings) > self.max_users:
+                    self._listings.popitem(last=False)
+            else:
+                self._listings.move_to_end(user_id)
+            return listing
+
+
+listing_indexes = ListingIndexes()
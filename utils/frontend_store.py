@@ -1,71 +1,154 @@
 from typing import Dict, List, Optional, Any
-from nicegui import app
-import hashlib
+import os
+import threading
 import uuid
 
+from .passwords import hash_password, kdf_pool, needs_rehash, verify_password
+from .storage import STORAGE_BACKEND, STORAGE_DIR, general_storage
+from .write_behind import WriteBehindStore
+
 USERS_KEY = 'mock_users'
 ADVERTS_KEY = 'mock_adverts'
 
 
+def _seed_from_general() -> Dict[str, Any]:
+    # Carry over users and adverts kept in app.storage.general before the write-behind file existed
+    general = general_storage()
+    return {key: general[key] for key in (USERS_KEY, ADVERTS_KEY) if key in general}
+
+
+# Mutations are applied in memory and written to disk in batches. The shared
+# SQLite backend stays write-through: workers must see each other's writes.
+write_behind_store = WriteBehindStore(os.path.join(STORAGE_DIR, 'frontend-store.json'), seed=_seed_from_general)
+
+
+def _store():
+    return general_storage() if STORAGE_BACKEND == 'sqlite' else write_behind_store
+
+
 def _ensure_init():
-    store = app.storage.general
+    store = _store()
     if USERS_KEY not in store:
         # seed with a sample vendor and user (password: 123456)
-        pwd = hashlib.sha256('123456'.encode()).hexdigest()
-        store[USERS_KEY] = [
-            {'id': 'v1', 'name': 'Demo Vendor', 'email': 'vendor@example.com', 'password': pwd, 'role': 'vendor'},
-            {'id': 'u1', 'name': 'Demo User', 'email': 'user@example.com', 'password': pwd, 'role': 'user'},
+        users = [
+            {'id': 'v1', 'name': 'Demo Vendor', 'email': 'vendor@example.com',
+             'password': kdf_pool.run(hash_password, '123456'), 'role': 'vendor'},
+            {'id': 'u1', 'name': 'Demo User', 'email': 'user@example.com',
+             'password': kdf_pool.run(hash_password, '123456'), 'role': 'user'},
         ]
+        # Another worker may have seeded in the meantime; keep its list
+        store.transform(USERS_KEY, lambda current: users if current is None else current)
     if ADVERTS_KEY not in store:
-        store[ADVERTS_KEY] = [
+        adverts = [
             {'id': 'a1', 'name': 'Spicy Jollof', 'description': 'Delicious Ghanaian jollof', 'price': 50, 'owner_id': 'v1', 'image': ''},
             {'id': 'a2', 'name': 'Waakye Special', 'description': 'Beans and rice combo', 'price': 35, 'owner_id': 'v1', 'image': ''},
         ]
+        store.transform(ADVERTS_KEY, lambda current: adverts if current is None else current)
 
 
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+# Users
 
+# email (lower-cased) -> position in the users list. Users are only ever appended, so the
+# index is extended with the users added since the last lookup instead of being rebuilt.
+_email_positions: Dict[str, int] = {}
+_indexed_users = 0
+_index_lock = threading.Lock()
+_dummy_hash: Optional[str] = None
+
+
+def _reset_email_index() -> None:
+    global _email_positions, _indexed_users
+    _email_positions, _indexed_users = {}, 0
+
+
+def _user_positions(users: List[Dict[str, Any]]) -> Dict[str, int]:
+    global _indexed_users
+    with _index_lock:
+        if len(users) < _indexed_users:
+            # Not the list the index was built from (e.g. the store was reset)
+            _reset_email_index()
+        for position in range(_indexed_users, len(users)):
+            _email_positions.setdefault(users[position]['email'].lower(), position)
+        _indexed_users = len(users)
+        return _email_positions
+
+
+def _find_user(users: List[Dict[str, Any]], email: str) -> Optional[Dict[str, Any]]:
+    email = email.lower()
+    position = _user_positions(users).get(email)
+    if position is not None and users[position]['email'].lower() != email:
+        # The list was replaced by one of the same length; index it afresh
+        with _index_lock:
+            _reset_email_index()
+        position = _user_positions(users).get(email)
+    return users[position] if position is not None else None
+
+
+def _unknown_user_hash() -> str:
+    # Unknown emails are checked against a throwaway hash so they take as long as wrong passwords
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = kdf_pool.run(hash_password, uuid.uuid4().hex)
+    return _dummy_hash
 
-# Users
 
 def create_user(name: str, email: str, password: str, role: str) -> Dict[str, Any]:
     _ensure_init()
-    users: List[Dict[str, Any]] = app.storage.general[USERS_KEY]
-    if any(u['email'].lower() == email.lower() for u in users):
-        raise ValueError('Email already registered')
+    # Hashed before the write transaction, which must not wait for the KDF
     new_user = {
         'id': str(uuid.uuid4()),
         'name': name,
         'email': email,
-        'password': hash_password(password),
+        'password': kdf_pool.run(hash_password, password),
         'role': role,
     }
-    users.append(new_user)
-    app.storage.general[USERS_KEY] = users
+
+    def add(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Checked inside the transaction, so two sign-ups with one email cannot both pass
+        if _find_user(users, email) is not None:
+            raise ValueError('Email already registered')
+        users.append(new_user)
+        return users
+
+    _store().transform(USERS_KEY, add, [])
     return new_user
 
 
 def authenticate_user(email: str, password: str) -> Optional[Dict[str, Any]]:
+    """Check credentials; hashing runs on the bounded KDF pool (raises KDFBusyError when it is full)"""
     _ensure_init()
-    users: List[Dict[str, Any]] = app.storage.general[USERS_KEY]
-    h = hash_password(password)
-    for u in users:
-        if u['email'].lower() == email.lower() and u['password'] == h:
-            return u
-    return None
+    user = _find_user(_store()[USERS_KEY], email)
+    encoded = user['password'] if user else _unknown_user_hash()
+    if not kdf_pool.run(verify_password, password, encoded) or user is None:
+        return None
+    if needs_rehash(user['password']):
+        # Upgrade unsalted SHA-256 and outdated parameters while the password is at hand
+        rehashed = kdf_pool.run(hash_password, password)
+
+        def upgrade(current: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            for u in current:
+                if u['id'] == user['id'] and u['password'] == encoded:
+                    u['password'] = rehashed
+            return current
+
+        _store().transform(USERS_KEY, upgrade, [])
+        user['password'] = rehashed
+    return user
 
 
 # Adverts
+#
+# Every write is one read-modify-write transaction on the list, so concurrent
+# writers in other workers are not overwritten.
 
 def list_adverts() -> List[Dict[str, Any]]:
     _ensure_init()
-    return list(app.storage.general[ADVERTS_KEY])
+    return list(_store()[ADVERTS_KEY])
 
 
 def get_advert(advert_id: str) -> Optional[Dict[str, Any]]:
     _ensure_init()
-    for a in app.storage.general[ADVERTS_KEY]:
+    for a in _store()[ADVERTS_KEY]:
         if str(a['id']) == str(advert_id):
             return a
     return None
@@ -73,7 +156,6 @@ def get_advert(advert_id: str) -> Optional[Dict[str, Any]]:
 
 def create_advert(name: str, description: str, price: float, owner_id: str, image: str = '') -> Dict[str, Any]:
     _ensure_init()
-    adverts: List[Dict[str, Any]] = app.storage.general[ADVERTS_KEY]
     new_ad = {
         'id': str(uuid.uuid4()),
         'name': name,
@@ -82,25 +164,33 @@ def create_advert(name: str, description: str, price: float, owner_id: str, imag
         'owner_id': owner_id,
         'image': image,
     }
-    adverts.append(new_ad)
-    app.storage.general[ADVERTS_KEY] = adverts
+
+    def add(adverts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        adverts.append(new_ad)
+        return adverts
+
+    _store().transform(ADVERTS_KEY, add, [])
     return new_ad
 
 
 def update_advert(advert_id: str, name: str, description: str, price: float) -> Dict[str, Any]:
     _ensure_init()
-    adverts: List[Dict[str, Any]] = app.storage.general[ADVERTS_KEY]
-    for a in adverts:
-        if str(a['id']) == str(advert_id):
-            a['name'] = name
-            a['description'] = description
-            a['price'] = price
-            app.storage.general[ADVERTS_KEY] = adverts
-            return a
-    raise KeyError('Advert not found')
+    updated: List[Dict[str, Any]] = []
+
+    def update(adverts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for a in adverts:
+            if str(a['id']) == str(advert_id):
+                a['name'] = name
+                a['description'] = description
+                a['price'] = price
+                updated.append(a)
+                return adverts
+        raise KeyError('Advert not found')
+
+    _store().transform(ADVERTS_KEY, update, [])
+    return updated[0]
 
 
 def delete_advert(advert_id: str) -> None:
     _ensure_init()
-    adverts: List[Dict[str, Any]] = app.storage.general[ADVERTS_KEY]
-    app.storage.general[ADVERTS_KEY] = [a for a in adverts if str(a['id']) != str(advert_id)]
+    _store().transform(ADVERTS_KEY, lambda adverts: [a for a in adverts if str(a['id']) != str(advert_id)], [])
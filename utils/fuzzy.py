@@ -0,0 +1,144 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .catalogue import Catalogue, catalogue
+
+MAX_EDIT_DISTANCE = 2
+# Shorter words get a tighter bound, otherwise "pie" would match half the menu
+MIN_FUZZY_WORD_LENGTH = 4
+FULL_DISTANCE_WORD_LENGTH = 7
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def words(text: str) -> List[str]:
+    return WORD_RE.findall(text.lower())
+
+
+def allowed_distance(word: str, max_distance: int) -> int:
+    if len(word) < MIN_FUZZY_WORD_LENGTH:
+        return 0
+    if len(word) < FULL_DISTANCE_WORD_LENGTH:
+        return min(1, max_distance)
+    return max_distance
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal-string-alignment distance between ``a`` and ``b``; ``limit + 1`` once it exceeds ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+class FuzzyIndex:
+    """SymSpell-style deletion dictionary over the catalogue vocabulary.
+
+    Every vocabulary word is stored under all its variants with up to
+    ``max_distance`` characters deleted. A lookup generates the same variants
+    for the query word and only verifies the few words sharing one, instead of
+    computing an edit distance against every token in the catalogue.
+
+    When the catalogue version changes the index is rebuilt on a background
+    thread; lookups keep using the previous index until it is ready, so a
+    search never waits for the (vocabulary-sized) build.
+    """
+
+    def __init__(self, source: Catalogue, max_distance: int = MAX_EDIT_DISTANCE):
+        self.source = source
+        self.max_distance = max_distance
+        self._version = -1
+        self._frequency: Dict[str, int] = {}
+        self._deletes: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._builder: Optional[threading.Thread] = None
+
+    def build(self, vocabulary: Iterable[str]) -> None:
+        frequency: Dict[str, int] = {}
+        for word in vocabulary:
+            frequency[word] = frequency.get(word, 0) + 1
+        deletes: Dict[str, List[str]] = {}
+        for word in frequency:
+            for variant in _deletes(word, allowed_distance(word, self.max_distance)):
+                deletes.setdefault(variant, []).append(word)
+        self._frequency, self._deletes = frequency, deletes
+
+    def _rebuild(self) -> None:
+        version = self.source.version
+        self.build(w for ad in self.source.adverts() for w in words(ad['searchText']))
+        self._version = version
+
+    def refresh(self, wait: bool = False) -> None:
+        """Start a rebuild if the catalogue changed; ``wait`` blocks until it is done"""
+        if self._version != self.source.version:
+            with self._lock:
+                if self._builder is None or not self._builder.is_alive():
+                    self._builder = threading.Thread(target=self._rebuild, name='fuzzy-index', daemon=True)
+                    self._builder.start()
+        if wait and self._builder is not None:
+            self._builder.join()
+
+    @property
+    def version(self) -> int:
+        """Catalogue version the current index was built from"""
+        return self._version
+
+    def _ensure_current(self) -> None:
+        self.refresh()
+
+    def __contains__(self, word: str) -> bool:
+        self._ensure_current()
+        return word in self._frequency
+
+    def lookup(self, word: str, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Return vocabulary words within the allowed distance of ``word``, closest and most frequent first"""
+        self._ensure_current()
+        frequency, deletes = self._frequency, self._deletes
+        word = word.lower()
+        # The index only holds deletes up to its own max_distance
+        distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        limit = allowed_distance(word, distance)
+        if word in frequency:
+            return [(word, 0)]
+        if limit == 0:
+            return []
+        matches: Dict[str, int] = {}
+        for variant in _deletes(word, limit):
+            for candidate in deletes.get(variant, ()):
+                if candidate not in matches:
+                    matches[candidate] = edit_distance(word, candidate, limit)
+        found = [(candidate, d) for candidate, d in matches.items() if d <= limit]
+        found.sort(key=lambda item: (item[1], -frequency[item[0]], item[0]))
+        return found
+
+    def correct(self, word: str, max_distance: Optional[int] = None) -> Optional[str]:
+        """Best vocabulary spelling for ``word``, or ``None`` if nothing is close enough"""
+        found = self.lookup(word, max_distance)
+        return found[0][0] if found else None
+
+
+fuzzy_index = FuzzyIndex(catalogue)
@@ -0,0 +1,115 @@
+import importlib
+import os
+import sys
+import time
+from types import ModuleType
+from typing import Any, Dict, List, Tuple
+
+# Import page modules on the first request to their route; LAZY_PAGES=0 imports them all at startup
+LAZY_PAGES = os.getenv('LAZY_PAGES', '1') == '1'
+
+
+class _LazyEndpoint:
+    """ASGI endpoint standing in for a page route until its module is imported"""
+
+    def __init__(self, registry: 'PageRegistry', path: str):
+        self.registry = registry
+        self.path = path
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        route = self.registry.load(self.path)
+        # The module's @ui.page replaced this route; let the real one answer the request that triggered it
+        _, child_scope = route.matches(scope)
+        scope.update(child_scope)
+        await route.handle(scope, receive, send)
+
+
+class PageRegistry:
+    """Maps page routes to the modules that define them and imports each module on demand.
+
+    ``register`` adds a placeholder route. On the first request to it, the
+    module is imported, its ``@ui.page`` decorator adds the real route, and
+    the placeholder is removed. ``module`` imports a module through the
+    registry, so its import time is reported too. The registry also times
+    the startup phases marked with ``mark``, for the report printed when
+    the server starts.
+    """
+
+    def __init__(self, lazy: bool = LAZY_PAGES):
+        self.lazy = lazy
+        self.modules: Dict[str, str] = {}
+        self.import_seconds: Dict[str, float] = {}
+        self.phases: List[Tuple[str, float]] = []
+        self._started = self._last_mark = time.perf_counter()
+        self._placeholders: Dict[str, Any] = {}
+
+    def mark(self, phase: str) -> None:
+        """Record the time since the previous mark as ``phase``"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last_mark))
+        self._last_mark = now
+
+    def register(self, path: str, module: str) -> None:
+        self.modules[path] = module
+        if not self.lazy:
+            self._import(module)
+            return
+        from nicegui import app
+        from starlette.routing import Route
+
+        placeholder = Route(path, _LazyEndpoint(self, path), methods=['GET'], include_in_schema=False)
+        self._placeholders[path] = placeholder
+        app.router.routes.append(placeholder)
+
+    def load(self, path: str) -> Any:
+        """Import the module behind ``path`` if needed and return the route it registered"""
+        from nicegui import app
+
+        self._import(self.modules[path])
+        placeholder = self._placeholders.pop(path, None)
+        if placeholder is not None and placeholder in app.router.routes:
+            app.router.routes.remove(placeholder)
+        for route in app.router.routes:
+            if getattr(route, 'path', None) == path:
+                return route
+        raise RuntimeError(f'{self.modules[path]} did not register a page at {path}')
+
+    def module(self, name: str) -> ModuleType:
+        """Import ``name`` (timed, once) and return it"""
+        self._import(name)
+        return sys.modules[name]
+
+    def _import(self, module: str) -> None:
+        if module in self.import_seconds:
+            return
+        started = time.perf_counter()
+        importlib.import_module(module)
+        self.import_seconds[module] = time.perf_counter() - started
+
+    def pending(self) -> List[str]:
+        return sorted({module for module in self.modules.values() if module not in self.import_seconds})
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'lazy': self.lazy,
+            'phases': dict(self.phases),
+            'total': sum(seconds for _, seconds in self.phases),
+            'imported': dict(self.import_seconds),
+            'pending': self.pending(),
+        }
+
+    def summary(self) -> str:
+        phases = ', '.join(f'{phase} {seconds:.2f} s' for phase, seconds in self.phases)
+        line = f'Started in {time.perf_counter() - self._started:.2f} s ({phases})'
+        pending = self.pending()
+        if pending:
+            line += f'; {len(pending)} page modules load on first request'
+        return line
+
+    def print_report(self) -> None:
+        """Print the startup summary; register with ``app.on_startup``"""
+        self.mark('server start')
+        print(self.summary(), flush=True)
+
+
+page_registry = PageRegistry()
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from types import FrameType
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from .histogram import Histogram
+
+logger = logging.getLogger(__name__)
+
+# How often the event loop is asked to wake up; lag is how late it does
+LOOP_LAG_INTERVAL = float(os.getenv('LOOP_LAG_INTERVAL', '0.1'))
+# A callback or page handler holding the loop this long is recorded with its stack
+SLOW_CALLBACK_THRESHOLD = float(os.getenv('SLOW_CALLBACK_THRESHOLD', '0.1'))
+SLOW_CALLBACK_HISTORY = 100
+STACK_DEPTH = 30
+
+
+def _page_path(client: Any) -> Optional[str]:
+    return getattr(getattr(client, 'page', None), 'path', None)
+
+
+def describe_frame(frame: Optional[FrameType]) -> Tuple[Optional[str], Optional[str]]:
+    """(route, element) of the NiceGUI page render or UI event a blocked stack belongs to.
+
+    Walks outwards from the blocking frame to the page decorator, the
+    element event dispatch, or the task NiceGUI runs an async page or event
+    handler in. Only the locals of those NiceGUI frames are read.
+    """
+    route = element = None
+    while frame is not None and route is None:
+        name = frame.f_code.co_name
+        if name in ('_handle_event', 'decorated', 'wait_for_result') and 'nicegui' in frame.f_code.co_filename:
+            local = frame.f_locals
+            owner = local.get('self')
+            if name == '_handle_event' and owner is not None:
+                msg = local.get('msg') or {}
+                listener = getattr(owner, '_event_listeners', {}).get(msg.get('listener_id'))
+                element = f"{type(owner).__name__}#{owner.id}" + (f" {listener.type}" if listener else '')
+                route = _page_path(owner.client)
+            elif name == 'decorated':
+                route = getattr(owner, 'path', None)
+            elif local.get('client') is not None:
+                # page.py: the body of an async page, awaited in a task of its own
+                route = _page_path(local['client'])
+            else:
+                # events.py: an async event handler; only its coroutine and the sender's slot are at hand
+                parent = getattr(local.get('parent_slot'), 'parent', None)
+                route = _page_path(getattr(parent, 'client', None))
+                element = getattr(local.get('result'), '__qualname__', None)
+        frame = frame.f_back
+    return route, element
+
+
+class LoopMonitor:
+    """Samples event-loop lag and catches callbacks that block the loop.
+
+    A task on the loop sleeps ``interval`` seconds at a time and records how
+    late it wakes up. A watchdog thread notices when that task has not woken
+    for ``threshold`` seconds. While the loop is still blocked, the thread
+    takes a stack of the loop thread, so the record shows the code that was
+    actually running, not the code that ran afterwards. Records also carry
+    the page route or UI element that triggered the work.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, threshold: float = SLOW_CALLBACK_THRESHOLD,
+                 history: int = SLOW_CALLBACK_HISTORY):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = Histogram()
+        self.slow_callbacks = Histogram()
+        self.slow_by_route: Dict[str, Histogram] = {}
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread: Optional[int] = None
+        self._last_beat = time.monotonic()
+        # Stack captured by the watchdog during the current stall: (beat it belongs to, stack, route, element)
+        self._pending: Optional[Tuple[float, str, Optional[str], Optional[str]]] = None
+
+    def start(self) -> None:
+        """Start sampling; call from the event loop (``app.on_startup``)"""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            beat, self._last_beat = self._last_beat, time.monotonic()
+            self.lag.observe(lag)
+            if lag >= self.threshold:
+                pending, self._pending = self._pending, None
+                if pending is not None and pending[0] == beat:
+                    self._record(lag, *pending[1:])
+                else:
+                    # Too short for the watchdog to catch in the act
+                    self._record(lag, None, None, None)
+
+    def _watch(self) -> None:
+        captured_for = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._last_beat
+            if beat == captured_for or time.monotonic() - beat - self.interval < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = ''.join(traceback.format_stack(frame, limit=STACK_DEPTH))
+            self._pending = (beat, stack, *describe_frame(frame))
+            captured_for = beat
+
+    def _record(self, duration: float, stack: Optional[str], route: Optional[str], element: Optional[str]) -> None:
+        self.slow_callbacks.observe(duration)
+        key = route or 'unknown'
+        histogram = self.slow_by_route.get(key)
+        if histogram is None:
+            histogram = self.slow_by_route[key] = Histogram()
+        histogram.observe(duration)
+        self.recent.append({'at': time.time(), 'duration': duration, 'route': route, 'element': element,
+                            'stack': stack})
+        where = ' '.join(part for part in (route, element) if part) or 'unknown callback'
+        top = stack.strip().splitlines()[-2].strip() if stack else 'no stack captured'
+        logger.warning('Event loop blocked for %.0f ms by %s at %s', duration * 1000, where, top)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'interval': self.interval,
+            'threshold': self.threshold,
+            'lag': self.lag.snapshot(),
+            'slow_callbacks': self.slow_callbacks.snapshot(),
+            'slow_by_route': {route: h.snapshot() for route, h in sorted(self.slow_by_route.items())},
+            'recent': list(self.recent)[::-1],
+        }
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .storage import STORAGE_DIR
+
+logger = logging.getLogger(__name__)
+
+MEDIA_CACHE_DIR = os.getenv('MEDIA_CACHE_DIR', os.path.join(STORAGE_DIR, 'media'))
+# Least recently used files are deleted once the cache grows past this
+MEDIA_CACHE_MAX_BYTES = int(os.getenv('MEDIA_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+MEDIA_MAX_ITEM_BYTES = 10 * 1024 * 1024
+# Only these hosts are proxied, so /media cannot be used to make the server fetch arbitrary URLs
+MEDIA_HOSTS = tuple(host.strip() for host in os.getenv(
+    'MEDIA_HOSTS', 'images.unsplash.com,cdn.pixabay.com,fonts.googleapis.com,fonts.gstatic.com').split(',')
+    if host.strip())
+MEDIA_URL = '/media'
+# Fetch the assets listed in MANIFEST in the background at startup
+MEDIA_PREWARM = os.getenv('MEDIA_PREWARM', '1') == '1'
+MANIFEST = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'media-manifest.json')
+# Proxied responses keep their URL for good; a week bounds how long a replaced upstream asset lingers
+MEDIA_CACHE_CONTROL = 'public, max-age=604800'
+FETCH_TIMEOUT = 15
+# Google Fonts picks the font format by user agent; ask for woff2 like a current browser would
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+
+_GSTATIC = re.compile(r'https://fonts\.gstatic\.com/')
+
+
+def media_url(url: str) -> str:
+    """Local ``/media/...`` URL for a remote asset on an allowed host; other URLs are returned unchanged"""
+    parts = urlsplit(url)
+    if parts.scheme != 'https' or parts.hostname not in MEDIA_HOSTS:
+        return url
+    local = f'{MEDIA_URL}/{parts.hostname}{parts.path}'
+    return f'{local}?{parts.query}' if parts.query else local
+
+
+def remote_url(host: str, path: str, query: str = '') -> Optional[str]:
+    """Inverse of ``media_url``; None for hosts that are not proxied"""
+    if host not in MEDIA_HOSTS:
+        return None
+    url = f'https://{host}/{path.lstrip("/")}'
+    return f'{url}?{query}' if query else url
+
+
+class MediaCache:
+    """Disk cache of remote images and fonts, bounded in size with LRU eviction.
+
+    Each asset is fetched once and kept as ``<sha256 of URL>`` plus a
+    ``.json`` file with its URL and content type. The index of cached files,
+    with their sizes and content types, lives in memory in
+    least-recently-used order. It is rebuilt from file modification times at
+    start, and a hit touches the file so the order survives restarts.
+    Concurrent misses for one URL share a single fetch. Fonts CSS is
+    rewritten to load its font files through the cache too.
+    """
+
+    def __init__(self, directory: str = MEDIA_CACHE_DIR, max_bytes: int = MEDIA_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        # key -> (size, content type), least recently used first
+        self._index: 'OrderedDict[str, Tuple[int, str]]' = OrderedDict()
+        self._fetching: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            os.makedirs(self.directory, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.directory):
+                path = self._path(name)
+                if name.endswith('.json') or name.startswith('.tmp-'):
+                    continue
+                try:
+                    with open(path + '.json', encoding='utf-8') as f:
+                        content_type = json.load(f)['content_type']
+                    stat = os.stat(path)
+                except (OSError, ValueError, KeyError):
+                    continue
+                entries.append((stat.st_mtime, name, stat.st_size, content_type))
+            for _, name, size, content_type in sorted(entries):
+                self._index[name] = (size, content_type)
+                self.size += size
+
+    def lookup(self, url: str) -> Optional[Tuple[str, str]]:
+        """(file path, content type) of a cached asset, or None; a hit counts as a use for LRU order"""
+        self._load()
+        key = self.key(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            self._index.move_to_end(key)
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            # Evicted by another worker sharing the directory
+            self._forget(key)
+            return None
+        self.hits += 1
+        return path, entry[1]
+
+    def get(self, url: str) -> Tuple[str, str]:
+        """(file path, content type) of ``url``, fetching it on a miss; blocking, run off the event loop"""
+        cached = self.lookup(url)
+        if cached is not None:
+            return cached
+        key = self.key(url)
+        with self._lock:
+            waiting = self._fetching.get(key)
+            leader = waiting is None
+            if leader:
+                self._fetching[key] = threading.Event()
+        if not leader:
+            waiting.wait(FETCH_TIMEOUT * 2)
+            cached = self.lookup(url)
+            if cached is None:
+                import requests
+                raise requests.RequestException(f'Fetching {url} failed')
+            return cached
+        self.misses += 1
+        try:
+            return self._fetch(url, key)
+        finally:
+            with self._lock:
+                self._fetching.pop(key).set()
+
+    def _fetch(self, url: str, key: str) -> Tuple[str, str]:
+        # Imported on the first fetch rather than at startup, like every other use of requests
+        import requests
+
+        headers = {'User-Agent': USER_AGENT}
+        with requests.get(url, headers=headers, timeout=FETCH_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            content_type = response.headers.get('content-type', 'application/octet-stream')
+            chunks, size = [], 0
+            for chunk in response.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > MEDIA_MAX_ITEM_BYTES:
+                    raise requests.RequestException(f'{url} is larger than {MEDIA_MAX_ITEM_BYTES} bytes')
+                chunks.append(chunk)
+        body = b''.join(chunks)
+        if content_type.startswith('text/css'):
+            body = _GSTATIC.sub(f'{MEDIA_URL}/fonts.gstatic.com/', body.decode('utf-8')).encode('utf-8')
+        path = self._path(key)
+        self._write(path + '.json', json.dumps({'url': url, 'content_type': content_type}).encode('utf-8'))
+        self._write(path, body)
+        with self._lock:
+            self.size += len(body) - self._index.pop(key, (0, ''))[0]
+            self._index[key] = (len(body), content_type)
+            evicted = self._evict()
+        for name in evicted:
+            self._remove(name)
+        return path, content_type
+
+    def _write(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _evict(self) -> List[str]:
+        """Drop least recently used entries until the cache fits; call with the lock held"""
+        evicted = []
+        while self.size > self.max_bytes and len(self._index) > 1:
+            name, (size, _) = self._index.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            evicted.append(name)
+        return evicted
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self.size -= self._index.pop(key, (0, ''))[0]
+
+    def _remove(self, key: str) -> None:
+        for path in (self._path(key), self._path(key) + '.json'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def prewarm(self, manifest: str = MANIFEST) -> None:
+        """Fetch every URL of the manifest that is not cached yet, plus the font files of fonts CSS"""
+        try:
+            with open(manifest, encoding='utf-8') as f:
+                urls = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning('Cannot read media manifest %s: %s', manifest, e)
+            return
+        import requests
+
+        misses = self.misses
+        for url in urls:
+            try:
+                path, content_type = self.get(url)
+                if content_type.startswith('text/css'):
+                    with open(path, encoding='utf-8') as f:
+                        fonts = re.findall(rf'{MEDIA_URL}/fonts\.gstatic\.com/([^)\s]+)', f.read())
+                    for font in fonts:
+                        self.get(f'https://fonts.gstatic.com/{font}')
+            except (requests.RequestException, OSError) as e:
+                logger.warning('Could not pre-warm %s: %s', url, e)
+        logger.info('Media cache pre-warmed: %d files fetched for %d manifest entries', self.misses - misses, len(urls))
+
+    def start(self) -> None:
+        """Pre-warm on a daemon thread, so startup does not wait for remote hosts"""
+        if not MEDIA_PREWARM:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self.prewarm, name='media-prewarm', daemon=True)
+            self._thread.start()
+
+
+media_cache = MediaCache()
@@ -0,0 +1,192 @@
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .histogram import Histogram
+
+# Page routes whose render latency is tracked, as registered with @ui.page
+PAGE_ROUTES = (
+    '/',
+    '/view_advert',
+    '/vendor/dashboard',
+    '/advertisement/{advertisement_id}',
+    '/vendor/edit_advert/{advert_id}',
+    '/vendor/add_advert',
+    '/advertisements',
+    '/sign-in',
+)
+# Element counts per session
+ELEMENT_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_ROUTE_PATTERNS = [(re.compile('^' + re.sub(r'\{[^}]+\}', '[^/]+', route) + '$'), route) for route in PAGE_ROUTES]
+# Path segments carrying an id ("/food/42", "/api/advertisements/6650f0c2...") collapse into one endpoint
+_ID_SEGMENT = re.compile(r'/[^/]*\d[^/]*')
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def page_route(path: str) -> Optional[str]:
+    for pattern, route in _ROUTE_PATTERNS:
+        if pattern.match(path):
+            return route
+    return None
+
+
+def upstream_endpoint(url: str) -> str:
+    """``/food/{id}``-style name of an upstream URL, so ids do not each get their own series"""
+    parts = urlsplit(url)
+    return _ID_SEGMENT.sub('/{id}', parts.path) or '/'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Labels, extra: str = '') -> str:
+    pairs = [f'{key}="{_escape(str(value))}"' for key, value in labels]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Exposition:
+    """Lines of the Prometheus text format, one metric family at a time"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} {kind}')
+
+    def sample(self, name: str, value: float, labels: Labels = ()) -> None:
+        self.lines.append(f'{name}{_labels(labels)} {value}')
+
+    def scalar(self, name: str, kind: str, help_text: str, value: float) -> None:
+        self.family(name, kind, help_text)
+        self.sample(name, value)
+
+    def histograms(self, name: str, help_text: str, series: Iterable[Tuple[Labels, Histogram]]) -> None:
+        self.family(name, 'histogram', help_text)
+        for labels, histogram in series:
+            bounds = [str(bound) for bound in histogram.buckets] + ['+Inf']
+            for bound, count in zip(bounds, histogram.cumulative()):
+                le = f'le="{bound}"'
+                self.lines.append(f'{name}_bucket{_labels(labels, le)} {count}')
+            self.sample(f'{name}_sum', histogram.sum, labels)
+            self.sample(f'{name}_count', histogram.count, labels)
+
+    def text(self) -> str:
+        return '\n'.join(self.lines) + '\n'
+
+
+class Metrics:
+    """Process-wide request, upstream and transfer measurements for ``/metrics``"""
+
+    def __init__(self):
+        self.pages: Dict[Labels, Histogram] = {}
+        self.upstream: Dict[Labels, Histogram] = {}
+        self.upstream_errors: Dict[Labels, int] = defaultdict(int)
+        self.image_bytes: Dict[Labels, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _histogram(self, table: Dict[Labels, Histogram], labels: Labels) -> Histogram:
+        histogram = table.get(labels)
+        if histogram is None:
+            with self._lock:
+                histogram = table.setdefault(labels, Histogram())
+        return histogram
+
+    def observe_page(self, route: str, status: int, seconds: float) -> None:
+        self._histogram(self.pages, (('route', route), ('status', str(status)))).observe(seconds)
+
+    def observe_upstream(self, method: str, url: str, seconds: float, status: Optional[int] = None,
+                         error: Optional[str] = None) -> None:
+        labels = (('method', method.upper()), ('endpoint', upstream_endpoint(url)))
+        self._histogram(self.upstream, labels).observe(seconds)
+        if error is not None or (status is not None and status >= 400):
+            self.upstream_errors[labels + (('error', error or str(status)),)] += 1
+
+    def add_image_bytes(self, source: str, count: int) -> None:
+        self.image_bytes[(('source', source),)] += count
+
+    def render(self) -> str:
+        out = Exposition()
+        out.histograms('page_render_seconds', 'Time to answer a page request, by route and status',
+                       sorted(self.pages.items()))
+        out.histograms('upstream_request_seconds', 'Backend call latency, by method and endpoint',
+                       sorted(self.upstream.items()))
+        out.family('upstream_errors_total', 'counter', 'Backend calls that failed or answered >= 400')
+        for labels, count in sorted(self.upstream_errors.items()):
+            out.sample('upstream_errors_total', count, labels)
+        out.family('image_bytes_total', 'counter', 'Image bytes sent to browsers')
+        for labels, count in sorted(self.image_bytes.items()):
+            out.sample('image_bytes_total', count, labels)
+        _collect_caches(out)
+        _collect_sessions(out)
+        _collect_runtime(out)
+        return out.text()
+
+
+def _collect_caches(out: Exposition) -> None:
+    from .api import single_flight
+    from .media_cache import media_cache
+    from .search_cache import search_memo
+    from .tokens import claims_cache
+
+    caches = (('search_memo', search_memo.hits, search_memo.misses),
+              ('jwt_claims', claims_cache.hits, claims_cache.misses),
+              # A coalesced call is served by another caller's in-flight request
+              ('upstream_single_flight', single_flight.coalesced, single_flight.leaders),
+              ('media', media_cache.hits, media_cache.misses))
+    out.family('cache_requests_total', 'counter', 'Cache lookups by cache and result')
+    for name, hits, misses in caches:
+        out.sample('cache_requests_total', hits, (('cache', name), ('result', 'hit')))
+        out.sample('cache_requests_total', misses, (('cache', name), ('result', 'miss')))
+    out.family('cache_hit_ratio', 'gauge', 'Hits over lookups since start')
+    for name, hits, misses in caches:
+        out.sample('cache_hit_ratio', hits / (hits + misses) if hits + misses else 0.0, (('cache', name),))
+    out.scalar('media_cache_bytes', 'gauge', 'Bytes of remote images and fonts cached on disk', media_cache.size)
+    out.scalar('media_cache_evictions_total', 'counter', 'Files evicted from the media cache', media_cache.evictions)
+
+
+def _collect_sessions(out: Exposition) -> None:
+    from nicegui import Client
+
+    clients = list(Client.instances.values())
+    connected = [client for client in clients if client.has_socket_connection]
+    elements = Histogram(ELEMENT_BUCKETS)
+    for client in connected:
+        elements.observe(len(client.elements))
+    out.scalar('websocket_sessions', 'gauge', 'Pages with an open websocket', len(connected))
+    out.scalar('page_clients', 'gauge', 'Page clients in memory, connected or not', len(clients))
+    out.histograms('session_elements', 'UI elements per connected page', [((), elements)])
+
+
+def _collect_runtime(out: Exposition) -> None:
+    from .frontend_store import write_behind_store
+    from .loop_monitor import loop_monitor
+    from .rate_limit import login_limiter, page_limiter, search_limiter
+    from .sessions import session_compactor
+
+    out.histograms('event_loop_lag_seconds', 'How late the event loop wakes up', [((), loop_monitor.lag)])
+    out.histograms('slow_callback_seconds', 'Callbacks that blocked the event loop, by route',
+                   [((('route', route),), h) for route, h in sorted(loop_monitor.slow_by_route.items())])
+    out.family('rate_limit_requests_total', 'counter', 'Rate-limited requests by limiter and outcome')
+    for limiter in (page_limiter, search_limiter, login_limiter):
+        out.sample('rate_limit_requests_total', limiter.allowed, (('limiter', limiter.name), ('outcome', 'allowed')))
+        out.sample('rate_limit_requests_total', limiter.rejected,
+                   (('limiter', limiter.name), ('outcome', 'rejected')))
+    out.scalar('local_store_mutations_total', 'counter', 'Writes to the local store', write_behind_store.mutations)
+    out.scalar('local_store_flushes_total', 'counter', 'Local store file rewrites', write_behind_store.writes)
+    # Figures from the last compaction pass; empty until the first one ran
+    sessions = session_compactor.metrics()
+    for name, key, help_text in (('sessions_live', 'live_sessions', 'Sessions not yet expired'),
+                                 ('session_files', 'session_files', 'Per-session JSON files on disk'),
+                                 ('session_storage_bytes', 'storage_bytes', 'Bytes of session files and database')):
+        out.scalar(name, 'gauge', help_text, sessions.get(key) or 0)
+
+
+metrics = Metrics()
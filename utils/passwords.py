@@ -0,0 +1,111 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+
+# scrypt cost parameters; N=2**14, r=8 takes ~50 ms and 16 MB per hash
+SCRYPT_N = int(os.getenv('PASSWORD_SCRYPT_N', str(2 ** 14)))
+SCRYPT_R = int(os.getenv('PASSWORD_SCRYPT_R', '8'))
+SCRYPT_P = int(os.getenv('PASSWORD_SCRYPT_P', '1'))
+# Used where hashlib has no scrypt (Python built against an old OpenSSL)
+PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', '600000'))
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# Hashes run in this many threads; hashlib releases the GIL while hashing
+KDF_WORKERS = int(os.getenv('PASSWORD_KDF_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Hashes allowed to wait for a worker before new logins are turned away
+KDF_QUEUE_LIMIT = int(os.getenv('PASSWORD_KDF_QUEUE_LIMIT', '32'))
+
+
+class KDFBusyError(RuntimeError):
+    """Raised when the password hashing queue is full"""
+    pass
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii')
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem must cover 128 * n * r bytes
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, dklen=KEY_BYTES,
+                          maxmem=256 * n * r + 1024 * 1024)
+
+
+def hash_password(password: str) -> str:
+    """Salted hash of ``password`` encoded with its parameters, e.g. ``scrypt$16384$8$1$<salt>$<key>``"""
+    salt = secrets.token_bytes(SALT_BYTES)
+    if hasattr(hashlib, 'scrypt'):
+        key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(key)}"
+    key = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, PBKDF2_ITERATIONS, KEY_BYTES)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(key)}"
+
+
+def _parse(encoded: str) -> Tuple[str, List[str]]:
+    scheme, _, rest = encoded.partition('$')
+    return scheme, rest.split('$')
+
+
+def verify_password(password: str, encoded: str) -> bool:
+    """Check ``password`` against a stored hash in constant time"""
+    if not encoded:
+        return False
+    scheme, parts = _parse(encoded)
+    try:
+        if scheme == 'scrypt':
+            n, r, p, salt, key = parts
+            candidate = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+        elif scheme == 'pbkdf2_sha256':
+            iterations, salt, key = parts
+            candidate = hashlib.pbkdf2_hmac('sha256', password.encode(), base64.b64decode(salt), int(iterations),
+                                            KEY_BYTES)
+        else:
+            # Unsalted SHA-256 hex from before salted hashing
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), encoded)
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(candidate, base64.b64decode(key))
+
+
+def needs_rehash(encoded: str) -> bool:
+    """True for legacy hashes and hashes made with weaker parameters than the current ones"""
+    scheme, parts = _parse(encoded or '')
+    if scheme == 'scrypt' and len(parts) == 5:
+        return (int(parts[0]), int(parts[1]), int(parts[2])) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    if scheme == 'pbkdf2_sha256' and len(parts) == 3:
+        return hasattr(hashlib, 'scrypt') or int(parts[0]) < PBKDF2_ITERATIONS
+    return True
+
+
+class KDFPool:
+    """Bounded thread pool for password hashing.
+
+    At most ``workers`` hashes run at once and at most ``queue_limit`` more
+    wait; beyond that ``run`` raises KDFBusyError immediately, so a login
+    burst cannot pile up unbounded work or memory.
+    """
+
+    def __init__(self, workers: int = KDF_WORKERS, queue_limit: int = KDF_QUEUE_LIMIT):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='kdf')
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the pool and wait for the result"""
+        if not self._slots.acquire(blocking=False):
+            raise KDFBusyError('Too many sign-ins at once, please try again')
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+
+kdf_pool = KDFPool()
@@ -0,0 +1,168 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .adverts import DIETARY_TAGS
+from .catalogue_index import CatalogueIndex
+
+CURRENCY = r"(?:ghs|gh₵|\$)"
+# An amount; "under 30 min" is a preparation time, not a price
+AMOUNT = r"(\d+(?:\.\d+)?)(?![\d.]|\s*(?:mins?|minutes?|hrs?|hours?)\b)"
+NUMBER = rf"{CURRENCY}?\s*{AMOUNT}"
+
+PRICE_PATTERNS: List[Tuple[str, str]] = [
+    ('between', rf"\b(?:between|from)\s+{NUMBER}\s*(?:and|to|-)\s*{NUMBER}"),
+    ('between', rf"{NUMBER}\s*(?:-|to)\s*{NUMBER}"),
+    ('max', rf"(?:\b(?:under|below|less than|cheaper than|up to|at most|max)\s*|<=?\s*){NUMBER}"),
+    ('min', rf"(?:\b(?:over|above|more than|at least)\s*|>=?\s*){NUMBER}"),
+    # A bare "min 5" usually means minutes; as a price it needs a currency or the word "price"
+    ('min', rf"\bmin(?:imum)?\s*(?:price\s*)?{CURRENCY}\s*{AMOUNT}"),
+    ('min', rf"\bmin(?:imum)?\s+price\s*{AMOUNT}"),
+]
+
+SPICINESS_PHRASES: Dict[str, Tuple[str, ...]] = {
+    'not spicy': ('Not Spicy',),
+    'non spicy': ('Not Spicy',),
+    'no spice': ('Not Spicy',),
+    'very spicy': ('Very Hot',),
+    'extra spicy': ('Very Hot',),
+    'very hot': ('Very Hot',),
+    'medium spicy': ('Medium',),
+    'mild': ('Mild',),
+    'spicy': ('Medium', 'Hot', 'Very Hot'),
+}
+
+# Intents an advert also satisfies by naming them in its text, when the field itself is not set
+TEXT_FIELDS = ('dietary', 'spiciness', 'category')
+
+# Words of the price patterns; typo correction leaves them alone ("price" is not a misspelt "rice")
+QUERY_KEYWORDS = {'between', 'from', 'to', 'under', 'below', 'less', 'than', 'cheaper', 'up', 'at', 'most', 'max',
+                  'over', 'above', 'more', 'least', 'min', 'minimum', 'price', 'prices', 'priced', 'cost', 'costs',
+                  'ghs', 'mins', 'minutes', 'hrs', 'hours'}
+
+# Connector words left over once intents are removed carry no meaning on their own
+FILLER_WORDS = {'and', 'with', 'for', 'a', 'an', 'the', 'some', 'that', 'is', 'are', 'in', 'me',
+                'food', 'meal', 'meals', 'dish', 'dishes'}
+
+
+def _alternation(phrases: Iterable[str]) -> str:
+    # Longest first so "very spicy" wins over "spicy"
+    return '|'.join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+
+
+def merge_filters(*filter_sets: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine filters dicts; price ranges intersect, other fields from later sets win"""
+    merged: Dict[str, Any] = {}
+    for filters in filter_sets:
+        for field, value in (filters or {}).items():
+            if field == 'price_range' and 'price_range' in merged:
+                low = [v for v in (merged['price_range'].get('min'), value.get('min')) if v is not None]
+                high = [v for v in (merged['price_range'].get('max'), value.get('max')) if v is not None]
+                merged['price_range'] = {'min': max(low) if low else None, 'max': min(high) if high else None}
+            elif value:
+                merged[field] = value
+    return merged
+
+
+class QueryParser:
+    """Turns natural-language queries into structured filters plus residual text.
+
+    "cheap vegan under 30 spicy" becomes ``{'price_range': {'min': 0, 'max': 15},
+    'dietary': ('Vegan',), 'spiciness': ('Medium', 'Hot', 'Very Hot')}`` with
+    no text left to score. ``parse_intents`` also returns each dietary,
+    spiciness and category phrase with the fields it names, so a search can
+    let adverts that say "vegetarian" in their description satisfy it
+    without the field being set (see ``TEXT_FIELDS``). The output uses the
+    SearchFilterComponent filters shape so it can be evaluated by
+    CatalogueIndex and merged with UI filters. Static patterns are compiled
+    once; the category pattern is recompiled only when the set of indexed
+    categories changes.
+    """
+
+    def __init__(self, price_ranges: Dict[str, Tuple[float, float]], synonyms: Dict[str, List[str]],
+                 index: CatalogueIndex):
+        self.index = index
+        # Price words and their synonyms ("budget" -> cheap) that are not ranges themselves
+        self.price_words: Dict[str, Tuple[float, float]] = dict(price_ranges)
+        for term, alternatives in synonyms.items():
+            if term in price_ranges:
+                for alternative in alternatives:
+                    self.price_words.setdefault(alternative, price_ranges[term])
+        self.dietary_phrases = {phrase: tag for tag, phrases in DIETARY_TAGS.items() for phrase in phrases}
+
+        self._price_patterns = [(kind, re.compile(pattern)) for kind, pattern in PRICE_PATTERNS]
+        self._price_word_re = re.compile(rf"\b(?:{_alternation(self.price_words)})\b")
+        self._dietary_re = re.compile(rf"\b(?:{_alternation(self.dietary_phrases)})\b")
+        self._spiciness_re = re.compile(rf"\b(?:{_alternation(SPICINESS_PHRASES)})\b")
+        self._categories: Tuple[str, ...] = ()
+        self._category_re: Optional[re.Pattern] = None
+        self._category_names: Dict[str, str] = {}
+        # Words the parser gives a meaning to, kept out of typo correction
+        self.keywords = frozenset(QUERY_KEYWORDS | FILLER_WORDS | {
+            word for phrase in (*self.price_words, *self.dietary_phrases, *SPICINESS_PHRASES)
+            for word in phrase.replace('-', ' ').split()})
+
+    def _category_pattern(self) -> Optional[re.Pattern]:
+        categories = tuple(self.index.values('category'))
+        if categories != self._categories:
+            names: Dict[str, str] = {}
+            for category in categories:
+                lower = category.lower()
+                names[lower] = category
+                # "dessert" finds "Desserts"
+                if lower.endswith('s') and len(lower) > 3:
+                    names.setdefault(lower[:-1], category)
+            self._categories = categories
+            self._category_names = names
+            self._category_re = re.compile(rf"\b(?:{_alternation(names)})\b") if names else None
+        return self._category_re
+
+    def parse(self, query: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        """Return ``(remaining_text, filters)`` for a raw search query"""
+        remaining, filters, _ = self.parse_intents(query)
+        return remaining, filters
+
+    def parse_intents(self, query: Optional[str]) -> Tuple[str, Dict[str, Any], List[Tuple[str, Dict[str, Any]]]]:
+        """Like ``parse``, plus ``(phrase, {field: values})`` for each dietary, spiciness and category phrase"""
+        text = ' '.join((query or '').lower().split())
+        filters: Dict[str, Any] = {}
+
+        def add_price(low: Optional[float], high: Optional[float]) -> None:
+            filters.update(merge_filters(filters, {'price_range': {'min': low, 'max': high}}))
+
+        for kind, pattern in self._price_patterns:
+            for match in pattern.finditer(text):
+                if kind == 'between':
+                    low, high = sorted((float(match.group(1)), float(match.group(2))))
+                    add_price(low, high)
+                elif kind == 'max':
+                    add_price(None, float(match.group(1)))
+                else:
+                    add_price(float(match.group(1)), None)
+            text = pattern.sub(' ', text)
+
+        for match in self._price_word_re.finditer(text):
+            add_price(*self.price_words[match.group(0)])
+        text = self._price_word_re.sub(' ', text)
+
+        # One intent per phrase; "vegetarian" names both a dietary tag and a category
+        intents: Dict[str, Dict[str, Any]] = {}
+        for match in self._dietary_re.finditer(text):
+            intents.setdefault(match.group(0), {})['dietary'] = (self.dietary_phrases[match.group(0)],)
+        for match in self._spiciness_re.finditer(text):
+            intents.setdefault(match.group(0), {})['spiciness'] = SPICINESS_PHRASES[match.group(0)]
+        patterns = [self._dietary_re, self._spiciness_re]
+        category_re = self._category_pattern()
+        if category_re is not None:
+            for match in category_re.finditer(text):
+                intents.setdefault(match.group(0), {})['category'] = (self._category_names[match.group(0)],)
+            patterns.append(category_re)
+        for pattern in patterns:
+            text = pattern.sub(' ', text)
+
+        for field in TEXT_FIELDS:
+            values = [value for fields in intents.values() for value in fields.get(field, ())]
+            if values:
+                filters[field] = tuple(dict.fromkeys(values))
+
+        remaining = ' '.join(word for word in text.split() if word not in FILLER_WORDS)
+        return remaining, filters, list(intents.items())
@@ -0,0 +1,171 @@
+import asyncio
+import functools
+import ipaddress
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from nicegui import app, ui
+from starlette.responses import PlainTextResponse
+
+# One IP may carry several sessions (NAT, shared office), so its bucket is this many sessions big
+IP_FACTOR = 5
+# Buckets kept per limiter; the least recently used are dropped beyond this
+MAX_BUCKETS = 100_000
+# Peers (addresses or networks, comma-separated) whose X-Forwarded-For header is believed, e.g. the load balancer
+TRUSTED_PROXIES = tuple(ipaddress.ip_network(proxy.strip(), strict=False)
+                        for proxy in os.getenv('TRUSTED_PROXIES', '').split(',') if proxy.strip())
+
+
+def is_trusted_proxy(host: Optional[str]) -> bool:
+    try:
+        address = ipaddress.ip_address(host or '')
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def client_ip(peer: Optional[str], forwarded: str) -> Optional[str]:
+    """Address of the client behind ``peer``.
+
+    X-Forwarded-For is only read when the peer is a trusted proxy; anyone
+    else could send any address. Proxies append the address they received
+    from, so the client is the right-most entry that is not a trusted proxy.
+    """
+    if not is_trusted_proxy(peer):
+        return peer
+    for hop in reversed([hop.strip() for hop in forwarded.split(',') if hop.strip()]):
+        if not is_trusted_proxy(hop):
+            return hop
+    return peer
+
+
+def client_keys() -> Tuple[Optional[str], Optional[str]]:
+    """(browser session id, client IP) of the request being handled, None where unknown"""
+    try:
+        session = app.storage.browser.get('id')
+    except (RuntimeError, AttributeError):
+        session = None
+    ip = None
+    try:
+        request = ui.context.client.request
+        if request is not None:
+            ip = client_ip(request.client.host if request.client else None, request.headers.get('x-forwarded-for', ''))
+    except (RuntimeError, AttributeError):
+        pass
+    return session, ip
+
+
+class RateLimiter:
+    """Token buckets per session and per IP, refilled at ``rate`` tokens per second up to ``burst``.
+
+    A check is one dict lookup and a little arithmetic per key. Buckets live
+    in memory and are evicted least-recently-used once ``max_buckets`` is reached.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, ip_factor: int = IP_FACTOR,
+                 max_buckets: int = MAX_BUCKETS):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.ip_factor = ip_factor
+        self.max_buckets = max_buckets
+        self.allowed = 0
+        self.rejected = 0
+        self._buckets: 'OrderedDict[Hashable, List[float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _take(self, key: Hashable, rate: float, burst: float, now: float) -> bool:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [burst, now]
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] < 1:
+            return False
+        bucket[0] -= 1
+        return True
+
+    def allow(self, session: Optional[str], ip: Optional[str]) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            ok = ((session is None or self._take(('session', session), self.rate, self.burst, now)) and
+                  (ip is None or self._take(('ip', ip), self.rate * self.ip_factor,
+                                            self.burst * self.ip_factor, now)))
+            if ok:
+                self.allowed += 1
+            else:
+                self.rejected += 1
+            return ok
+
+    def retry_after(self) -> int:
+        """Seconds until one token is back in an empty bucket"""
+        return max(1, int(1 / self.rate + 0.999))
+
+    def check(self) -> bool:
+        return self.allow(*client_keys())
+
+
+def rate_limited(limiter: RateLimiter, page: bool = False, defer: bool = False) -> Callable:
+    """Guard a ``@ui.page`` function or event handler with ``limiter``.
+
+    A limited event handler is skipped with a notification; a limited page
+    (``page=True``) answers 429 with Retry-After instead of rendering. With
+    ``defer=True`` a limited event handler is not skipped but run once the
+    limiter has a token again; calls arriving meanwhile replace the pending
+    one, so only the latest runs. Use it for handlers such as search, where
+    dropping the last keystroke would leave stale results on screen.
+    """
+
+    def reject() -> Any:
+        if page:
+            return PlainTextResponse('Too many requests, please slow down.', status_code=429,
+                                     headers={'Retry-After': str(limiter.retry_after())})
+        ui.notify('Too many requests, please slow down.', type='warning')
+        return None
+
+    def decorator(func: Callable) -> Callable:
+        # Arguments of the call waiting for a token, while one is scheduled
+        deferred: Dict[str, Tuple[tuple, dict]] = {}
+
+        def limited(args: tuple, kwargs: dict) -> Any:
+            if not defer:
+                return reject()
+            if 'call' not in deferred:
+                ui.timer(1 / limiter.rate, run_deferred, once=True)
+            deferred['call'] = (args, kwargs)
+            return None
+
+        def run_deferred() -> Any:
+            args, kwargs = deferred.pop('call')
+            return guarded(*args, **kwargs)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def guarded(*args, **kwargs):
+                if not limiter.check():
+                    return limited(args, kwargs)
+                return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def guarded(*args, **kwargs):
+                if not limiter.check():
+                    return limited(args, kwargs)
+                return func(*args, **kwargs)
+        return guarded
+
+    return decorator
+
+
+# Page loads fetch from the backend and render whole card lists
+page_limiter = RateLimiter('page', rate=1, burst=10)
+# Search runs on every keystroke
+search_limiter = RateLimiter('search', rate=8, burst=30)
+# Sign-in and sign-up hit the KDF and the auth API
+login_limiter = RateLimiter('login', rate=0.1, burst=5)
@@ -0,0 +1,126 @@
+# utils/search.py
+from typing import Any, Dict, Optional
+
+from .catalogue_index import CatalogueIndex, catalogue_index
+from .fuzzy import FuzzyIndex, MAX_EDIT_DISTANCE, fuzzy_index, words
+from .query_parser import TEXT_FIELDS, QueryParser, merge_filters
+
+
+# AI Search Engine Class
+class AISearchEngine:
+    def __init__(self, fuzzy: Optional[FuzzyIndex] = None, max_edit_distance: int = MAX_EDIT_DISTANCE,
+                 index: Optional[CatalogueIndex] = None):
+        # Typo tolerance; max_edit_distance=0 turns it off
+        self.fuzzy = fuzzy if fuzzy is not None else fuzzy_index
+        self.max_edit_distance = max_edit_distance
+        self.index = index if index is not None else catalogue_index
+        
+        self.synonyms = {
+            'cheap': ['affordable', 'budget', 'inexpensive'],
+            'expensive': ['pricey', 'costly', 'high end'],
+            'quick': ['fast', 'speedy'],
+            'romantic': ['intimate', 'cozy'],
+            'family': ['kids', 'children'],
+        }
+        
+        self.price_ranges = {
+            'cheap': (0, 15),
+            'affordable': (10, 25),
+            'moderate': (20, 40),
+            'expensive': (35, 1000),
+        }
+        
+        self.parser = QueryParser(self.price_ranges, self.synonyms, self.index)
+    
+    def expand_query(self, query):
+        if not query or len(query.strip()) < 2:
+            return [query.lower()] if query else ['']
+        
+        query = query.lower().strip()
+        expanded_queries = [query]
+        
+        for term, synonyms in self.synonyms.items():
+            if term in query:
+                for synonym in synonyms:
+                    new_query = query.replace(term, synonym)
+                    expanded_queries.append(new_query)
+        
+        return list(set(expanded_queries))
+    
+    def correct_query(self, query):
+        """Replace words missing from the catalogue vocabulary with their closest spelling"""
+        query = (query or '').lower().strip()
+        if not self.max_edit_distance:
+            return query
+        corrected = []
+        for word in words(query):
+            if word in self.fuzzy or word in self.parser.keywords or word.isdigit():
+                corrected.append(word)
+            else:
+                corrected.append(self.fuzzy.correct(word, self.max_edit_distance) or word)
+        return ' '.join(corrected)
+    
+    def intelligent_search(self, query, adverts):
+        if not query or len(query.strip()) < 2:
+            return adverts
+        
+        original_query = query.lower().strip()
+        expanded_queries = self.expand_query(original_query)
+        query_words = set(original_query.split())
+        
+        # Typo-corrected variant ("jolof" -> "jollof") scores like a synonym expansion
+        corrected_query = self.correct_query(original_query)
+        if corrected_query and corrected_query != original_query:
+            expanded_queries = list(set(expanded_queries + self.expand_query(corrected_query)))
+            query_words |= set(corrected_query.split())
+        scored_results = []
+        
+        for advert in adverts:
+            score = 0
+            advert_text = advert['searchText']
+            
+            if original_query in advert_text:
+                score += 10
+            
+            for expanded_query in expanded_queries:
+                if expanded_query in advert_text:
+                    score += 5
+            
+            common_words = query_words.intersection(advert['searchTokens'])
+            score += len(common_words) * 2
+            
+            if score > 0:
+                scored_results.append((score, advert))
+        
+        scored_results.sort(key=lambda x: x[0], reverse=True)
+        return [result[1] for result in scored_results]
+    
+    def parse_query(self, query):
+        """Split a query into free text and structured filters (price, dietary, spiciness, category)"""
+        return self.parser.parse(query)
+    
+    def search(self, query, filters: Optional[Dict[str, Any]] = None):
+        """Search the indexed catalogue.
+        
+        Price intents parsed from the query and the explicit ``filters`` are
+        evaluated on the catalogue index first. Each dietary, spiciness and
+        category intent then narrows that set: an advert satisfies it when the
+        field is set, or when its name or description contains the phrase, so
+        "vegetarian" also finds untagged adverts that say so. Text scoring
+        only runs over what is left.
+        """
+        text, parsed, intents = self.parser.parse_intents(query)
+        hard = {field: value for field, value in parsed.items() if field not in TEXT_FIELDS}
+        bitmap = self.index.evaluate(merge_filters(filters, hard))
+        for phrase, fields in intents:
+            if not bitmap:
+                break
+            tagged = 0
+            for field, values in fields.items():
+                tagged |= self.index.value_bitmap(field, values)
+            untagged = [ad for ad in self.index.records(bitmap & ~tagged) if phrase in ad['searchText']]
+            bitmap &= tagged | self.index.bitmap_of(untagged)
+        candidates = self.index.records(bitmap)
+        if len(text) < 2:
+            return candidates
+        return self.intelligent_search(text, candidates)
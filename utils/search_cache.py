@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .catalogue import Catalogue, catalogue
+
+SEARCH_MEMO_SIZE = 512
+
+
+def normalize_query(query: Optional[str]) -> str:
+    return ' '.join((query or '').lower().split())
+
+
+def freeze_filters(filters: Optional[Dict[str, Any]]) -> Tuple:
+    """Turn a SearchFilterComponent filters dict into a hashable key part"""
+    if not filters:
+        return ()
+    frozen = []
+    for key, value in sorted(filters.items()):
+        if isinstance(value, dict):
+            value = tuple(sorted(value.items()))
+        elif isinstance(value, (list, set)):
+            value = tuple(sorted(value))
+        frozen.append((key, value))
+    return tuple(frozen)
+
+
+class SearchMemo:
+    """LRU memo of search/filter results shared across sessions.
+
+    Keys start with the catalogue version and the whole memo is dropped when
+    the catalogue changes, so a hit is always consistent with current data.
+    Values are whatever the caller stores, typically ``(match_count, ids)``.
+    """
+
+    def __init__(self, source: Catalogue, maxsize: int = SEARCH_MEMO_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        source.subscribe(lambda _: self.clear())
+
+    def key(self, version: Hashable, query: Optional[str], min_price: Any = None, max_price: Any = None,
+            filters: Optional[Dict[str, Any]] = None) -> Tuple:
+        return (version, normalize_query(query), min_price, max_price, freeze_filters(filters))
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+search_memo = SearchMemo(catalogue)
@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from nicegui import background_tasks, run
+from starlette.requests import Request
+
+from .storage import STORAGE_BACKEND, STORAGE_DIR, USER_NAMESPACE_PREFIX, shared_backend
+
+logger = logging.getLogger(__name__)
+
+USER_FILE_PREFIX = 'storage-user-'
+# Sessions not seen for this long are removed
+SESSION_TTL = int(os.getenv('SESSION_TTL', str(30 * 24 * 3600)))
+COMPACT_INTERVAL = int(os.getenv('SESSION_COMPACT_INTERVAL', '3600'))
+# A session's last-seen time is written at most this often
+TOUCH_INTERVAL = 300
+
+
+class SessionCompactor:
+    """Expires idle sessions so per-visitor storage does not grow without bound.
+
+    Requests record when each session was last seen (``middleware``) by
+    touching its user file or its rows in the shared database, so a visitor
+    who only reads stays signed in. Each pass scans ``.nicegui/`` once. User
+    files not touched within the TTL are deleted. With the SQLite backend, files still in use are also moved into
+    the shared database and removed, and sessions there past the TTL are
+    dropped in one indexed query. Session counts and storage size from the
+    last pass are kept for ``metrics()``.
+    """
+
+    def __init__(self, directory: str = STORAGE_DIR, ttl: int = SESSION_TTL, interval: int = COMPACT_INTERVAL,
+                 migrate: Optional[bool] = None):
+        self.directory = directory
+        self.ttl = ttl
+        self.interval = interval
+        # Files only need migrating when sessions are served from the shared store
+        self.migrate = STORAGE_BACKEND == 'sqlite' if migrate is None else migrate
+        self.expired_total = 0
+        self.migrated_total = 0
+        self._metrics: Dict[str, Any] = {}
+        # Session id -> when its last-seen time was last written
+        self._seen: Dict[str, float] = {}
+        self._seen_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _user_files(self) -> Iterator[os.DirEntry]:
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith(USER_FILE_PREFIX) and entry.name.endswith('.json'):
+                        yield entry
+        except FileNotFoundError:
+            return
+
+    def _migrate_file(self, path: str, session_id: str) -> None:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict) and data:
+            shared_backend().set_many(USER_NAMESPACE_PREFIX + session_id,
+                                      {key: json.dumps(value) for key, value in data.items()})
+        os.remove(path)
+
+    # --- Last seen ---
+
+    def seen(self, session_id: str, now: Optional[float] = None) -> bool:
+        """Note a request of ``session_id``; True when its last-seen time is due to be written"""
+        now = time.time() if now is None else now
+        with self._seen_lock:
+            if now - self._seen.get(session_id, 0) < TOUCH_INTERVAL:
+                return False
+            self._seen[session_id] = now
+        return True
+
+    def touch(self, session_id: str, now: Optional[float] = None) -> None:
+        """Write the last-seen time of a session; blocking, run off the event loop"""
+        now = time.time() if now is None else now
+        if STORAGE_BACKEND == 'sqlite':
+            shared_backend().touch(USER_NAMESPACE_PREFIX + session_id, now)
+        try:
+            os.utime(os.path.join(self.directory, f'{USER_FILE_PREFIX}{session_id}.json'), (now, now))
+        except FileNotFoundError:
+            pass
+
+    async def middleware(self, request: Request, call_next):
+        """HTTP middleware recording that the requesting session is in use; register with ``app.middleware``"""
+        session_id = request.session.get('id') if 'session' in request.scope else None
+        if session_id and self.seen(session_id):
+            background_tasks.create(run.io_bound(self.touch, session_id), name='touch session')
+        return await call_next(request)
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Run one expiry/compaction pass and return the updated metrics"""
+        started = time.monotonic()
+        now = time.time() if now is None else now
+        cutoff = now - self.ttl
+        expired = migrated = live_files = file_bytes = 0
+
+        for entry in self._user_files():
+            try:
+                stat = entry.stat()
+                if stat.st_mtime < cutoff:
+                    os.remove(entry.path)
+                    expired += 1
+                elif self.migrate:
+                    session_id = entry.name[len(USER_FILE_PREFIX):-len('.json')]
+                    self._migrate_file(entry.path, session_id)
+                    migrated += 1
+                else:
+                    live_files += 1
+                    file_bytes += stat.st_size
+            except FileNotFoundError:
+                # Another worker got to it first
+                continue
+            except (OSError, ValueError):
+                logger.exception('Could not compact session file %s', entry.path)
+
+        live_sessions = live_files
+        database_bytes = 0
+        if STORAGE_BACKEND == 'sqlite':
+            backend = shared_backend()
+            expired += backend.expire_namespaces(USER_NAMESPACE_PREFIX, cutoff)
+            live_sessions += backend.count_namespaces(USER_NAMESPACE_PREFIX, cutoff)
+            database_bytes = backend.size()
+
+        with self._seen_lock:
+            self._seen = {session_id: seen for session_id, seen in self._seen.items() if now - seen < TOUCH_INTERVAL}
+
+        self.expired_total += expired
+        self.migrated_total += migrated
+        self._metrics = {
+            'live_sessions': live_sessions,
+            'session_files': live_files,
+            'session_file_bytes': file_bytes,
+            'database_bytes': database_bytes,
+            'storage_bytes': file_bytes + database_bytes,
+            'expired_total': self.expired_total,
+            'migrated_total': self.migrated_total,
+            'last_compaction': now,
+            'compaction_seconds': round(time.monotonic() - started, 4),
+        }
+        return self.metrics()
+
+    def metrics(self) -> Dict[str, Any]:
+        return dict(self._metrics)
+
+    # --- Background thread ---
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.compact()
+            except Exception:
+                logger.exception('Session compaction failed')
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self) -> None:
+        """Compact now and then every ``interval`` seconds on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='session-compactor', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+session_compactor = SessionCompactor()
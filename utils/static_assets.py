@@ -0,0 +1,76 @@
+import hashlib
+import os
+import weakref
+from typing import Dict, Set
+
+from nicegui import context, ui
+from starlette.responses import FileResponse, PlainTextResponse, Response
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+# Bundles that get fingerprinted URLs, relative to ASSETS_DIR
+BUNDLE_DIRS = ('css', 'js')
+STATIC_URL = '/static'
+# The URL changes with the content, so browsers may keep a response forever
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def fingerprint(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+class StaticBundles:
+    """Page CSS and JS served under content-hashed URLs.
+
+    At import every file under ``assets/css`` and ``assets/js`` is hashed.
+    ``css/home.css`` becomes ``/static/css/home.<hash>.css``, and that URL
+    is served with an immutable Cache-Control header. A browser downloads
+    each bundle once per version. Pages carry one short tag per bundle
+    instead of the whole stylesheet.
+    """
+
+    def __init__(self, directory: str = ASSETS_DIR):
+        self.directory = directory
+        self.urls: Dict[str, str] = {}
+        self.files: Dict[str, str] = {}
+        self._included: 'weakref.WeakKeyDictionary[object, Set[str]]' = weakref.WeakKeyDictionary()
+        self.scan()
+
+    def scan(self) -> None:
+        for sub in BUNDLE_DIRS:
+            folder = os.path.join(self.directory, sub)
+            if not os.path.isdir(folder):
+                continue
+            for filename in sorted(os.listdir(folder)):
+                path = os.path.join(folder, filename)
+                if not os.path.isfile(path):
+                    continue
+                stem, ext = os.path.splitext(filename)
+                hashed = f'{sub}/{stem}.{fingerprint(path)}{ext}'
+                self.urls[f'{sub}/{filename}'] = f'{STATIC_URL}/{hashed}'
+                self.files[hashed] = path
+
+    def url(self, name: str) -> str:
+        return self.urls[name]
+
+    def tag(self, name: str) -> str:
+        if name.endswith('.js'):
+            return f'<script src="{self.url(name)}" defer></script>'
+        return f'<link rel="stylesheet" href="{self.url(name)}">'
+
+    def include(self, name: str) -> None:
+        """Add the bundle's tag to the current page, once however often it is called"""
+        included = self._included.setdefault(context.client, set())
+        if name not in included:
+            included.add(name)
+            ui.add_head_html(self.tag(name))
+
+    def response(self, path: str) -> Response:
+        local = self.files.get(path)
+        if local is None:
+            # Old fingerprints are gone; their URL must never start serving newer content
+            return PlainTextResponse('Not Found', status_code=404)
+        return FileResponse(local, headers={'Cache-Control': IMMUTABLE})
+
+
+static_bundles = StaticBundles()
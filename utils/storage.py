@@ -0,0 +1,202 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, MutableMapping, Optional
+
+from nicegui import app
+
+# Where NiceGUI keeps storage-general.json and one storage-user-<id>.json per browser
+STORAGE_DIR = os.getenv('NICEGUI_STORAGE_PATH', '.nicegui')
+# 'nicegui' keeps NiceGUI's per-process JSON files; 'sqlite' shares one WAL database between workers
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'nicegui')
+STORAGE_PATH = os.getenv('STORAGE_PATH', os.path.join(STORAGE_DIR, 'storage.sqlite3'))
+# Milliseconds a worker waits for another worker's write lock before failing
+BUSY_TIMEOUT_MS = 5000
+
+GENERAL_NAMESPACE = 'general'
+USER_NAMESPACE_PREFIX = 'user:'
+
+
+class SQLiteStorage:
+    """Namespaced JSON key/value store in one SQLite file, safe to share between processes.
+
+    WAL mode lets any number of worker processes read while one writes, and
+    every write is its own transaction, so a value written by one worker is
+    visible to the next read in any other. Connections are per thread.
+    """
+
+    def __init__(self, path: str = STORAGE_PATH):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated_at REAL NOT NULL,'
+                ' PRIMARY KEY (namespace, key))'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS entries_updated_at ON entries (updated_at)')
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+            self._local.db = db
+        return db
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        row = self._connection().execute(
+            'SELECT value FROM entries WHERE namespace = ? AND key = ?', (namespace, key)).fetchone()
+        return row[0] if row else None
+
+    def set(self, namespace: str, key: str, value: str) -> None:
+        self.set_many(namespace, {key: value})
+
+    def set_many(self, namespace: str, values: Dict[str, str]) -> None:
+        """Write several keys in one transaction"""
+        now = time.time()
+        db = self._connection()
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            db.executemany(
+                'INSERT INTO entries (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)'
+                ' ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at',
+                [(namespace, key, value, now) for key, value in values.items()],
+            )
+
+    def transform(self, namespace: str, key: str, func: Callable[[Optional[str]], str]) -> str:
+        """Replace a value with ``func(old value or None)`` in one transaction; no other writer runs in between.
+
+        If ``func`` raises, nothing is written and the exception propagates.
+        """
+        db = self._connection()
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            row = db.execute('SELECT value FROM entries WHERE namespace = ? AND key = ?', (namespace, key)).fetchone()
+            value = func(row[0] if row else None)
+            db.execute(
+                'INSERT INTO entries (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)'
+                ' ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at',
+                (namespace, key, value, time.time()),
+            )
+        return value
+
+    def delete(self, namespace: str, key: str) -> bool:
+        cursor = self._connection().execute('DELETE FROM entries WHERE namespace = ? AND key = ?', (namespace, key))
+        return cursor.rowcount > 0
+
+    def clear(self, namespace: str) -> None:
+        self._connection().execute('DELETE FROM entries WHERE namespace = ?', (namespace,))
+
+    def keys(self, namespace: str) -> List[str]:
+        rows = self._connection().execute('SELECT key FROM entries WHERE namespace = ? ORDER BY key', (namespace,))
+        return [row[0] for row in rows]
+
+    def count(self, namespace: str) -> int:
+        row = self._connection().execute('SELECT COUNT(*) FROM entries WHERE namespace = ?', (namespace,)).fetchone()
+        return row[0]
+
+    def touch(self, namespace: str, now: Optional[float] = None) -> None:
+        """Mark a namespace as used now without changing its values"""
+        self._connection().execute('UPDATE entries SET updated_at = ? WHERE namespace = ?',
+                                   (time.time() if now is None else now, namespace))
+
+    # --- Namespaces by prefix (e.g. all user sessions) ---
+
+    def count_namespaces(self, prefix: str, since: float = 0) -> int:
+        """Namespaces under ``prefix`` written to or touched at or after ``since``"""
+        row = self._connection().execute(
+            'SELECT COUNT(*) FROM (SELECT namespace FROM entries WHERE namespace >= ? AND namespace < ?'
+            ' GROUP BY namespace HAVING MAX(updated_at) >= ?)', (prefix, prefix + '\uffff', since)).fetchone()
+        return row[0]
+
+    def expire_namespaces(self, prefix: str, before: float) -> int:
+        """Delete namespaces under ``prefix`` not written to or touched since ``before``; returns how many"""
+        db = self._connection()
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+            stale = [row[0] for row in db.execute(
+                'SELECT namespace FROM entries WHERE namespace >= ? AND namespace < ?'
+                ' GROUP BY namespace HAVING MAX(updated_at) < ?', (prefix, prefix + '\uffff', before))]
+            db.executemany('DELETE FROM entries WHERE namespace = ?', [(namespace,) for namespace in stale])
+        return len(stale)
+
+    def size(self) -> int:
+        """Bytes on disk, including the write-ahead log"""
+        return sum(os.path.getsize(path) for path in (self.path, self.path + '-wal') if os.path.exists(path))
+
+
+class SharedDict(MutableMapping):
+    """Dict view of one storage namespace, a drop-in for ``app.storage.general``/``user``.
+
+    Values are JSON encoded and every access goes to the database, so workers
+    never serve each other stale data. As with NiceGUI's storage, mutating a
+    value in place is not persisted until it is assigned back.
+    """
+
+    def __init__(self, backend: SQLiteStorage, namespace: str):
+        self.backend = backend
+        self.namespace = namespace
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.backend.get(self.namespace, key)
+        if value is None:
+            raise KeyError(key)
+        return json.loads(value)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.backend.set(self.namespace, key, json.dumps(value))
+
+    def __delitem__(self, key: str) -> None:
+        if not self.backend.delete(self.namespace, key):
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.backend.keys(self.namespace))
+
+    def __len__(self) -> int:
+        return self.backend.count(self.namespace)
+
+    def clear(self) -> None:
+        self.backend.clear(self.namespace)
+
+    def transform(self, key: str, func: Callable[[Any], Any], default: Any = None) -> Any:
+        """Atomically replace ``self[key]`` (``default`` if missing) with ``func`` of it, across all workers"""
+        def apply(value: Optional[str]) -> str:
+            return json.dumps(func(json.loads(value) if value is not None else default))
+        return json.loads(self.backend.transform(self.namespace, key, apply))
+
+
+_backend: Optional[SQLiteStorage] = None
+_backend_lock = threading.Lock()
+
+
+def shared_backend() -> SQLiteStorage:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = SQLiteStorage(STORAGE_PATH)
+    return _backend
+
+
+def general_storage() -> MutableMapping:
+    """Storage shared by all sessions (``app.storage.general`` unless a shared backend is configured)"""
+    if STORAGE_BACKEND == 'sqlite':
+        return SharedDict(shared_backend(), GENERAL_NAMESPACE)
+    return app.storage.general
+
+
+def user_storage() -> MutableMapping:
+    """Storage of the current browser session; raises RuntimeError outside a page request like ``app.storage.user``"""
+    if STORAGE_BACKEND == 'sqlite':
+        # The browser id lives in the signed session cookie, so any worker sharing STORAGE_SECRET can read it
+        return SharedDict(shared_backend(), USER_NAMESPACE_PREFIX + app.storage.browser['id'])
+    return app.storage.user
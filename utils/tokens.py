@@ -0,0 +1,165 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .api import base_url, upstream
+
+# Shared secret of the backend's HS* tokens. Without it signatures cannot be
+# checked locally and only structure and expiry are verified.
+JWT_SECRET = os.getenv('JWT_SECRET')
+JWT_ALGORITHMS = {'HS256': hashlib.sha256, 'HS384': hashlib.sha384, 'HS512': hashlib.sha512}
+# Clock skew tolerated on exp/nbf, seconds
+JWT_LEEWAY = 30
+# Tokens this close to expiry are refreshed before use
+REFRESH_MARGIN = int(os.getenv('JWT_REFRESH_MARGIN', '300'))
+REFRESH_PATH = os.getenv('AUTH_REFRESH_PATH', '/auth/refresh')
+CLAIMS_CACHE_SIZE = 1024
+CLAIMS_CACHE_TTL = 60
+
+
+class TokenError(Exception):
+    """Token is malformed, has a bad signature or is not valid at this time"""
+    pass
+
+
+class TokenExpired(TokenError):
+    pass
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+def is_jwt(token: Optional[str]) -> bool:
+    # Local sign-ins use opaque "mock_token_<id>" tokens
+    return bool(token) and token.count('.') == 2
+
+
+def decode_token(token: str, secret: Optional[str] = JWT_SECRET, now: Optional[float] = None) -> Dict[str, Any]:
+    """Validate a JWT and return its claims; raises TokenError/TokenExpired"""
+    try:
+        header_segment, payload_segment, signature_segment = token.split('.')
+        header = json.loads(_b64decode(header_segment))
+        claims = json.loads(_b64decode(payload_segment))
+        signature = _b64decode(signature_segment)
+    except (ValueError, TypeError) as e:
+        raise TokenError(f'Malformed token: {e}')
+    if not isinstance(claims, dict):
+        raise TokenError('Malformed token: claims are not an object')
+
+    if secret:
+        digest = JWT_ALGORITHMS.get(header.get('alg'))
+        if digest is None:
+            raise TokenError(f"Unsupported token algorithm: {header.get('alg')}")
+        expected = hmac.new(secret.encode(), f'{header_segment}.{payload_segment}'.encode(), digest).digest()
+        if not hmac.compare_digest(expected, signature):
+            raise TokenError('Bad token signature')
+
+    try:
+        expires = float(claims['exp']) if 'exp' in claims else None
+        not_before = float(claims['nbf']) if 'nbf' in claims else None
+    except (ValueError, TypeError):
+        raise TokenError('Malformed token: exp and nbf must be numbers')
+    now = time.time() if now is None else now
+    if expires is not None and now > expires + JWT_LEEWAY:
+        raise TokenExpired('Token has expired')
+    if not_before is not None and now < not_before - JWT_LEEWAY:
+        raise TokenError('Token is not valid yet')
+    return claims
+
+
+class ClaimsCache:
+    """Short-lived LRU of validated claims.
+
+    A token is decoded and checked at most once per ``ttl`` seconds however
+    often a page asks for it. Entries never outlive the token's own expiry.
+    """
+
+    def __init__(self, maxsize: int = CLAIMS_CACHE_SIZE, ttl: float = CLAIMS_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, Tuple[Dict[str, Any], float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, valid_until = entry
+            if time.time() >= valid_until:
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        valid_until = time.time() + self.ttl
+        if 'exp' in claims:
+            valid_until = min(valid_until, float(claims['exp']))
+        with self._lock:
+            self._entries[token] = (claims, valid_until)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+
+claims_cache = ClaimsCache()
+# Tokens whose refresh was refused; they are used until they expire without retrying
+_refresh_refused: 'OrderedDict[str, None]' = OrderedDict()
+_refresh_refused_lock = threading.Lock()
+
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """Claims of a valid JWT, from the cache when possible; raises TokenError"""
+    claims = claims_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        claims_cache.put(token, claims)
+    return claims
+
+
+def needs_refresh(claims: Dict[str, Any], margin: float = REFRESH_MARGIN) -> bool:
+    return 'exp' in claims and float(claims['exp']) - time.time() < margin
+
+
+def refresh_token(token: str) -> Optional[str]:
+    """Exchange a token that is about to expire for a fresh one; ``None`` if the backend refuses.
+
+    Blocks on the backend; call it off the event loop.
+    """
+    import requests
+
+    with _refresh_refused_lock:
+        if token in _refresh_refused:
+            return None
+    try:
+        r = upstream('POST', f"{base_url}{REFRESH_PATH}", headers={"Authorization": f"Bearer {token}"}, timeout=10)
+        if 200 <= r.status_code < 300:
+            data = r.json()
+            fresh = data.get('token') or data.get('access_token')
+            if fresh:
+                verify_token(fresh)
+                return fresh
+    except (requests.RequestException, ValueError, TokenError):
+        pass
+    with _refresh_refused_lock:
+        _refresh_refused[token] = None
+        while len(_refresh_refused) > CLAIMS_CACHE_SIZE:
+            _refresh_refused.popitem(last=False)
+    return None
@@ -0,0 +1,175 @@
+import contextvars
+import json
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+# "console" prints finished spans to stderr, "file" appends them to TRACE_FILE; unset turns tracing off
+TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', '').lower()
+TRACE_FILE = os.getenv('TRACE_FILE', os.path.join('.nicegui', 'traces.jsonl'))
+SERVICE_NAME = os.getenv('SERVICE_NAME', 'advertisement-manager')
+
+# W3C trace context: version-trace_id-parent_id-flags
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+
+def _iso(ns: int) -> str:
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+class Span:
+    """One timed operation of a trace; use as a context manager to make it current"""
+
+    def __init__(self, tracer: 'Tracer', name: str, kind: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = 'UNSET'
+        self.description: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._token: Optional[contextvars.Token] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, description: str) -> None:
+        self.status = 'ERROR'
+        self.description = description
+
+    def __enter__(self) -> 'Span':
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None and self.status == 'UNSET':
+            self.set_error(f'{exc_type.__name__}: {exc}')
+        _current.reset(self._token)
+        self.end_ns = time.time_ns()
+        self.tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Field names and layout of the OpenTelemetry SDK's ConsoleSpanExporter
+        status = {'status_code': self.status}
+        if self.description:
+            status['description'] = self.description
+        return {
+            'name': self.name,
+            'context': {'trace_id': f'0x{self.trace_id}', 'span_id': f'0x{self.span_id}', 'trace_state': '[]'},
+            'kind': f'SpanKind.{self.kind}',
+            'parent_id': f'0x{self.parent_id}' if self.parent_id else None,
+            'start_time': _iso(self.start_ns),
+            'end_time': _iso(self.end_ns or self.start_ns),
+            'duration_ms': round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+            'status': status,
+            'attributes': self.attributes,
+            'resource': {'attributes': {'service.name': SERVICE_NAME}},
+        }
+
+
+class _NoSpan:
+    """Stand-in returned while tracing is off, so instrumented code costs one attribute lookup"""
+
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, description: str) -> None:
+        pass
+
+    def __enter__(self) -> '_NoSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('current_span', default=None)
+
+
+class Tracer:
+    """Minimal OpenTelemetry-style tracer with W3C ``traceparent`` propagation.
+
+    Spans nest through a context variable, so a span opened inside another
+    one, in the same task or in a thread started with ``copy_context``,
+    becomes its child. A span opened with no current span starts a new trace,
+    unless an incoming ``traceparent`` is passed. Finished spans are written
+    one JSON object per line, in the shape of the OpenTelemetry console
+    exporter, to stderr or to a file.
+    """
+
+    def __init__(self, exporter: str = TRACE_EXPORTER, path: str = TRACE_FILE):
+        self.exporter = exporter if exporter in ('console', 'file') else ''
+        self.path = path
+        self.exported = 0
+        self._out: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporter)
+
+    def span(self, name: str, kind: str = 'INTERNAL', traceparent: Optional[str] = None, **attributes: Any):
+        """New span under the current one (or under ``traceparent``), to be used with ``with``"""
+        if not self.enabled:
+            return _NO_SPAN
+        parent = _current.get()
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            match = _TRACEPARENT.match(traceparent or '')
+            if match and match.group(1) != '0' * 32:
+                trace_id, parent_id = match.group(1), match.group(2)
+            else:
+                trace_id, parent_id = secrets.token_hex(16), None
+        return Span(self, name, kind, trace_id, parent_id, attributes)
+
+    def inject(self, headers: Dict[str, str]) -> Dict[str, str]:
+        """Add the current span's ``traceparent`` to outgoing request headers"""
+        span = _current.get()
+        if span is not None:
+            headers['traceparent'] = span.traceparent
+        return headers
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            if self._out is None:
+                self._out = self._open()
+            self._out.write(line + '\n')
+            self.exported += 1
+
+    def _open(self) -> TextIO:
+        if self.exporter == 'console':
+            return sys.stderr
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Line buffered: each span is on disk as soon as it ends
+        return open(self.path, 'a', encoding='utf-8', buffering=1)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._out is not None and self._out is not sys.stderr:
+                self._out.close()
+            self._out = None
+
+
+tracer = Tracer()
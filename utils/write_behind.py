@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterator, Mapping, MutableMapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# A burst of mutations within this many seconds is written once
+FLUSH_INTERVAL = float(os.getenv('STORE_FLUSH_INTERVAL', '1.0'))
+# ...unless this many mutations pile up first
+FLUSH_THRESHOLD = int(os.getenv('STORE_FLUSH_THRESHOLD', '100'))
+# A failed write is retried after interval * 2 ** failures seconds, at most this long
+MAX_RETRY_INTERVAL = 60.0
+
+
+def atomic_write_text(path: str, data: str, suffix: str = '') -> None:
+    """Replace ``path`` with ``data`` so readers see the old or the new file, never a partial one"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, data: str) -> None:
+    """``atomic_write_text`` for an already serialized JSON document"""
+    atomic_write_text(path, data, suffix='.json')
+
+
+class WriteBehindStore(MutableMapping):
+    """In-memory dict persisted to one JSON file in the background.
+
+    Reads and writes hit memory; a write marks the store dirty and the whole
+    file is rewritten at most once per ``interval`` seconds, or as soon as
+    ``threshold`` mutations are pending. The file is replaced atomically via
+    a temp file and rename. A failed write is logged and retried with
+    exponential backoff. Call ``close`` on shutdown to write what is left.
+    ``seed`` provides the initial contents when the file does not exist yet.
+    """
+
+    def __init__(self, path: str, seed: Optional[Callable[[], Mapping[str, Any]]] = None,
+                 interval: float = FLUSH_INTERVAL, threshold: int = FLUSH_THRESHOLD):
+        self.path = path
+        self.seed = seed
+        self.interval = interval
+        self.threshold = threshold
+        self.mutations = 0
+        self.writes = 0
+        self._data: Optional[Dict[str, Any]] = None
+        self._pending = 0
+        self._failures = 0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+
+    def _loaded(self) -> Dict[str, Any]:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    if os.path.exists(self.path):
+                        with open(self.path, encoding='utf-8') as f:
+                            self._data = json.load(f)
+                    else:
+                        self._data = dict(self.seed()) if self.seed else {}
+        return self._data
+
+    def _mark_dirty(self) -> bool:
+        """Count a mutation; returns True when it should be flushed right away"""
+        self.mutations += 1
+        self._pending += 1
+        # While writes fail, the retry timer rather than every further mutation tries again
+        if self._pending >= self.threshold and not self._failures:
+            return True
+        self._schedule(self.interval)
+        return False
+
+    def _schedule(self, delay: float) -> None:
+        """Start the flush timer unless one is running; call with the lock held"""
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def __getitem__(self, key: str) -> Any:
+        return self._loaded()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._loaded()[key] = value
+            flush_now = self._mark_dirty()
+        if flush_now:
+            self.flush()
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            del self._loaded()[key]
+            flush_now = self._mark_dirty()
+        if flush_now:
+            self.flush()
+
+    def transform(self, key: str, func: Callable[[Any], Any], default: Any = None) -> Any:
+        """Replace ``self[key]`` (``default`` if missing) with ``func`` of it, with no other write in between"""
+        with self._lock:
+            data = self._loaded()
+            value = data[key] = func(data.get(key, default))
+            flush_now = self._mark_dirty()
+        if flush_now:
+            self.flush()
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._loaded()))
+
+    def __len__(self) -> int:
+        return len(self._loaded())
+
+    def flush(self) -> None:
+        """Write pending mutations now, if there are any"""
+        # One writer at a time, so an older snapshot can never replace a newer one
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._pending:
+                    return
+                # Serialize under the lock so the snapshot is consistent; write outside it
+                snapshot = json.dumps(self._data)
+                pending, self._pending = self._pending, 0
+            try:
+                atomic_write_json(self.path, snapshot)
+            except OSError:
+                with self._lock:
+                    self._pending += pending
+                    self._failures += 1
+                    delay = min(self.interval * 2 ** self._failures, MAX_RETRY_INTERVAL)
+                    self._schedule(delay)
+                logger.exception('Could not write %s; retrying in %.1f s', self.path, delay)
+            else:
+                self.writes += 1
+                self._failures = 0
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            # Nothing retries after shutdown; a failed final write has been logged
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
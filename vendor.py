@@ -1,17 +1,19 @@
-from nicegui import ui, app
-import requests
+from nicegui import ui, app, run
 from typing import List, Dict, Any, Optional
-from utils.api import base_url
+from utils.api import base_url, upstream
 from utils.auth import get_role, require_vendor, get_user_id, get_token, clear_session
 from utils.frontend_store import list_adverts, create_advert, update_advert, delete_advert, get_advert
+from utils.adverts import ingest_adverts, ingest_advert, filter_by_vendor
 from components.footer import show_footer
+from utils.media_cache import media_url
+from utils.static_assets import static_bundles
 
 # Global state for view mode
 view_mode = {'value': 'grid'}  # 'grid' or 'list'
 
 def show_vendor_sidebar():
     """Vendor sidebar with navigation"""
-    ui.add_head_html('<link href="https://fonts.googleapis.com/css2?family=Archivo+Black&family=Caveat:wght@400..700&family=Gwendolyn:wght@400;700&family=Josefin+Sans:ital,wght@0,100..700;1,100..700&family=Lavishly+Yours&family=Stoke:wght@300;400&display=swap" rel="stylesheet">')
+    static_bundles.include('css/vendor.css')
 
     ui.query('.nicegui-content').classes('m-0 p-0 gap-0')
     with ui.column().classes(
@@ -88,40 +90,13 @@ def show_vendor_sidebar():
                     "flat no-caps"
                 )
 
-def show_vendor_dashboard():
+async def show_vendor_dashboard():
     """Main vendor dashboard with statistics and overview"""
     if not require_vendor():
         return
 
     # Add custom CSS for enhanced styling
-    ui.add_head_html('''
-    <style>
-    .line-clamp-2 {
-        display: -webkit-box;
-        -webkit-line-clamp: 2;
-        -webkit-box-orient: vertical;
-        overflow: hidden;
-    }
-
-    .gradient-text {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-
-    .glass-effect {
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(10px);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-    }
-
-    .card-hover-effect:hover {
-        transform: translateY(-8px) rotate(1deg);
-        box-shadow: 0 25px 50px -12px rgba(0, 0, 0, 0.25);
-    }
-    </style>
-    ''')
+    static_bundles.include('css/vendor.css')
 
     with ui.row().classes("w-full min-h-screen bg-gradient-to-br from-gray-50 via-white to-gray-100"):
         # Sidebar
@@ -145,7 +120,7 @@ def show_vendor_dashboard():
                     )
 
             # Summary Statistics Section
-            show_dashboard_stats()
+            await show_dashboard_stats()
 
             # View Toggle and Search
             with ui.row().classes("w-full items-center justify-between mb-6"):
@@ -162,12 +137,12 @@ def show_vendor_dashboard():
 
             # Adverts Container
             container = ui.column().classes("gap-4 w-full")
-            show_vendor_adverts(container, search_input)
+            await show_vendor_adverts(container, search_input)
 
     # Add footer
     show_footer()
 
-def show_dashboard_stats():
+async def show_dashboard_stats():
     """Show dashboard statistics cards"""
     vendor_id = get_user_id()
     if not vendor_id:
@@ -179,26 +154,25 @@ def show_dashboard_stats():
         token = get_token()
         headers = {"Authorization": f"Bearer {token}"} if token else {}
 
-        r = requests.get(f"{base_url}/food/all", headers=headers, timeout=15)
+        r = upstream('GET', f"{base_url}/food/all", headers=headers, timeout=15)
         if 200 <= r.status_code < 300:
-            data = r.json()
-            all_adverts = data.get('data', [])
+            all_adverts = ingest_adverts(r.json())
         else:
-            all_adverts = list_adverts()
+            all_adverts = ingest_adverts(await run.io_bound(list_adverts))
     except Exception:
-        all_adverts = list_adverts()
+        all_adverts = ingest_adverts(await run.io_bound(list_adverts))
 
     # Filter by vendor
-    user_adverts = [adv for adv in all_adverts if str(adv.get('owner_id', '')) == str(vendor_id)]
+    user_adverts = filter_by_vendor(all_adverts, vendor_id)
 
     # Calculate statistics
     total_ads = len(user_adverts)
-    active_ads = len([adv for adv in user_adverts if adv.get('is_active', True)])
+    active_ads = len([adv for adv in user_adverts if adv['isAvailable']])
 
     # Category breakdown
     categories = {}
     for adv in user_adverts:
-        cat = adv.get('category', 'Uncategorized')
+        cat = adv['category'] or 'Uncategorized'
         categories[cat] = categories.get(cat, 0) + 1
 
     with ui.row().classes("w-full gap-6 mb-8"):
@@ -250,9 +224,9 @@ def toggle_view(mode: str):
     """Toggle between grid and list view"""
     view_mode['value'] = mode
 
-def show_vendor_adverts(container, search_input):
+async def show_vendor_adverts(container, search_input):
     """Show vendor adverts in container"""
-    def refresh_adverts():
+    async def refresh_adverts():
         container.clear()
         vendor_id = get_user_id()
         if not vendor_id:
@@ -263,22 +237,19 @@ def show_vendor_adverts(container, search_input):
             token = get_token()
             headers = {"Authorization": f"Bearer {token}"} if token else {}
 
-            r = requests.get(f"{base_url}/food/all", headers=headers, timeout=15)
+            r = upstream('GET', f"{base_url}/food/all", headers=headers, timeout=15)
             if 200 <= r.status_code < 300:
-                data = r.json()
-                all_adverts = data.get('data', [])
+                all_adverts = ingest_adverts(r.json())
             else:
-                all_adverts = list_adverts()
+                all_adverts = ingest_adverts(await run.io_bound(list_adverts))
         except Exception:
-            all_adverts = list_adverts()
+            all_adverts = ingest_adverts(await run.io_bound(list_adverts))
 
         # Filter by vendor and search
-        user_adverts = [adv for adv in all_adverts if str(adv.get('owner_id', '')) == str(vendor_id)]
+        user_adverts = filter_by_vendor(all_adverts, vendor_id)
         search_term = search_input.value.lower() if search_input.value else ""
         if search_term:
-            user_adverts = [adv for adv in user_adverts if
-                          search_term in adv.get('name', '').lower() or
-                          search_term in adv.get('description', '').lower()]
+            user_adverts = [adv for adv in user_adverts if search_term in adv['searchText']]
 
         if not user_adverts:
             with container:
@@ -337,9 +308,11 @@ def show_vendor_adverts(container, search_input):
         if not image_url or image_url.startswith('data:'):
             import random
             image_url = random.choice(food_images)
+        # Served from the local media cache when the host is proxied
+        image_url = media_url(image_url)
 
         # Get category color
-        category = advert.get('category', 'General').lower()
+        category = (advert['category'] or 'General').lower()
         category_colors = {
             'pizza': 'bg-red-500',
             'burger': 'bg-yellow-500',
@@ -367,10 +340,10 @@ def show_vendor_adverts(container, search_input):
 
                 # Price badge
                 with ui.element().classes("absolute top-4 right-4 bg-white/90 backdrop-blur-sm text-green-600 px-3 py-2 rounded-full font-bold text-lg shadow-lg"):
-                    ui.label(f"GH₵ {advert.get('price', 0)}")
+                    ui.label(advert['priceBadge'])
 
                 # Status indicator (Active/Inactive)
-                status = advert.get('is_active', True)
+                status = advert['isAvailable']
                 status_color = "bg-green-500" if status else "bg-red-500"
                 with ui.element().classes(f"absolute bottom-4 right-4 {status_color} text-white px-2 py-1 rounded-full text-xs font-semibold"):
                     ui.label("Active" if status else "Inactive")
@@ -383,10 +356,8 @@ def show_vendor_adverts(container, search_input):
                     ui.label(title).classes("text-xl font-bold text-gray-900 leading-tight line-clamp-2")
 
                 # Description with better formatting
-                description = advert.get('description', 'No description')
-                truncated_desc = description[:120] + "..." if len(description) > 120 else description
                 with ui.element().classes("mb-4"):
-                    ui.label(truncated_desc).classes("text-gray-600 text-sm leading-relaxed")
+                    ui.label(advert['cardDescription']).classes("text-gray-600 text-sm leading-relaxed")
 
                 # Rating stars (placeholder for future implementation)
                 with ui.element().classes("flex items-center mb-4"):
@@ -406,27 +377,27 @@ def show_vendor_adverts(container, search_input):
                         "flex-1 px-4 py-3 bg-gradient-to-r from-emerald-500 to-green-600 text-white rounded-xl hover:from-emerald-600 hover:to-green-700 font-semibold shadow-lg hover:shadow-xl transition-all duration-300 transform hover:scale-105"
                     )
 
-                    def do_delete(adv_id=advert.get('id')):
+                    async def do_delete(adv_id=advert.get('id')):
                         try:
                             # Try remote API first
                             token = get_token()
                             headers = {"Authorization": f"Bearer {token}"} if token else {}
 
-                            d = requests.delete(f"{base_url}/food/{adv_id}", headers=headers, timeout=15)
+                            d = upstream('DELETE', f"{base_url}/food/{adv_id}", headers=headers, timeout=15)
                             if 200 <= d.status_code < 300:
                                 ui.notify('Advert deleted successfully', type='positive')
-                                refresh_adverts()
+                                await refresh_adverts()
                             else:
                                 # Fallback to local delete
-                                delete_advert(str(adv_id))
+                                await run.io_bound(delete_advert, str(adv_id))
                                 ui.notify('Advert deleted successfully (local)', type='positive')
-                                refresh_adverts()
+                                await refresh_adverts()
                         except Exception as e:
                             # Fallback to local delete
                             try:
-                                delete_advert(str(adv_id))
+                                await run.io_bound(delete_advert, str(adv_id))
                                 ui.notify('Advert deleted successfully (local)', type='positive')
-                                refresh_adverts()
+                                await refresh_adverts()
                             except Exception as local_e:
                                 ui.notify(f"Delete failed: {local_e}", type='negative')
 
@@ -435,9 +406,9 @@ def show_vendor_adverts(container, search_input):
                     )
 
                 # Created date (if available)
-                if 'created_at' in advert:
+                if advert['createdAt']:
                     with ui.element().classes("mt-4 pt-4 border-t border-gray-100"):
-                        ui.label(f"Created: {advert['created_at']}").classes("text-xs text-gray-400")
+                        ui.label(f"Created: {advert['createdAt']}").classes("text-xs text-gray-400")
 
     def create_advert_list_item(advert):
         """Create a modern, aesthetically pleasing list item for list view"""
@@ -458,9 +429,11 @@ def show_vendor_adverts(container, search_input):
         if not image_url or image_url.startswith('data:'):
             import random
             image_url = random.choice(food_images)
+        # Served from the local media cache when the host is proxied
+        image_url = media_url(image_url)
 
         # Get category color
-        category = advert.get('category', 'General').lower()
+        category = (advert['category'] or 'General').lower()
         category_colors = {
             'pizza': 'bg-red-500',
             'burger': 'bg-yellow-500',
@@ -494,12 +467,10 @@ def show_vendor_adverts(container, search_input):
 
                         # Price badge
                         with ui.element().classes("bg-green-500 text-white px-4 py-2 rounded-full font-bold text-lg shadow-lg"):
-                            ui.label(f"GH₵ {advert.get('price', 0)}")
+                            ui.label(advert['priceBadge'])
 
                     # Description
-                    description = advert.get('description', 'No description')
-                    truncated_desc = description[:200] + "..." if len(description) > 200 else description
-                    ui.label(truncated_desc).classes("text-gray-600 text-sm leading-relaxed mb-4")
+                    ui.label(advert['listDescription']).classes("text-gray-600 text-sm leading-relaxed mb-4")
 
                     # Rating and status row
                     with ui.row().classes("w-full items-center justify-between"):
@@ -510,7 +481,7 @@ def show_vendor_adverts(container, search_input):
                             ui.label("(4.5)").classes("text-gray-500 text-sm ml-2")
 
                         # Status indicator
-                        status = advert.get('is_active', True)
+                        status = advert['isAvailable']
                         status_color = "bg-green-500" if status else "bg-red-500"
                         with ui.element().classes(f"{status_color} text-white px-3 py-1 rounded-full text-xs font-semibold"):
                             ui.label("Active" if status else "Inactive")
@@ -525,27 +496,27 @@ def show_vendor_adverts(container, search_input):
                         "px-6 py-2 bg-gradient-to-r from-emerald-500 to-green-600 text-white rounded-xl hover:from-emerald-600 hover:to-green-700 font-semibold shadow-lg hover:shadow-xl transition-all duration-300 transform hover:scale-105"
                     )
 
-                    def do_delete(adv_id=advert.get('id')):
+                    async def do_delete(adv_id=advert.get('id')):
                         try:
                             # Try remote API first
                             token = get_token()
                             headers = {"Authorization": f"Bearer {token}"} if token else {}
 
-                            d = requests.delete(f"{base_url}/food/{adv_id}", headers=headers, timeout=15)
+                            d = upstream('DELETE', f"{base_url}/food/{adv_id}", headers=headers, timeout=15)
                             if 200 <= d.status_code < 300:
                                 ui.notify('Advert deleted successfully', type='positive')
-                                refresh_adverts()
+                                await refresh_adverts()
                             else:
                                 # Fallback to local delete
-                                delete_advert(str(adv_id))
+                                await run.io_bound(delete_advert, str(adv_id))
                                 ui.notify('Advert deleted successfully (local)', type='positive')
-                                refresh_adverts()
+                                await refresh_adverts()
                         except Exception as e:
                             # Fallback to local delete
                             try:
-                                delete_advert(str(adv_id))
+                                await run.io_bound(delete_advert, str(adv_id))
                                 ui.notify('Advert deleted successfully (local)', type='positive')
-                                refresh_adverts()
+                                await refresh_adverts()
                             except Exception as local_e:
                                 ui.notify(f"Delete failed: {local_e}", type='negative')
 
@@ -557,7 +528,7 @@ def show_vendor_adverts(container, search_input):
         """Navigate to edit advert page"""
         ui.navigate.to(f'/vendor/edit_advert/{advert_id}')
 
-    refresh_adverts()
+    await refresh_adverts()
 
 def show_create_advert():
     """Show enhanced create advert form with modern UI"""
@@ -565,92 +536,7 @@ def show_create_advert():
         return
 
     # Add custom CSS for enhanced form styling
-    ui.add_head_html('''
-    <style>
-    .form-section {
-        background: white;
-        border-radius: 16px;
-        padding: 24px;
-        margin-bottom: 24px;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-        border: 1px solid #e5e7eb;
-    }
-
-    .form-section:hover {
-        box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1);
-        transform: translateY(-1px);
-        transition: all 0.3s ease;
-    }
-
-    .image-preview {
-        border: 2px dashed #d1d5db;
-        border-radius: 12px;
-        padding: 20px;
-        text-align: center;
-        background: #f9fafb;
-        transition: all 0.3s ease;
-    }
-
-    .image-preview:hover {
-        border-color: #10b981;
-        background: #f0fdf4;
-    }
-
-    .image-preview.dragover {
-        border-color: #10b981;
-        background: #ecfdf5;
-        transform: scale(1.02);
-    }
-
-    .category-badge {
-        display: inline-block;
-        padding: 6px 12px;
-        border-radius: 20px;
-        font-size: 12px;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-
-    .price-input {
-        font-size: 24px;
-        font-weight: bold;
-        text-align: center;
-    }
-
-    .form-step {
-        display: none;
-    }
-
-    .form-step.active {
-        display: block;
-    }
-
-    .step-indicator {
-        display: flex;
-        justify-content: center;
-        margin-bottom: 32px;
-    }
-
-    .step-dot {
-        width: 12px;
-        height: 12px;
-        border-radius: 50%;
-        background: #d1d5db;
-        margin: 0 8px;
-        transition: all 0.3s ease;
-    }
-
-    .step-dot.active {
-        background: #10b981;
-        transform: scale(1.3);
-    }
-
-    .step-dot.completed {
-        background: #10b981;
-    }
-    </style>
-    ''')
+    static_bundles.include('css/vendor.css')
 
     ui.query(".nicegui-content").classes('m-0 p-0 gap-0')
     with ui.element('main').classes('w-full min-h-screen bg-gradient-to-br from-gray-50 via-white to-gray-100 p-8'):
@@ -793,7 +679,7 @@ def show_create_advert():
                         # Submit button
                         submit_btn = ui.button(
                             "🚀 Create Advert",
-                            on_click=lambda: submit_advert()
+                            on_click=submit_advert
                         ).classes(
                             'w-full py-4 bg-gradient-to-r from-green-500 to-emerald-600 text-white rounded-xl font-bold text-lg shadow-lg hover:shadow-xl transition-all duration-300 transform hover:scale-105 mt-6'
                         ).props('disable')
@@ -904,7 +790,7 @@ def navigate_step(direction):
     # This will be handled by JavaScript
     pass
 
-def submit_advert():
+async def submit_advert():
     """Submit the advert form"""
     global form_data
 
@@ -936,7 +822,7 @@ def submit_advert():
         }
         files = {"image": form_data['image']} if form_data['image'] else {}
 
-        response = requests.post(url=f"{base_url}/food", data=data, files=files, headers=headers, timeout=15)
+        response = upstream('POST', url=f"{base_url}/food", data=data, files=files, headers=headers, timeout=15)
         if response.status_code == 200:
             ui.notify("🎉 Advert created successfully!", type="positive")
             ui.navigate.to('/vendor/dashboard')
@@ -952,7 +838,8 @@ def submit_advert():
 
             image_data = form_data['image'].decode() if form_data['image'] else ''
 
-            create_advert(
+            await run.io_bound(
+                create_advert,
                 name=form_data['title'],
                 description=form_data['description'],
                 price=float(form_data['price']),
@@ -968,7 +855,7 @@ def submit_advert():
 
     ui.notify("Failed to create advert. Please try again.", type="negative")
 
-def show_vendor_adverts_list():
+async def show_vendor_adverts_list():
     """Show all vendor adverts in a dedicated page"""
     if not require_vendor():
         return
@@ -1001,12 +888,12 @@ def show_vendor_adverts_list():
 
             # Adverts Container
             container = ui.column().classes("gap-4 w-full")
-            show_vendor_adverts(container, search_input)
+            await show_vendor_adverts(container, search_input)
 
     # Add footer
     show_footer()
 
-def show_edit_advert(advert_id: str):
+async def show_edit_advert(advert_id: str):
     """Show edit advert form"""
     if not require_vendor():
         return
@@ -1017,19 +904,19 @@ def show_edit_advert(advert_id: str):
         token = get_token()
         headers = {"Authorization": f"Bearer {token}"} if token else {}
 
-        r = requests.get(f"{base_url}/food/{advert_id}", headers=headers, timeout=15)
+        r = upstream('GET', f"{base_url}/food/{advert_id}", headers=headers, timeout=15)
         if 200 <= r.status_code < 300:
-            advert_data = r.json()
+            advert_data = ingest_advert(r.json())
         else:
-            advert_data = get_advert(advert_id)
+            advert_data = ingest_advert(await run.io_bound(get_advert, advert_id))
     except Exception:
-        advert_data = get_advert(advert_id)
+        advert_data = ingest_advert(await run.io_bound(get_advert, advert_id))
 
     if not advert_data:
         ui.label("Advert not found").classes("text-xl text-red-600")
         return
 
-    ui.add_head_html('<link href="https://fonts.googleapis.com/css2?family=Archivo+Black&family=Caveat:wght@400..700&family=Gwendolyn:wght@400;700&family=Josefin+Sans:ital,wght@0,100..700;1,100..700&family=Lavishly+Yours&family=Stoke:wght@300;400&display=swap" rel="stylesheet">')
+    static_bundles.include('css/vendor.css')
 
     ui.query(".nicegui-content").classes('m-0 p-0 gap-0')
     with ui.element('main').classes('w-full h-full flex flex-col justify-center items-center p-4').style('font-family: "Josefin Sans", sans-serif'):
@@ -1043,7 +930,7 @@ def show_edit_advert(advert_id: str):
             advert_price = ui.number(label="Price", value=advert_data.get('price', 0)).classes('w-full bg-white px-w').props('borderless')
             advert_category = ui.input(label="Category", value=advert_data.get('category', '')).classes('w-full bg-white').props('borderless')
 
-            def update_advert_handler():
+            async def update_advert_handler():
                 if not all([advert_title.value, advert_description.value, advert_price.value, advert_category.value]):
                     ui.notify("Please fill in all fields!", type="negative")
                     return
@@ -1059,7 +946,7 @@ def show_edit_advert(advert_id: str):
                         "category": advert_category.value
                     }
 
-                    response = requests.put(url=f"{base_url}/food/{advert_id}", json=data, headers=headers, timeout=15)
+                    response = upstream('PUT', url=f"{base_url}/food/{advert_id}", json=data, headers=headers, timeout=15)
                     if response.status_code == 200:
                         ui.notify("Advert updated successfully!", type="positive")
                         ui.navigate.to('/vendor/dashboard')
@@ -1068,7 +955,8 @@ def show_edit_advert(advert_id: str):
                 except Exception as e:
                     # Fallback to local storage
                     try:
-                        update_advert(
+                        await run.io_bound(
+                            update_advert,
                             advert_id=advert_id,
                             name=advert_title.value,
                             description=advert_description.value,